@@ -0,0 +1,277 @@
+"""
+Uncoded PAM over AWGN: batched simulation against exact Q-function results
+
+Usage: python awgn.py                                   # model.py calibration check, 4/6/8-PAM
+       python awgn.py --pam_levels 4 --snr_db 14 16 18 --bits 4000000
+       python awgn.py --pam_levels 4 --symbol_separation 3 --noise_variance 0.1   # richard/PAM4_SNR.py
+
+The reference for the uncoded link: PRBS20 bits (or random bits) -> Gray
+mapping (encode.GrayCode tables, so 6-PAM uses the same 5-bit : 2-symbol
+code as the model) -> PAM levels (pam.PAM, peak normalized) -> AWGN -> hard
+slicer -> Gray decode. Everything is numpy arrays. A whole noise sweep is one
+call: the received samples are a (noise levels, symbols) array, by default
+scaled copies of one standard normal draw, so the points of a curve share
+their noise and are monotone.
+
+The theory is exact, not a nearest-neighbour approximation: the symbol
+transition probabilities P(j | i) are Q-function differences between the
+slicer thresholds, and the BER follows from the Hamming distances of the
+actual Gray code blocks. With equiprobable symbols (4/8-PAM) the SER equals
+the closed form 2(M-1)/M Q(d / 2 sigma), d the level spacing; the 6-PAM 5:2
+code uses 32 of the 36 symbol pairs, which moves its SER by up to 0.6 %.
+
+model.py sets the noise from the SNR with peak power (calculate_sigma_from_snr:
+SNR = peak^2 / sigma^2), not average power. calibration() runs
+calculate_sigma_from_snr and pam.PAM through this engine and checks the
+simulated SER against the exact SER at that SNR. It also reports the
+average-power SNR, which is lower by snr_offset_db(M), e.g. 2.55 dB for 4-PAM,
+and the SER an average-power reading of the SNR would predict.
+"""
+
+import argparse
+import json
+
+import numpy as np
+from scipy.stats import norm
+
+from encode import GrayCode
+from pam import PAM
+from prbs import PRBS
+from rng import make_rng
+from stopping import confidence_interval
+
+DEFAULT_SEPARATION = 48.0  # model.py symbol_separation (peak level)
+
+def snr_offset_db(pam_levels):
+    """Peak-to-average power ratio of uniform M-PAM in dB (peak SNR - average SNR)"""
+    return 10 * np.log10(3 * (pam_levels - 1) / (pam_levels + 1))
+
+def sigma_from_snr(snr_db, pam_levels, symbol_separation=DEFAULT_SEPARATION, reference="peak"):
+    """Noise sigma for an SNR referred to the peak (model.py) or the average signal power"""
+    snr_db = np.asarray(snr_db, dtype=float)
+    if reference == "average":
+        snr_db = snr_db + snr_offset_db(pam_levels)
+    return symbol_separation / np.sqrt(10 ** (snr_db / 10))
+
+def closed_form_ser(pam_levels, snr_db, reference="peak"):
+    """2(M-1)/M Q(d / 2 sigma) of uniform M-PAM at a peak or average SNR"""
+    sigma = sigma_from_snr(snr_db, pam_levels, 1.0, reference)
+    return 2 * (pam_levels - 1) / pam_levels * norm.sf(1.0 / ((pam_levels - 1) * sigma))
+
+def transition_probabilities(levels, sigmas):
+    """
+    P(decide j | sent i) of the hard slicer (thresholds halfway between levels)
+
+    Returns:
+        (noise levels, M, M) array - each entry is computed from the tail on its own
+        side, so small off-diagonal probabilities keep full precision
+    """
+    levels = np.asarray(levels, dtype=float)
+    sigmas = np.atleast_1d(np.asarray(sigmas, dtype=float))
+    edges = np.concatenate([[-np.inf], (levels[1:] + levels[:-1]) / 2, [np.inf]])
+    # z[s, i, e]: edge e relative to level i, in units of sigma s
+    z = (edges[None, None, :] - levels[None, :, None]) / sigmas[:, None, None]
+    above = norm.sf(z[:, :, :-1]) - norm.sf(z[:, :, 1:])   # accurate for j >= i
+    below = norm.cdf(z[:, :, 1:]) - norm.cdf(z[:, :, :-1])  # accurate for j < i
+    i, j = np.indices((len(levels), len(levels)))
+    return np.where(j >= i, above, below)
+
+def theory(pam_levels, sigmas, symbol_separation=DEFAULT_SEPARATION):
+    """
+    Exact SER / BER of Gray-mapped uniform PAM with hard slicing (equiprobable bit blocks)
+
+    Returns:
+        dict with 'ser' and 'ber' arrays (one entry per sigma)
+    """
+    pam = PAM(pam_levels, symbol_separation)
+    bits_per_block, symbols_per_block, encode_table, decode_table = GrayCode.get_gray_tables(pam_levels)
+    p = transition_probabilities(pam.levels, sigmas)
+    i, j = np.indices(p.shape[1:])
+    off_diagonal = np.where(i != j, p, 0).sum(axis=2)
+
+    # received symbol blocks r (base-M index, first symbol most significant)
+    received = np.array(np.unravel_index(np.arange(pam_levels ** symbols_per_block),
+                                         (pam_levels,) * symbols_per_block)).T
+    block_p = np.ones((len(p), len(encode_table), len(received)))
+    for position in range(symbols_per_block):
+        block_p *= p[:, encode_table[:, position][:, None], received[:, position][None, :]]
+
+    weights = 1 << np.arange(bits_per_block - 1, -1, -1)
+    decoded = decode_table.astype(np.int64) @ weights
+    flips = np.arange(len(encode_table))[:, None] ^ decoded[None, :]
+    bit_errors = np.array([bin(value).count("1") for value in range(1 << bits_per_block)])[flips]
+
+    return {
+        "ser": off_diagonal[:, encode_table].mean(axis=(1, 2)),
+        "ber": (block_p * bit_errors).sum(axis=2).mean(axis=1) / bits_per_block
+    }
+
+def simulate(pam_levels, sigmas, n_bits, symbol_separation=DEFAULT_SEPARATION, seed=0, prbs_order=20,
+             independent=False, block_symbols=1 << 16):
+    """
+    Uncoded SER / BER at several noise levels in one pass over the data
+
+    Args:
+        pam_levels: 4, 6 or 8
+        sigmas: noise standard deviations (all simulated together)
+        n_bits: data bits (rounded down to whole Gray blocks)
+        symbol_separation: peak PAM level (pam.PAM)
+        seed: root seed of the noise (and random data) streams (rng.py)
+        prbs_order: PRBS data (prbs.py, PRBS20 like PAM4_SNR.py); None = random bits
+        independent: own noise draw per sigma instead of scaled copies of one draw
+        block_symbols: symbols per processed block (bounds memory to noise levels x block)
+
+    Returns:
+        dict with 'sigmas', 'symbols', 'symbol_errors', 'ser', 'bits', 'bit_errors', 'ber'
+    """
+    pam = PAM(pam_levels, symbol_separation)
+    levels = np.asarray(pam.levels)
+    sigmas = np.atleast_1d(np.asarray(sigmas, dtype=float))
+    bits_per_block, symbols_per_block, _, _ = GrayCode.get_gray_tables(pam_levels)
+    block_bits = max(1, block_symbols // symbols_per_block) * bits_per_block
+    n_bits -= n_bits % bits_per_block
+
+    source = PRBS(prbs_order) if prbs_order else None
+    data_rng = make_rng(seed, "awgn", "data")
+    noise_rng = make_rng(seed, "awgn", "noise")
+    symbol_errors = np.zeros(len(sigmas), dtype=np.int64)
+    bit_errors = np.zeros(len(sigmas), dtype=np.int64)
+
+    for start in range(0, n_bits, block_bits):
+        count = min(block_bits, n_bits - start)
+        bits = source.bits(count) if source is not None else data_rng.integers(0, 2, count, dtype=np.uint8)
+        symbols = GrayCode.gray_encode_array(bits, pam_levels)
+        noise = noise_rng.standard_normal((len(sigmas) if independent else 1, len(symbols)))
+        decided = pam.demodulate_array(levels[symbols] + sigmas[:, None] * noise)
+
+        symbol_errors += np.count_nonzero(decided != symbols, axis=1)
+        decoded = GrayCode.gray_decode_array(decided.ravel(), pam_levels).reshape(len(sigmas), -1)
+        bit_errors += np.count_nonzero(decoded != bits, axis=1)
+
+    n_symbols = n_bits // bits_per_block * symbols_per_block
+    return {
+        "sigmas": sigmas,
+        "symbols": n_symbols,
+        "symbol_errors": symbol_errors,
+        "ser": symbol_errors / max(n_symbols, 1),
+        "bits": n_bits,
+        "bit_errors": bit_errors,
+        "ber": bit_errors / max(n_bits, 1)
+    }
+
+def default_snr_grid(pam_levels, points=7):
+    """Peak SNRs (dB) whose closed-form SER spans about 1e-1 .. 1e-4"""
+    q_arguments = np.linspace(1.0, 3.5, points)
+    return np.round(20 * np.log10(q_arguments * (pam_levels - 1)), 2)
+
+def calibration(pam_levels, snr_dbs, n_bits, seed=0, confidence=0.99, prbs_order=20):
+    """
+    Check model.py's SNR -> sigma and PAM levels against the closed-form SER
+
+    Every point runs calculate_sigma_from_snr and pam.PAM (peak normalized, model.py
+    separation) through simulate() and tests whether the exact SER at that peak SNR
+    lies in the confidence interval of the simulated SER.
+
+    Returns:
+        list of dicts, one per SNR (JSON serialisable)
+    """
+    from model import calculate_sigma_from_snr
+
+    sigmas = [calculate_sigma_from_snr(snr, pam_levels, DEFAULT_SEPARATION) for snr in snr_dbs]
+    simulated = simulate(pam_levels, sigmas, n_bits, DEFAULT_SEPARATION, seed, prbs_order)
+    exact = theory(pam_levels, sigmas, DEFAULT_SEPARATION)
+
+    rows = []
+    for index, snr in enumerate(snr_dbs):
+        errors = int(simulated["symbol_errors"][index])
+        low, high = confidence_interval(errors, simulated["symbols"], confidence)
+        expected = float(exact["ser"][index])
+        rows.append({
+            "pam_levels": pam_levels,
+            "snr_db": float(snr),
+            "snr_db_average": float(snr - snr_offset_db(pam_levels)),
+            "sigma": float(sigmas[index]),
+            "symbol_errors": errors,
+            "ser": float(simulated["ser"][index]),
+            "ser_low": low,
+            "ser_high": high,
+            "ser_theory": expected,
+            "ser_closed_form": float(closed_form_ser(pam_levels, snr)),
+            "ser_theory_average_snr": float(closed_form_ser(pam_levels, snr, "average")),
+            "ber": float(simulated["ber"][index]),
+            "ber_theory": float(exact["ber"][index]),
+            "consistent": bool(low <= expected <= high)
+        })
+    return rows
+
+def print_sweep(pam_levels, sigmas, simulated, exact, labels):
+    print(f"{pam_levels}-PAM: {simulated['symbols']} symbols, {simulated['bits']} bits per point")
+    print(f"  {'point':>14} {'sigma':>10} {'SER sim':>10} {'SER theory':>10} {'BER sim':>10} {'BER theory':>10}")
+    for index, label in enumerate(labels):
+        print(f"  {label:>14} {sigmas[index]:>10.4g} {simulated['ser'][index]:>10.3e} {exact['ser'][index]:>10.3e} "
+              f"{simulated['ber'][index]:>10.3e} {exact['ber'][index]:>10.3e}")
+
+def print_calibration(rows):
+    pam_levels = rows[0]["pam_levels"]
+    print(f"{pam_levels}-PAM calibration (model.py peak SNR; average-power SNR is "
+          f"{snr_offset_db(pam_levels):.2f} dB lower)")
+    print(f"  {'SNR dB':>7} {'avg dB':>7} {'sigma':>8} {'SER sim':>10} {'CI':>23} {'SER theory':>10} "
+          f"{'if avg SNR':>10} {'BER sim':>10} {'BER theory':>10}  ok")
+    for row in rows:
+        interval = f"[{row['ser_low']:.3e}, {row['ser_high']:.3e}]"
+        print(f"  {row['snr_db']:>7.2f} {row['snr_db_average']:>7.2f} {row['sigma']:>8.4f} {row['ser']:>10.3e} "
+              f"{interval:>23} {row['ser_theory']:>10.3e} {row['ser_theory_average_snr']:>10.3e} "
+              f"{row['ber']:>10.3e} {row['ber_theory']:>10.3e}  {'yes' if row['consistent'] else 'NO'}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Uncoded PAM AWGN reference: batched SER/BER simulation vs exact Q-function results',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--pam_levels', type=int, nargs='+', default=[4, 6, 8], choices=[4, 6, 8])
+    noise = parser.add_mutually_exclusive_group()
+    noise.add_argument('--snr_db', type=float, nargs='+', default=None,
+                       help='Peak SNRs as in model.py (default: a grid spanning SER 1e-1 .. 1e-4 per PAM level)')
+    noise.add_argument('--noise_variance', type=float, nargs='+', default=None,
+                       help='Noise variances instead of SNRs (plain sweep, no model.py calibration)')
+    parser.add_argument('--symbol_separation', type=float, default=DEFAULT_SEPARATION,
+                       help='Peak PAM level for --noise_variance sweeps (3 gives the -3/-1/1/3 levels of PAM4_SNR.py)')
+    parser.add_argument('--bits', type=int, default=2000000, help='Data bits per point')
+    parser.add_argument('--random_data', action='store_true', help='Random bits instead of PRBS20')
+    parser.add_argument('--independent_noise', action='store_true',
+                       help='Own noise draw per point instead of scaled copies of one draw')
+    parser.add_argument('--confidence', type=float, default=0.99, help='Confidence of the SER interval')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', type=str, default=None, help='Save the results to this JSON file')
+    args = parser.parse_args()
+
+    prbs_order = None if args.random_data else 20
+    results = []
+    for pam_levels in args.pam_levels:
+        if args.noise_variance is not None:
+            sigmas = np.sqrt(args.noise_variance)
+            simulated = simulate(pam_levels, sigmas, args.bits, args.symbol_separation, args.seed, prbs_order,
+                                 args.independent_noise)
+            exact = theory(pam_levels, sigmas, args.symbol_separation)
+            print_sweep(pam_levels, sigmas, simulated, exact, [f"var {v:g}" for v in args.noise_variance])
+            results += [{"pam_levels": pam_levels, "noise_variance": v, "ser": float(simulated["ser"][i]),
+                         "ser_theory": float(exact["ser"][i]), "ber": float(simulated["ber"][i]),
+                         "ber_theory": float(exact["ber"][i])} for i, v in enumerate(args.noise_variance)]
+        else:
+            snrs = args.snr_db if args.snr_db is not None else default_snr_grid(pam_levels)
+            rows = calibration(pam_levels, snrs, args.bits, args.seed, args.confidence, prbs_order)
+            print_calibration(rows)
+            results += rows
+        print()
+
+    if args.noise_variance is None:
+        failed = [row for row in results if not row["consistent"]]
+        print(f"Calibration: {len(results) - len(failed)}/{len(results)} points consistent with the exact SER "
+              f"at {args.confidence:.0%} confidence")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.json}")
+
+if __name__ == "__main__":
+    main()
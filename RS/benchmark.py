@@ -0,0 +1,362 @@
+"""
+Throughput benchmarks for the hot functions of the simulator
+
+Measures symbols/sec of RS encode/decode (1D and 2D, several error loads),
+Gray / binary mapping, the slicer, DFE and LMS equalizers, the burst error
+models, PRBS generation and end-to-end continuous mode, for every PAM level and the RS(69,65),
+RS(102,96) and RS(200,168) codes. Each case is timed timeit-style (repeat a call until a
+minimum time has passed, keep the best of several repeats).
+
+Every run is appended to ./benchmarks/results.jsonl together with the git
+commit and library versions, so speedups and regressions are measured against
+an earlier run instead of guessed:
+
+    python benchmark.py                         # all cases
+    python benchmark.py --filter rs1d           # cases whose name contains 'rs1d'
+    python benchmark.py --quick --label before  # shorter timings, named run
+    python benchmark.py --compare before        # ratios vs the last run labelled 'before'
+    python benchmark.py --list
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from encode import Binary, GrayCode
+from error import BurstError, GilbertElliott
+from equalizer import DFE, FFE, LMS
+from pam import PAM
+from prbs import PRBS
+from reedsolomon import ReedSolomon1D, ReedSolomon2D
+from rng import make_rng
+from slicer import Slicer
+
+import model
+
+BENCHMARK_DIR = "./benchmarks"
+RESULTS_FILE = "results.jsonl"
+
+PAM_LEVELS = [4, 6, 8]
+RS_CODES = [(69, 65), (102, 96), (200, 168)]
+SYMBOL_SEPARATION = 48
+CHANNEL_H = [0.2, 1.0, 0.4]  # same channel response as model.py
+MULTI_SNR_POINTS = ["24", "26", "28", "30"]  # SNR points (dB) of the multi-SNR end-to-end cases
+SIGNAL_SIZE = 20000   # samples per call for the slicer / equalizer / mapping cases
+LONG_ROUND = 5.0  # seconds - rounds this long (end-to-end runs) are not repeated
+REGRESSION_RATIO = 0.8  # --compare flags cases slower than this fraction of the baseline
+
+def corrupt(codeword, errors, rng):
+    """Copy of codeword with `errors` random symbols replaced by different values"""
+    corrupted = list(codeword)
+    for position in rng.choice(len(corrupted), size=errors, replace=False):
+        corrupted[position] = (corrupted[position] + int(rng.integers(1, 1 << 16))) % (1 << 16)
+    return corrupted
+
+def rs1d_cases():
+    cases = []
+    for n, k in RS_CODES:
+        t = (n - k) // 2
+        rng = make_rng(0, "benchmark", "rs1d", n, k)
+        rs = ReedSolomon1D(n, k)
+        message = rng.integers(0, 226, k).tolist()
+        codeword = list(rs.encode(message, n, k))
+
+        cases.append((f"rs1d_encode[RS({n},{k})]", {"n": n, "k": k},
+                      lambda rs=rs, message=message, n=n, k=k: rs.encode(message, n, k), k))
+
+        # error loads: clean, half the correction capability, full capability, one beyond (failure)
+        for errors in sorted({0, t // 2, t, t + 1}):
+            received = corrupt(codeword, errors, rng)
+            cases.append((f"rs1d_decode[RS({n},{k}),e={errors}]", {"n": n, "k": k, "errors": errors},
+                          lambda rs=rs, received=received, n=n, k=k: rs.decode_codeword(received, n, k), n))
+
+        batch = np.array([corrupt(codeword, t, rng) for _ in range(256)])
+        cases.append((f"rs1d_decode_blocks[RS({n},{k}),e={t}]", {"n": n, "k": k, "errors": t},
+                      lambda rs=rs, batch=batch, n=n, k=k: rs.decode_blocks(batch, n, k), batch.size))
+    return cases
+
+def rs2d_cases():
+    cases = []
+    for n, k in RS_CODES:
+        t = (n - k) // 2
+        rng = make_rng(0, "benchmark", "rs2d", n, k)
+        rs = ReedSolomon2D(n, k)
+        message = rng.integers(0, 226, k * k).tolist()
+        block = list(rs.encode(message, n, k))
+
+        cases.append((f"rs2d_encode[RS({n},{k})]", {"n": n, "k": k},
+                      lambda rs=rs, message=message, n=n, k=k: rs.encode(message, n, k), k * k))
+
+        # error loads in symbols per block: clean, ~t/2 per row, ~t per row (iterations needed)
+        for errors in sorted({0, n * t // 2, n * t}):
+            received = corrupt(block, errors, rng)
+            cases.append((f"rs2d_decode[RS({n},{k}),e={errors}]", {"n": n, "k": k, "errors": errors},
+                          lambda rs=rs, received=received, n=n, k=k: rs.decode_codeword(received, n, k, 250), n * n))
+            cases.append((f"rs2d_decode_blocks[RS({n},{k}),e={errors}]", {"n": n, "k": k, "errors": errors},
+                          lambda rs=rs, received=received, n=n, k=k: rs.decode_blocks([received], n, k, 250), n * n))
+    return cases
+
+def mapping_cases():
+    cases = []
+    rng = make_rng(0, "benchmark", "mapping")
+    symbols = rng.integers(0, 1 << 16, SIGNAL_SIZE // 8)
+    bits = Binary.bit_encode(symbols.tolist(), 16)
+    bit_array = np.asarray(bits, dtype=np.uint8)
+
+    cases.append(("binary_encode", {}, lambda: Binary.bit_encode(symbols.tolist(), 16), len(symbols)))
+    cases.append(("binary_decode", {}, lambda: Binary.bit_decode(bits, 16), len(symbols)))
+    cases.append(("binary_encode_array", {}, lambda: Binary.bit_encode_array(symbols, 16), len(symbols)))
+    cases.append(("binary_decode_array", {}, lambda: Binary.bit_decode_array(bit_array, 16), len(symbols)))
+
+    for pam_level in PAM_LEVELS:
+        bits_per_block = GrayCode.get_gray_tables(pam_level)[0]
+        block_bits = bit_array[:len(bit_array) - len(bit_array) % bits_per_block]  # array form needs whole blocks
+        gray = GrayCode.gray_encode(bits, pam_level)
+        gray_array = GrayCode.gray_encode_array(block_bits, pam_level)
+        params = {"pam": pam_level}
+        cases.append((f"gray_encode[PAM{pam_level}]", params,
+                      lambda pam_level=pam_level: GrayCode.gray_encode(bits, pam_level), len(gray)))
+        cases.append((f"gray_decode[PAM{pam_level}]", params,
+                      lambda gray=gray, pam_level=pam_level: GrayCode.gray_decode(gray, pam_level), len(gray)))
+        cases.append((f"gray_encode_array[PAM{pam_level}]", params,
+                      lambda block_bits=block_bits, pam_level=pam_level: GrayCode.gray_encode_array(block_bits, pam_level), len(gray_array)))
+        cases.append((f"gray_decode_array[PAM{pam_level}]", params,
+                      lambda gray_array=gray_array, pam_level=pam_level: GrayCode.gray_decode_array(gray_array, pam_level), len(gray_array)))
+    return cases
+
+def noisy_signal(pam, name, size=SIGNAL_SIZE):
+    """PAM levels through the default channel with mild noise"""
+    rng = make_rng(0, "benchmark", name, pam.n)
+    levels = pam.modulate_array(rng.integers(0, pam.n, size))
+    signal = np.convolve(levels, CHANNEL_H, mode='same')
+    return signal + rng.normal(0, 1.0, size)
+
+def equalizer_cases():
+    cases = []
+    for pam_level in PAM_LEVELS:
+        pam = PAM(n=pam_level, symbol_separation=SYMBOL_SEPARATION)
+        params = {"pam": pam_level}
+        signal = noisy_signal(pam, "equalizer")
+        signal_list = signal.tolist()
+        dfe_taps = [1.0, 0.4]
+
+        cases.append((f"slicer_hard[PAM{pam_level}]", params,
+                      lambda signal_list=signal_list, pam_level=pam_level: Slicer.hard_slicer(signal_list, SYMBOL_SEPARATION, pam_level), len(signal)))
+        cases.append((f"slicer_hard_array[PAM{pam_level}]", params,
+                      lambda signal=signal, pam_level=pam_level: Slicer.hard_slicer_array(signal, SYMBOL_SEPARATION, pam_level), len(signal)))
+        cases.append((f"dfe_equalize[PAM{pam_level}]", params,
+                      lambda signal_list=signal_list, pam=pam: DFE(tap_weights=dfe_taps, pam=pam).equalize(signal_list), len(signal)))
+        cases.append((f"dfe_equalize_block[PAM{pam_level}]", params,
+                      lambda signal=signal, pam=pam: DFE(tap_weights=dfe_taps, pam=pam).equalize_block(signal), len(signal)))
+
+        short = signal_list[:SIGNAL_SIZE // 10]  # LMS is slow - fewer samples per call
+
+        def lms_call(short=short, pam=pam):
+            ffe = FFE(tap_weights=[0.0, 1.0, 0.0], n_pre_taps=1, n_post_taps=1)
+            dfe = DFE(tap_weights=list(dfe_taps), pam=pam)
+            return LMS(mu=1e-6, ffe=ffe, dfe=dfe, pam=pam).equalize(short)
+
+        cases.append((f"lms_equalize[PAM{pam_level}]", params, lms_call, len(short)))
+    return cases
+
+def error_model_cases():
+    cases = []
+    symbols = np.zeros(SIGNAL_SIZE, dtype=np.int64)
+    for iep, epf in [(1e-3, 0.5), (1e-2, 0.9)]:
+        params = {"iep": iep, "epf": epf}
+        cases.append((f"burst_error[iep={iep},epf={epf}]", params,
+                      lambda iep=iep, epf=epf: BurstError(iep, epf, make_rng(0, "benchmark", "burst")).inject(symbols), len(symbols)))
+        cases.append((f"gilbert_elliott_bits[iep={iep},epf={epf}]", params,
+                      lambda iep=iep, epf=epf: GilbertElliott(iep, 1 - epf, unit="bit", rng=make_rng(0, "benchmark", "burst")).inject(symbols[:SIGNAL_SIZE // 16]), len(symbols) // 16))
+    return cases
+
+def prbs_cases():
+    cases = []
+    for order in (7, 31, 63):
+        cases.append((f"prbs_words[PRBS{order}]", {"order": order},
+                      lambda order=order: PRBS(order).seek(10**9).words(SIGNAL_SIZE), SIGNAL_SIZE * 64))
+    return cases
+
+def end_to_end_cases(data_symbols):
+    cases = []
+    for pam_level in PAM_LEVELS:
+        for n, k in RS_CODES:
+            for streaming in (False, True):
+                argv = ["--mode", "1D", "--n", str(n), "--k", str(k), "--pam_levels", str(pam_level),
+                        "--snr_db", "30", "--seed", "1", "--continuous_mode",
+                        "--max_bit_errors", str(1 << 40), "--max_data_symbols", str(data_symbols)]
+                if streaming:
+                    argv.append("--streaming")
+                args = model.build_parser().parse_args(argv)
+                name = f"continuous{'_streaming' if streaming else ''}[PAM{pam_level},RS({n},{k})]"
+                params = {"pam": pam_level, "n": n, "k": k, "streaming": streaming}
+                cases.append((name, params, lambda args=args: model.run_continuous_mode(args), data_symbols))
+            # the same run at several SNR points in one pass (multisnr.py)
+            argv = ["--mode", "1D", "--n", str(n), "--k", str(k), "--pam_levels", str(pam_level),
+                    "--multi_snr", *MULTI_SNR_POINTS, "--seed", "1", "--continuous_mode",
+                    "--max_bit_errors", str(1 << 40), "--max_data_symbols", str(data_symbols)]
+            args = model.build_parser().parse_args(argv)
+            name = f"continuous_multi_snr[PAM{pam_level},RS({n},{k})]"
+            params = {"pam": pam_level, "n": n, "k": k, "points": len(MULTI_SNR_POINTS)}
+            cases.append((name, params, lambda args=args: model.run_multi_snr(args),
+                          data_symbols * len(MULTI_SNR_POINTS)))
+    return cases
+
+def all_cases(quick=False):
+    """(name, params, call, symbols per call) for every benchmark"""
+    return (rs1d_cases() + rs2d_cases() + mapping_cases() + equalizer_cases() + error_model_cases()
+            + prbs_cases() + end_to_end_cases(10000 if quick else 50000))
+
+def time_case(call, min_time, repeats):
+    """
+    Best seconds per call over `repeats` rounds, each round calling until min_time has passed
+    (a round longer than LONG_ROUND is not repeated)
+
+    Returns:
+        (seconds per call, calls in the best round)
+    """
+    best = None
+    for _ in range(repeats):
+        calls = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while calls == 0 or elapsed < min_time:
+            call()
+            calls += 1
+            elapsed = time.perf_counter() - start
+        per_call = elapsed / calls
+        if best is None or per_call < best[0]:
+            best = (per_call, calls)
+        if elapsed > LONG_ROUND:
+            break
+    return best
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def environment():
+    import reedsolo
+    import scipy
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "reedsolo": getattr(reedsolo, "__version__", None),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count()
+    }
+
+def run_benchmarks(cases, min_time, repeats):
+    """Time every case and return {name: result}"""
+    results = {}
+    for name, params, call, symbols in cases:
+        # the simulator prints a lot (debug output) - keep it out of the timings and the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds, calls = time_case(call, min_time, repeats)
+        results[name] = {
+            "params": params,
+            "symbols_per_call": symbols,
+            "seconds_per_call": seconds,
+            "symbols_per_sec": symbols / seconds,
+            "calls": calls
+        }
+        print(f"  {name:<48}{symbols / seconds:>16,.0f} symbols/s")
+    return results
+
+def load_runs(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def find_baseline(runs, reference):
+    """Last stored run with the given label, or the last run for 'previous'"""
+    for run in reversed(runs):
+        if reference == "previous" or run.get("label") == reference:
+            return run
+    return None
+
+def compare(results, baseline):
+    """Print speed ratio vs baseline for every common case and flag regressions"""
+    print(f"Compared with run {baseline['timestamp']} (label {baseline.get('label')}, commit {baseline.get('commit')}):")
+    regressions = 0
+    for name, result in results.items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["symbols_per_sec"] / baseline["results"][name]["symbols_per_sec"]
+        flag = "  REGRESSION" if ratio < REGRESSION_RATIO else ""
+        regressions += bool(flag)
+        print(f"  {name:<48}{ratio:>8.2f}x{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput benchmarks (symbols/sec) of the simulator hot functions',
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--filter', type=str, default=None, help='Only run cases whose name contains this')
+    parser.add_argument('--quick', action='store_true', help='Shorter timings and end-to-end runs')
+    parser.add_argument('--min_time', type=float, default=None, help='Minimum seconds per timing round')
+    parser.add_argument('--repeats', type=int, default=None, help='Timing rounds per case (best is kept)')
+    parser.add_argument('--label', type=str, default=None, help='Name stored with this run (for --compare)')
+    parser.add_argument('--compare', type=str, default=None,
+                        help="Compare with the last run with this label ('previous' = last stored run)")
+    parser.add_argument('--no_save', action='store_true', help='Do not append this run to the results file')
+    parser.add_argument('--output_dir', type=str, default=BENCHMARK_DIR, help='Where results are stored')
+    parser.add_argument('--list', action='store_true', help='List the benchmark cases and exit')
+    args = parser.parse_args()
+
+    cases = all_cases(args.quick)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case[0]]
+
+    if args.list:
+        for name, _, _, symbols in cases:
+            print(f"{name} ({symbols} symbols per call)")
+        return
+
+    min_time = args.min_time if args.min_time is not None else (0.05 if args.quick else 0.5)
+    repeats = args.repeats if args.repeats is not None else (1 if args.quick else 3)
+
+    path = os.path.join(args.output_dir, RESULTS_FILE)
+    runs = load_runs(path)
+    baseline = find_baseline(runs, args.compare) if args.compare else None
+    if args.compare and baseline is None:
+        print(f"No stored run matches '{args.compare}' in {path}")
+        sys.exit(1)
+
+    print(f"Running {len(cases)} benchmark cases (min {min_time} s x {repeats} repeats)")
+    results = run_benchmarks(cases, min_time, repeats)
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "label": args.label,
+        "commit": git_commit(),
+        "quick": args.quick,
+        "min_time": min_time,
+        "repeats": repeats,
+        "environment": environment(),
+        "results": results
+    }
+    if not args.no_save:
+        os.makedirs(args.output_dir, exist_ok=True)
+        with open(path, 'a') as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Results appended to {path}")
+
+    if baseline is not None and compare(results, baseline):
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Shared-memory buffer pool for handing arrays between processes
+
+Pickling large sample / symbol arrays through multiprocessing queues copies
+them into a pipe, copies them out again on the other side and keeps both
+copies alive for a while. Here the data lives in fixed-size blocks of one
+multiprocessing.shared_memory segment; only small (block id, length)
+descriptors go through the queue:
+
+    producer: acquire a free block -> write rows into it -> send (block id, length)
+    consumer: receive descriptor -> numpy view onto the block (no copy) -> release
+
+Released blocks go back on the pool's free list, so memory is bounded by the
+pool size and a fast producer waits for a slow consumer (back-pressure).
+"""
+
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+
+import numpy as np
+
+POLL_INTERVAL = 0.1  # seconds between stop checks while waiting
+
+def _wait(get, stop, timeout=None):
+    """
+    Blocking queue get that gives up (returns False, None) once stop is set
+
+    Raises TimeoutError if nothing arrives within timeout seconds (None waits forever)
+    """
+    waited = 0.0
+    while True:
+        try:
+            return True, get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if stop is not None and stop.is_set():
+                return False, None
+            waited += POLL_INTERVAL
+            if timeout is not None and waited >= timeout:
+                raise TimeoutError(f"nothing received for {timeout:g} s")
+
+class BufferPool:
+    def __init__(self, n_blocks, block_bytes, ctx=None):
+        """
+        Fixed-size blocks in one shared-memory segment with a process-safe free list
+
+        n_blocks: number of blocks
+        block_bytes: size of each block in bytes
+        ctx: multiprocessing context (default context if None)
+        """
+        ctx = ctx or mp.get_context()
+        self.n_blocks = n_blocks
+        self.block_bytes = block_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, n_blocks * block_bytes))
+        self.free = ctx.Queue()
+        for block_id in range(n_blocks):
+            self.free.put(block_id)
+        self.owner = True
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['shm']
+        state['shm_name'] = self.shm.name
+        return state
+
+    def __setstate__(self, state):
+        shm_name = state.pop('shm_name')
+        self.__dict__.update(state)
+        self.shm = shared_memory.SharedMemory(name=shm_name)
+        self.owner = False
+
+    def acquire(self, stop=None):
+        """
+        Take a free block, waiting until one is released
+
+        Returns:
+            block id, or None if stop was set while waiting
+        """
+        ok, block_id = _wait(self.free.get, stop)
+        return block_id if ok else None
+
+    def release(self, block_id):
+        """Give a block back to the free list"""
+        self.free.put(block_id)
+
+    def view(self, block_id, dtype, shape):
+        """numpy array on the block memory (no copy) - only valid until the block is released"""
+        dtype = np.dtype(dtype)
+        if int(np.prod(shape)) * dtype.itemsize > self.block_bytes:
+            raise ValueError(f"{shape} {dtype} array does not fit in a {self.block_bytes} byte block")
+        offset = block_id * self.block_bytes
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)
+
+    def close(self):
+        """Detach (and free the shared memory if this is the creating process)"""
+        self.free.cancel_join_thread()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+class BlockChannel:
+    def __init__(self, n_blocks, max_rows, width, dtype=np.float64, ctx=None):
+        """
+        FIFO of 2D arrays between two processes, data in a BufferPool and only
+        (block id, length) descriptors in the queue
+
+        n_blocks: pool blocks (how far the producer may run ahead)
+        max_rows: maximum rows per block
+        width: elements per row
+        dtype: element type
+        ctx: multiprocessing context
+        """
+        ctx = ctx or mp.get_context()
+        self.max_rows = max_rows
+        self.width = width
+        self.dtype = np.dtype(dtype)
+        self.pool = BufferPool(n_blocks, max_rows * width * self.dtype.itemsize, ctx)
+        self.descriptors = ctx.Queue()
+
+    def send(self, rows, stop=None):
+        """
+        Copy up to max_rows rows into a free block and queue its descriptor
+
+        Returns:
+            False if stop was set while waiting for a free block
+        """
+        rows = np.asarray(rows).reshape(-1, self.width)
+        if len(rows) > self.max_rows:
+            raise ValueError(f"{len(rows)} rows do not fit in a block of {self.max_rows} rows")
+        block_id = self.pool.acquire(stop)
+        if block_id is None:
+            return False
+        self.pool.view(block_id, self.dtype, (len(rows), self.width))[:] = rows
+        self.descriptors.put((block_id, len(rows)))
+        return True
+
+    def send_all(self, rows, stop=None):
+        """Send any number of rows, split over as many blocks as needed"""
+        rows = np.asarray(rows).reshape(-1, self.width)
+        for start in range(0, len(rows), self.max_rows):
+            if not self.send(rows[start:start + self.max_rows], stop):
+                return False
+        return True
+
+    def end(self):
+        """Mark the end of the stream"""
+        self.descriptors.put(None)
+
+    def receive(self, stop=None, timeout=None):
+        """
+        Next block as a zero-copy view - pass the block id to release() when done
+
+        timeout: seconds to wait before raising TimeoutError (None waits forever)
+
+        Returns:
+            (block_id, rows) or None at the end of the stream / when stopped
+        """
+        ok, descriptor = _wait(self.descriptors.get, stop, timeout)
+        if not ok or descriptor is None:
+            return None
+        block_id, length = descriptor
+        return block_id, self.pool.view(block_id, self.dtype, (length, self.width))
+
+    def release(self, block_id):
+        self.pool.release(block_id)
+
+    def blocks(self, stop=None):
+        """
+        Yield the received blocks as views; each block is released when the
+        next one is requested (or the generator is closed), so a consumer must
+        copy anything it keeps longer than one step
+        """
+        while True:
+            received = self.receive(stop)
+            if received is None:
+                return
+            block_id, rows = received
+            try:
+                yield rows
+            finally:
+                self.release(block_id)
+
+    def close(self):
+        self.descriptors.cancel_join_thread()
+        self.pool.close()
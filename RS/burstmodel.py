@@ -0,0 +1,300 @@
+"""
+DFE error-propagation burst model: measure once, then simulate error patterns only
+
+At low BER almost all the time of a continuous-mode run goes into the
+channel, FFE and DFE of symbols that come out right. Here that chain is run
+once per (SNR, PAM level, equalizer taps, code): the coded stream goes through
+the same streaming stages as stream.link, and the XOR of transmitted and
+received RS symbols gives the pre-FEC error process the decoder sees, DFE error
+propagation included. From it:
+
+- BurstStatistics counts, per symbol class, the error / no-error transitions
+  between consecutive RS symbols and the error values (bit patterns), plus the
+  burst-length histogram. The classes are data and parity symbols: data
+  symbols (0..225, upper byte zero) give other PAM patterns than the random
+  16-bit parity symbols and are hit less often
+- BurstModel is the fitted two-state (semi-)Markov model on the error flags:
+  a burst starts with p = P(error | previous correct) for the class of the
+  symbol, and its length is drawn from the measured burst-length histogram,
+  plus the error value distribution per class. A plain first-order chain
+  (geometric burst lengths) is not enough: with the DFE feedback a burst
+  rarely spans more than two RS symbols, and the geometric tail over-predicts
+  the codewords with many errors that the decoder cannot correct
+
+Measurement and fit are cached as JSON under ./cache/burst_models, keyed by
+the configuration hash (store.config_hash).
+
+The simulation then only draws error patterns (error.burst_flags). RS codes
+are linear and the decoders depend on the syndrome only, so decoding codeword
++ e gives codeword + decode(0 + e). Decoding the all-zero codeword plus the
+model's error pattern gives the residual errors after FEC directly, with no
+data, encoding, modulation or equalizer. Blocks have the same layout as
+stream.link blocks (all-zero tx), so model.py counts them the same way.
+"""
+
+import copy
+import json
+import os
+from itertools import tee
+
+import numpy as np
+
+from error import add_counts, burst_flags, error_runs
+from errorcount import POPCOUNT16, SYMBOL_BITS
+from reedsolomon import ReedSolomon2D
+from rng import make_rng
+from store import config_hash
+from stream import RowQueue, channel, demodulate, equalize, frame, messages, modulate, rs_encode, source_blocks
+
+DEFAULT_CACHE_DIR = "./cache/burst_models"
+
+CLASSES = ("data", "parity")
+
+def symbol_classes(rs, n, k, codeword_size):
+    """Class index (CLASSES) of every symbol position of a codeword / flattened 2D block"""
+    if rs is None:
+        return np.zeros(codeword_size, dtype=np.int64)
+    if isinstance(rs, ReedSolomon2D):
+        rows, cols = np.divmod(np.arange(codeword_size), n)
+        return ((rows >= rs.k2) | (cols >= k)).astype(np.int64)
+    return (np.arange(codeword_size) >= k).astype(np.int64)
+
+class BurstStatistics:
+    def __init__(self, classes):
+        """
+        Pre-FEC RS symbol error statistics of one stream (whole codewords added in order)
+
+        classes: class index of every position of a codeword (symbol_classes)
+        """
+        self.classes = np.asarray(classes, dtype=np.int64)
+        self.symbols = 0
+        self.errors = 0
+        self.bit_errors = 0
+        # [class of the symbol][previous symbol in error][symbol in error]
+        self.transitions = np.zeros((len(CLASSES), 2, 2), dtype=np.int64)
+        self.value_counts = np.zeros((len(CLASSES), 1 << SYMBOL_BITS), dtype=np.int64)
+        self.burst_histogram = np.zeros(1, dtype=np.int64)  # index = consecutive symbol errors
+        self.last_error = False
+        self.open_burst = 0
+
+    def update(self, xor):
+        """Add the XOR of transmitted and received codewords, shape (rows, codeword size)"""
+        xor = np.asarray(xor, dtype=np.int64)
+        if xor.size == 0:
+            return
+        classes = np.broadcast_to(self.classes, xor.shape).ravel()
+        xor = xor.ravel()
+        errors = xor != 0
+        previous = np.concatenate([[self.last_error], errors[:-1]])
+        np.add.at(self.transitions, (classes, previous.astype(np.int64), errors.astype(np.int64)), 1)
+        np.add.at(self.value_counts, (classes[errors], xor[errors]), 1)
+        self.last_error = bool(errors[-1])
+
+        lengths, self.open_burst = error_runs(errors, self.open_burst)
+        self.burst_histogram = add_counts(self.burst_histogram, lengths)
+        self.symbols += len(xor)
+        self.errors += int(errors.sum())
+        self.bit_errors += int(POPCOUNT16[xor].sum(dtype=np.int64))
+
+    def summary(self):
+        """JSON serialisable counters (error values as sparse value / count lists per class)"""
+        histogram = add_counts(self.burst_histogram.copy(), [self.open_burst] if self.open_burst else [])
+        values = [np.flatnonzero(counts) for counts in self.value_counts]
+        return {
+            "symbols": self.symbols,
+            "errors": self.errors,
+            "bit_errors": self.bit_errors,
+            "ser": self.errors / self.symbols if self.symbols else 0.0,
+            "ber": self.bit_errors / (self.symbols * SYMBOL_BITS) if self.symbols else 0.0,
+            "classes": self.classes.tolist(),
+            "transitions": self.transitions.tolist(),
+            "burst_histogram": histogram.tolist(),
+            "error_values": [v.tolist() for v in values],
+            "error_value_counts": [counts[v].tolist() for counts, v in zip(self.value_counts, values)]
+        }
+
+class BurstModel:
+    def __init__(self, statistics, key=None):
+        """
+        statistics: BurstStatistics.summary() of the measured stream
+        key: configuration the statistics were measured for (kept in the cache file)
+        """
+        self.statistics = statistics
+        self.key = key or {}
+        self.classes = np.asarray(statistics["classes"], dtype=np.int64)
+        transitions = np.asarray(statistics["transitions"], dtype=float)
+        after_correct = transitions[:, 0, :].sum(axis=1)
+        self.p = np.divide(transitions[:, 0, 1], after_correct, out=np.zeros(len(CLASSES)), where=after_correct > 0)
+        histogram = np.asarray(statistics["burst_histogram"], dtype=float)
+        if histogram.sum() == 0:
+            histogram = np.array([0.0, 1.0])  # no errors measured (p = 0): any pmf
+        self.length_pmf = histogram / histogram.sum()
+
+        self.values = [np.asarray(values, dtype=np.int64) for values in statistics["error_values"]]
+        self.value_probabilities = [np.asarray(counts, dtype=float) / max(sum(counts), 1)
+                                    for counts in statistics["error_value_counts"]]
+
+    def flags(self, rng, codewords, end=-1):
+        """
+        Error flags of `codewords` consecutive codewords, shape (codewords, codeword size)
+
+        end: burst end carried over from the previous call (error.burst_flags)
+        Returns (flags, end)
+        """
+        flags, end = burst_flags(rng, self.p[np.tile(self.classes, codewords)], self.length_pmf, end)
+        return flags.reshape(codewords, -1), end
+
+    def error_values(self, rng, flags):
+        """XOR error pattern for the error flags, values drawn from the measured distribution of each class"""
+        received = np.zeros(flags.shape, dtype=np.int64)
+        classes = np.broadcast_to(self.classes, flags.shape)
+        for c, (values, probabilities) in enumerate(zip(self.values, self.value_probabilities)):
+            hit = flags & (classes == c)
+            count = int(hit.sum())
+            if count and len(values):
+                received[hit] = rng.choice(values, size=count, p=probabilities)
+        return received
+
+    def sample_statistics(self, rng, codewords):
+        """BurstStatistics of a stream drawn from the model (compare with the measured ones)"""
+        statistics = BurstStatistics(self.classes)
+        flags, _ = self.flags(rng, codewords)
+        statistics.update(self.error_values(rng, flags))
+        return statistics
+
+    @property
+    def ser(self):
+        """Measured pre-FEC RS symbol error rate"""
+        return self.statistics["ser"]
+
+    def to_dict(self):
+        return {"key": self.key, "p": self.p.tolist(), "length_pmf": self.length_pmf.tolist(), "statistics": self.statistics}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["statistics"], data.get("key"))
+
+    def describe(self):
+        stats = self.statistics
+        onsets = ", ".join(f"{name} p={p:.3e}" for name, p in zip(CLASSES, self.p))
+        mean_length = float(np.arange(len(self.length_pmf)) @ self.length_pmf)
+        return (f"pre-FEC SER {stats['ser']:.3e}, BER {stats['ber']:.3e} from {stats['symbols']} RS symbols "
+                f"({stats['errors']} errors); burst onsets {onsets}, mean burst length {mean_length:.3f}")
+
+def measure(seed, pam, h, sigma, ffe, dfe, rs, n, k, message_size, codeword_size, symbols, block_size=10000,
+            prbs=None):
+    """
+    Pre-FEC error statistics of the coded streaming link (fixed equalizer taps)
+
+    Args:
+        seed: root seed of the measurement streams (rng.py)
+        pam, h, sigma: modulation, channel response and noise
+        ffe, dfe: trained equalizers (copied - the caller's DFE state is not touched);
+                  None for raw hard slicing
+        rs, n, k: RS codec (None for raw) - the stream is coded as in the real run
+        message_size / codeword_size: data / coded symbols per codeword
+        symbols: RS symbols to measure
+        block_size: data symbols per source block
+        prbs: PRBS data source (prbs.py, None = random data)
+    Returns:
+        BurstStatistics
+    """
+    ffe, dfe = copy.deepcopy(ffe), copy.deepcopy(dfe)
+    data_symbols = max(message_size, symbols * message_size // codeword_size)
+    frames = frame(source_blocks(seed, block_size, data_symbols, prbs=prbs), message_size)
+    codewords_tx, codewords_ref = tee(rs_encode(frames, rs, n, k))
+
+    samples = channel(modulate(codewords_tx, pam), h, sigma, seed)
+    received = demodulate(equalize(samples, ffe, dfe, pam), pam.n, codeword_size)
+
+    statistics = BurstStatistics(symbol_classes(rs, n, k, codeword_size))
+    transmitted = RowQueue(codewords_ref)
+    for rows in received:
+        statistics.update(transmitted.pop(len(rows)) ^ rows)
+    return statistics
+
+def cache_path(key, cache_dir=DEFAULT_CACHE_DIR):
+    return os.path.join(cache_dir, f"{config_hash(key)}.json")
+
+def load_or_measure(key, measure_statistics, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Cached burst model for a configuration
+
+    Args:
+        key: JSON serialisable configuration (SNR / sigma, PAM level, taps, code, measured symbols)
+        measure_statistics: callable returning BurstStatistics, run on a cache miss
+        cache_dir: cache directory (None or '' = no caching)
+    Returns:
+        (BurstModel, cached) - cached is True if the model came from the cache
+    """
+    path = cache_path(key, cache_dir) if cache_dir else None
+    if path and os.path.exists(path):
+        with open(path, 'r') as f:
+            return BurstModel.from_dict(json.load(f)), True
+
+    model = BurstModel(measure_statistics().summary(), key)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(model.to_dict(), f)
+    return model, False
+
+def simulate(model, seed, rows_per_block, message_size, rs=None, n=None, k=None, max_iterations=np.inf):
+    """
+    Error-pattern-only link driven by a burst model (endless, stop by closing)
+
+    Args:
+        model: BurstModel (its class layout fixes the codeword size)
+        seed: root seed (error flags and values use the ("burst_model", ...) streams)
+        rows_per_block: codewords per yielded block
+        message_size: data symbols per codeword
+        rs, n, k: RS codec (None for raw) - decoded with the batched decode_blocks
+        max_iterations: 2D iteration cap
+    Yields:
+        dicts like stream.link blocks: all-zero 'tx_messages' / 'tx_codewords', the
+        error patterns as 'rx_codewords', the decoder residuals as
+        'corrected_codewords' / 'rx_messages', and 'failed'
+    """
+    flag_rng = make_rng(seed, "burst_model", "flags")
+    value_rng = make_rng(seed, "burst_model", "values")
+    end = -1
+    while True:
+        flags, end = model.flags(flag_rng, rows_per_block, end)
+        received = model.error_values(value_rng, flags)
+
+        if rs is None:
+            corrected, failed = received, np.zeros(rows_per_block, dtype=bool)
+        elif isinstance(rs, ReedSolomon2D):
+            corrected, failed, _ = rs.decode_blocks(received, n, k, max_iterations)
+        else:
+            corrected, failed = rs.decode_blocks(received, n, k)
+
+        yield {
+            'tx_messages': np.zeros((rows_per_block, message_size), dtype=np.int64),
+            'rx_messages': messages(corrected, rs, n, k),
+            'tx_codewords': np.zeros_like(received),
+            'rx_codewords': received,
+            'corrected_codewords': corrected,
+            'failed': failed
+        }
+
+def print_comparison(model, label, measured, full, seed=0):
+    """
+    Burst model vs full simulation
+
+    Args:
+        measured, full: ErrorCounter.stats() of the burst model run and the full link run
+    """
+    print(f"Burst model validation ({label}):")
+    for name, result in (("burst model", measured), ("full simulation", full)):
+        print(f"  {name:<16} BER: {result['ber']:.3e} ({result['bit_errors']} errors in {result['total_bits']} bits)"
+              f"  SER: {result['ser']:.3e}")
+    if full["ber"] > 0 and measured["ber"] > 0:
+        print(f"  BER ratio (model / full): {measured['ber'] / full['ber']:.3f}")
+
+    stats = model.statistics
+    codewords = max(1, stats["symbols"] // len(model.classes))
+    sampled = model.sample_statistics(make_rng(seed, "burst_model", "validate"), codewords).summary()
+    print(f"  Pre-FEC SER measured {stats['ser']:.3e}, model {sampled['ser']:.3e}")
+    print(f"  Burst lengths 1..7 measured: {stats['burst_histogram'][1:8]}")
+    print(f"  Burst lengths 1..7 model:    {sampled['burst_histogram'][1:8]}")
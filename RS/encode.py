@@ -1,3 +1,5 @@
+import numpy as np
+
 class GrayCode:
     @staticmethod
     def _get_gray_mapping(n_levels):
@@ -125,6 +127,68 @@ class GrayCode:
         else:
             raise NotImplementedError(f"Gray coding for {n_levels}-PAM is not implemented yet. Supported: 4, 6, 8-PAM.")
 
+    @staticmethod
+    def get_gray_tables(n_levels):
+        """
+        Array form of the gray mapping for vectorized encoding/decoding
+
+        Returns:
+            (bits_per_block, symbols_per_block, encode_table, decode_table)
+            - encode_table[i]: symbols for the bit block whose value (MSB first) is i
+            - decode_table[j]: bits for the symbol block whose base-n value (first symbol most significant) is j
+              (invalid symbol combinations decode to all zeros, like gray_decode)
+        """
+        gray_map, gray_map_inv = GrayCode._get_gray_mapping(n_levels)
+        bits_per_block = len(next(iter(gray_map)))
+        symbols_per_block = len(next(iter(gray_map.values())))
+
+        encode_table = np.zeros((1 << bits_per_block, symbols_per_block), dtype=np.int64)
+        for bits, symbols in gray_map.items():
+            encode_table[int("".join(map(str, bits)), 2)] = symbols
+
+        decode_table = np.zeros((n_levels ** symbols_per_block, bits_per_block), dtype=np.uint8)
+        for symbols, bits in gray_map_inv.items():
+            index = 0
+            for symbol in symbols:
+                index = index * n_levels + symbol
+            decode_table[index] = bits
+
+        return bits_per_block, symbols_per_block, encode_table, decode_table
+
+    @staticmethod
+    def gray_encode_array(bits, n_levels=4):
+        """
+        Vectorized gray encoding (no padding)
+
+        Args:
+            bits: array of bits, length a multiple of the block size (2, 5 or 3 bits for 4/6/8-PAM)
+            n_levels: number of PAM levels
+
+        Returns:
+            int64 array of gray symbols
+        """
+        bits_per_block, _, encode_table, _ = GrayCode.get_gray_tables(n_levels)
+        weights = 1 << np.arange(bits_per_block - 1, -1, -1)
+        index = np.asarray(bits, dtype=np.int64).reshape(-1, bits_per_block) @ weights
+        return encode_table[index].ravel()
+
+    @staticmethod
+    def gray_decode_array(gray_symbols, n_levels=4):
+        """
+        Vectorized gray decoding (no padding)
+
+        Args:
+            gray_symbols: array of symbols, length a multiple of the block size (2 for 6-PAM, else 1)
+            n_levels: number of PAM levels
+
+        Returns:
+            uint8 array of bits
+        """
+        _, symbols_per_block, _, decode_table = GrayCode.get_gray_tables(n_levels)
+        symbols = np.clip(np.asarray(gray_symbols, dtype=np.int64), 0, n_levels - 1).reshape(-1, symbols_per_block)
+        weights = n_levels ** np.arange(symbols_per_block - 1, -1, -1)
+        return decode_table[symbols @ weights].ravel()
+
     @staticmethod
     def gray_encode(bits, n_levels=4):
         """
@@ -265,4 +329,16 @@ class Binary:
             for bit_pos in range(bits_per_symbol):
                 symbol = (symbol << 1) | padded_bits[i + bit_pos]
             decoded_data.append(symbol)
-        return decoded_data
\ No newline at end of file
+        return decoded_data
+
+    @staticmethod
+    def bit_encode_array(data, bits_per_symbol=16):
+        """Vectorized bit_encode: array of symbols -> uint8 array of bits (MSB first)"""
+        shifts = np.arange(bits_per_symbol - 1, -1, -1)
+        return ((np.asarray(data, dtype=np.int64)[:, None] >> shifts) & 1).astype(np.uint8).ravel()
+
+    @staticmethod
+    def bit_decode_array(encoded_bits, bits_per_symbol=16):
+        """Vectorized bit_decode: bits (length a multiple of bits_per_symbol) -> int64 array of symbols"""
+        weights = 1 << np.arange(bits_per_symbol - 1, -1, -1)
+        return np.asarray(encoded_bits, dtype=np.int64).reshape(-1, bits_per_symbol) @ weights
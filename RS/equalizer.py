@@ -1,8 +1,12 @@
+import bisect
 import numpy as np
 import scipy as sp
 
 from slicer import Slicer
 from pam import PAM
+from eventlog import get_logger
+
+log = get_logger("equalizer")
 
 # mu
 # 0.0000001 (low 69 and 102)
@@ -31,8 +35,8 @@ class LMS:
         dfe_tw = np.array(self.dfe.tap_weights[1:]) # skip the main cursor tap
         dfe_n_taps = len(dfe_tw)                    # no cursor
 
-        print("FFE Tap Weights B4:", ffe_tw)
-        print("DFE Tap Weights B4:", dfe_tw)
+        if log.debug_enabled:
+            log.debug("lms_start", ffe_taps=ffe_tw, dfe_taps=dfe_tw, symbols=len(data))
 
         # lms on weights
         """
@@ -77,8 +81,8 @@ class LMS:
 
             # print(f"mu: {self.mu}, e[{i}]: {e[i]}, ffe_i: {ffe_i}, dfe_i: {dfe_i}")
 
-        print("FFE Tap Weights Aft:", ffe_tw)
-        print("DFE Tap Weights Aft:", dfe_tw)
+        if log.debug_enabled:
+            log.debug("lms_done", ffe_taps=ffe_tw, dfe_taps=dfe_tw, mean_sq_error=float(np.mean(e ** 2)) if N else 0.0)
 
         self.ffe.tap_weights = ffe_tw.tolist()
         self.dfe.tap_weights = [1] + dfe_tw.tolist()  # keep the main cursor tap as 1
@@ -132,7 +136,8 @@ class FFE:
         x /= x[n_pre_cursors]
         x = x.flatten().tolist()
 
-        print("FFE Tap Weights:", x)
+        if log.debug_enabled:
+            log.debug("ffe_zero_forcing", taps=x)
         self.tap_weights = x
 
 class DFE:
@@ -162,4 +167,32 @@ class DFE:
             # update previous symbols buffer
             self.prev_symbols = [symbol_out] + self.prev_symbols[:-1]
         
-        return decisions
\ No newline at end of file
+        return decisions
+
+    def equalize_block(self, data):
+        """
+        Same as equalize, for one block of a stream: previous decisions carry
+        over between calls and the slicer is a threshold search on plain floats.
+
+        Returns:
+            int64 array of symbol decisions
+        """
+        levels = [self.pam.get_level(i) for i in range(self.pam.n)]
+        thresholds = [(a + b) / 2 for a, b in zip(levels[:-1], levels[1:])]
+        taps = [float(w) for w in self.tap_weights]
+        cursor, post_taps = taps[0], taps[1:]
+        prev_levels = [self.pam.get_level(symbol) for symbol in self.prev_symbols]
+
+        decisions = np.empty(len(data), dtype=np.int64)
+        for i, symbol in enumerate(np.asarray(data, dtype=float).tolist()):
+            equalized_signal = symbol * cursor
+            for tap, level in zip(post_taps, prev_levels):
+                equalized_signal -= tap * level
+
+            symbol_out = bisect.bisect_left(thresholds, equalized_signal)
+            decisions[i] = symbol_out
+            prev_levels = [levels[symbol_out]] + prev_levels[:-1]
+
+        if len(data) > 0:
+            self.prev_symbols = [levels.index(level) for level in prev_levels]
+        return decisions
@@ -1,4 +1,8 @@
-import random
+import numpy as np
+
+from eventlog import get_logger
+
+log = get_logger("error")
 
 # if MODE == "1D":
 #     global_index = N * current_index + i
@@ -7,11 +11,12 @@ import random
 
 class ErrorHelpers():
 
-    def __init__(self, e, MODE="1D", N=255, N_ERR=10):
+    def __init__(self, e, MODE="1D", N=255, N_ERR=10, rng=None):
         self.e = e          # error model
         self.MODE = MODE
         self.N = N
         self.N_ERR = N_ERR
+        self.rng = rng if rng is not None else np.random.default_rng()  # numpy Generator for error positions
 
     @staticmethod
     def inject_error(value):
@@ -35,9 +40,9 @@ class ErrorHelpers():
 
         if method == "random":
             for _ in range(self.N_ERR * mult):
-                idx = random.randint(0, self.N * mult - 1)
+                idx = int(self.rng.integers(0, self.N * mult))
                 # introduce an error by flipping a bit
-                encoded_data[idx] ^= 1 << random.randint(0, 7)
+                encoded_data[idx] ^= 1 << int(self.rng.integers(0, 8))
             # if MODE == "1D":
             #     encoded_data = bytes(encoded_data)
             # elif MODE == "2D":
@@ -47,43 +52,300 @@ class ErrorHelpers():
             
         return encoded_data
 
+NEVER = 1 << 40  # dwell time of a state that is never left
+
+class GilbertElliott():
+    def __init__(self, p, r, e_bad=1.0, e_good=0.0, unit="symbol", bits=16, rng=None):
+        """
+        Gilbert-Elliott burst error channel: a good / bad two-state Markov chain
+        stepped once per symbol (or bit), with error probability e_good / e_bad
+        in each state.
+
+        Instead of drawing per symbol, the dwell times in each state are drawn
+        directly (geometric with p / r) and the errors applied in bulk, so the
+        cost per chunk is a few numpy calls plus one per batch of runs. The
+        state and the unfinished run carry over between calls.
+
+        :param p: Probability good -> bad per step (mean good run 1/p).
+        :param r: Probability bad -> good per step (mean burst 1/r).
+        :param e_bad: Error probability in the bad state.
+        :param e_good: Error probability in the good state.
+        :param unit: "symbol" (a step is a symbol, errors XOR a random non-zero
+                     bits-wide value) or "bit" (a step is one bit of the bits-wide
+                     symbols, errors flip that bit).
+        :param bits: Bits per symbol.
+        :param rng: numpy Generator.
+        """
+        if unit not in ("symbol", "bit"):
+            raise ValueError("unit must be 'symbol' or 'bit'.")
+        self.p = p
+        self.r = r
+        self.e_bad = e_bad
+        self.e_good = e_good
+        self.unit = unit
+        self.bits = bits
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.reset()
+
+    def reset(self):
+        """Back to the good state, clear the statistics."""
+        self.bad = False    # state of the last step
+        self.remaining = None  # steps left in the current run (None: not drawn yet)
+        self.open_burst = 0    # length of the error run still open at the end of the last call
+        self.steps = 0
+        self.errors = 0
+        self.burst_histogram = np.zeros(1, dtype=np.int64)  # index = length of a run of consecutive errors
+        self.state_histogram = np.zeros(1, dtype=np.int64)  # index = length of a finished bad-state run
+        self.bad_run = 0
+        return self
+
+    def run_lengths(self, bad, size):
+        """size dwell times of the given state (a never-left state lasts forever)"""
+        leave = self.r if bad else self.p
+        if leave <= 0:
+            return np.full(size, NEVER, dtype=np.int64)
+        return self.rng.geometric(leave, size).astype(np.int64)
+
+    def states(self, n):
+        """Bad-state flags of the next n steps (carrying the state between calls)"""
+        lengths = []
+        first_bad = []
+        covered = 0
+        if self.remaining is None:
+            # the step before the first one was good: the first good run may be empty
+            self.remaining = int(self.run_lengths(False, 1)[0]) - 1
+        continued = self.remaining > 0
+        if continued:
+            lengths.append(np.array([self.remaining], dtype=np.int64))
+            first_bad.append(self.bad)
+            covered = self.remaining
+
+        bad = not self.bad
+        while covered < n:
+            # alternate runs starting in state `bad`, drawn in batches
+            mean_pair = (1 / self.p if self.p > 0 else n) + (1 / self.r if self.r > 0 else n)
+            pairs = int((n - covered) / mean_pair) + 8
+            runs = np.empty(2 * pairs, dtype=np.int64)
+            runs[0::2] = self.run_lengths(bad, pairs)
+            runs[1::2] = self.run_lengths(not bad, pairs)
+            lengths.append(runs)
+            first_bad.append(bad)
+            covered += int(np.minimum(runs, n).sum())
+
+        # flatten to (state, length) runs and cut at n
+        run_states = np.concatenate([(np.arange(len(runs)) % 2 == 0) == start for runs, start in zip(lengths, first_bad)])
+        run_lengths = np.concatenate(lengths)
+        ends = np.cumsum(run_lengths)
+        last = int(np.searchsorted(ends, n))  # run containing step n - 1
+        run_lengths = run_lengths[:last + 1].copy()
+        self.remaining = int(ends[last] - n)
+        run_lengths[-1] -= self.remaining
+        run_states = run_states[:last + 1]
+        self.bad = bool(run_states[-1])
+
+        self.update_state_histogram(run_states, run_lengths, continued)
+        return np.repeat(run_states, run_lengths)
+
+    def update_state_histogram(self, run_states, run_lengths, continued):
+        """Add the finished bad runs (the last one may continue in the next call)"""
+        bad_lengths = run_lengths[run_states].copy()
+        if continued and run_states[0]:
+            bad_lengths[0] += self.bad_run  # continues the run left open by the last call
+        self.bad_run = 0
+        if run_states[-1] and self.remaining > 0:
+            self.bad_run = int(bad_lengths[-1])
+            bad_lengths = bad_lengths[:-1]
+        self.state_histogram = add_counts(self.state_histogram, bad_lengths)
+
+    def error_mask(self, n):
+        """Error flags of the next n steps"""
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+        bad = self.states(n)
+        errors = np.zeros(n, dtype=bool)
+        for in_state, probability in ((bad, self.e_bad), (~bad, self.e_good)):
+            positions = np.flatnonzero(in_state)
+            if probability >= 1:
+                errors[positions] = True
+            elif probability > 0 and len(positions):
+                errors[positions[self.rng.random(len(positions)) < probability]] = True
+        self.steps += n
+        self.errors += int(errors.sum())
+        self.update_burst_histogram(errors)
+        return errors
+
+    def update_burst_histogram(self, errors):
+        """Lengths of runs of consecutive errors (runs crossing calls are joined)"""
+        lengths, self.open_burst = error_runs(errors, self.open_burst)
+        self.burst_histogram = add_counts(self.burst_histogram, lengths)
+
+    def inject(self, data):
+        """
+        Apply the channel to a symbol array (a copy is returned).
+
+        unit "symbol": one step per symbol; unit "bit": bits steps per symbol, MSB first.
+        """
+        data = np.array(data, dtype=np.int64)
+        if self.unit == "symbol":
+            positions = np.flatnonzero(self.error_mask(len(data)))
+            data[positions] ^= self.rng.integers(1, 1 << self.bits, len(positions))
+        else:
+            positions = np.flatnonzero(self.error_mask(len(data) * self.bits))
+            np.bitwise_xor.at(data, positions // self.bits, 1 << (self.bits - 1 - positions % self.bits))
+        return data
+
+    def flip_bits(self, bits):
+        """Apply the channel to an array of 0/1 bits (one step per bit)."""
+        bits = np.array(bits, dtype=np.uint8)
+        bits[self.error_mask(len(bits))] ^= 1
+        return bits
+
+    def summary(self):
+        """Counters and histograms (JSON serialisable)"""
+        closed = self.burst_histogram.copy()
+        if self.open_burst:
+            closed = add_counts(closed, [self.open_burst])
+        lengths = np.arange(len(closed))
+        return {
+            "p": self.p,
+            "r": self.r,
+            "e_bad": self.e_bad,
+            "e_good": self.e_good,
+            "unit": self.unit,
+            "steps": self.steps,
+            "errors": self.errors,
+            "error_rate": self.errors / self.steps if self.steps else 0.0,
+            "mean_burst_length": float((lengths * closed).sum() / closed.sum()) if closed.sum() else 0.0,
+            "burst_histogram": closed.tolist(),
+            "bad_run_histogram": self.state_histogram.tolist()
+        }
+
+    @staticmethod
+    def stationary_error_rate(p, r, e_bad=1.0, e_good=0.0):
+        """Long-run error probability per step."""
+        if p + r == 0:
+            return e_good
+        return (r * e_good + p * e_bad) / (p + r)
+
+def burst_flags(rng, onset, length_pmf, end=-1):
+    """
+    Error flags of a burst process: onsets with a per-step probability, burst lengths from a pmf.
+
+    A step can start a burst (probability onset[t]) only when the step before was
+    correct, so bursts never overlap or touch and the measured run-length
+    histogram is kept. Onset candidates and their lengths are drawn for all steps
+    at once. The next burst after candidate i is the first candidate starting past
+    its end (searchsorted), so the kept bursts are the chain of next pointers from
+    the first candidate after `end`, marked by pointer doubling instead of a loop
+    over bursts.
+
+    :param rng: numpy Generator.
+    :param onset: per-step burst start probability (array, its length is the number of steps).
+    :param length_pmf: burst length distribution (index = length, index 0 unused).
+    :param end: end (exclusive) of the last burst relative to the first step, from the
+                previous call (-1 = none).
+    :return: (flags, end) - bool error flags and the end of the last burst relative to
+             the start of the next call.
+    """
+    steps = len(onset)
+    starts = np.flatnonzero(rng.random(steps) < np.asarray(onset, dtype=float))
+    lengths = rng.choice(len(length_pmf), size=len(starts), p=length_pmf)
+    ends = starts + lengths
+
+    # candidate index len(starts) is the end of the chain and points to itself
+    jump = np.append(np.searchsorted(starts, ends, side='right'), len(starts))
+    keep = np.zeros(len(starts) + 1, dtype=bool)
+    keep[np.searchsorted(starts, end, side='right')] = True
+    while True:
+        reached = keep.copy()
+        reached[jump[keep]] = True
+        if (reached == keep).all() and (jump[jump] == jump).all():
+            break
+        keep, jump = reached, jump[jump]
+    keep = keep[:-1]
+    starts, ends = starts[keep], ends[keep]
+
+    edges = np.zeros(steps + 1, dtype=np.int64)
+    if end > 0:
+        edges[0] += 1
+        edges[min(end, steps)] -= 1
+    np.add.at(edges, starts, 1)
+    np.add.at(edges, np.minimum(ends, steps), -1)
+    flags = np.cumsum(edges[:-1]) > 0
+
+    last_end = max([end] + ends[-1:].tolist())
+    return flags, last_end - steps
+
+def error_runs(errors, open_run=0):
+    """
+    Lengths of the runs of consecutive errors in a chunk of a longer stream
+
+    :param errors: bool error flags of the chunk.
+    :param open_run: length of the run still open at the end of the previous chunk.
+    :return: (lengths, open_run) - int array of the runs finished in this chunk and
+             the length of the run still open at its end (0 if none).
+    """
+    errors = np.asarray(errors, dtype=bool)
+    padded = np.concatenate([[False], errors, [False]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    starts, stops = edges[0::2], edges[1::2]
+    lengths = stops - starts
+    if len(lengths) and starts[0] == 0:
+        lengths[0] += open_run
+    elif open_run:
+        lengths = np.concatenate([[open_run], lengths])
+    if len(errors) == 0:
+        return lengths[:0], open_run
+    if len(stops) and stops[-1] == len(errors):
+        return lengths[:-1], int(lengths[-1])
+    return lengths, 0
+
+def add_counts(histogram, lengths):
+    """histogram + bincount(lengths), growing the histogram as needed"""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if len(lengths) == 0:
+        return histogram
+    counts = np.bincount(lengths)
+    if len(counts) > len(histogram):
+        histogram = np.concatenate([histogram, np.zeros(len(counts) - len(histogram), dtype=np.int64)])
+    histogram[:len(counts)] += counts
+    return histogram
+
 class BurstError():
-    def __init__(self, iep, epf):
-        self.error = 0  # error (0 - prev state no error, 1 - prev state error)
+    def __init__(self, iep, epf, rng=None):
         self.iep = iep      # initial error probability
         self.epf = epf      # error propagation factor
+        self.rng = rng if rng is not None else np.random.default_rng()  # numpy Generator
 
+        # an error starts with probability iep and continues with probability epf:
+        # a Gilbert-Elliott channel whose bad state always errs
+        self.channel = GilbertElliott(p=iep, r=1 - epf, e_bad=1.0, e_good=0.0, rng=self.rng)
         self.injected_errors = 0  # count of injected errors
 
+    @property
+    def error(self):
+        """1 if the last symbol was in error (previous-state flag of the original model)"""
+        return int(self.channel.bad)
+
     def inject(self, data):
-        data = data[:]
-
-        # loop through each data symbol
-        for i in range(len(data)):
-            # determine if an error should be injected
-            rv_1 = random.random()
-            rv_2 = random.random()
-
-            inject_error = (
-                self.error == 0 and rv_1 < self.iep
-            ) or (
-                self.error == 1 and rv_2 < self.epf
-            )
-
-            if inject_error:
-                self.error = 1
-                self.injected_errors += 1
-                # inject an error by flipping a bit
-                data[i] = ErrorHelpers.inject_error(data[i])
-            else:
-                self.error = 0
-
-        print(f"Injected {self.injected_errors} errors into the data.")
-        return data
-    
+        errors = self.channel.error_mask(len(data))
+        self.injected_errors += int(errors.sum())
+
+        # inject an error by moving the value one step towards zero (ErrorHelpers.inject_error)
+        values = np.asarray(data)
+        values = np.where(errors, np.where(values >= 0, values - 1, values + 1), values)
+
+        if log.debug_enabled:
+            log.debug("burst_injected", symbols=len(data), injected_errors=self.injected_errors)
+        return values.tolist() if isinstance(data, list) else values
+
+    def burst_histogram(self):
+        """Measured histogram of error burst lengths (index = burst length)."""
+        return self.channel.summary()["burst_histogram"]
+
     def reset(self):
         """Reset the error state."""
-        self.error = 0
+        self.channel.reset()
         return self
     
 if __name__ == "__main__":
@@ -94,3 +356,12 @@ if __name__ == "__main__":
 
     print("Original data:\t\t", data)
     print("Data with errors:\t", data_with_errors)
+
+    ge = GilbertElliott(p=1e-3, r=0.2, rng=np.random.default_rng(0))
+    for _ in range(10):
+        ge.inject(np.zeros(100000, dtype=np.int64))
+    summary = ge.summary()
+    print(f"Gilbert-Elliott error rate {summary['error_rate']:.3e} "
+          f"(stationary {GilbertElliott.stationary_error_rate(ge.p, ge.r):.3e}), "
+          f"mean burst {summary['mean_burst_length']:.2f}")
+    print("Burst length histogram:\t", summary["burst_histogram"][:12])
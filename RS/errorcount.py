@@ -0,0 +1,133 @@
+"""
+Bit / symbol error accounting on RS symbol arrays
+
+Errors are counted by XOR-ing the transmitted and received 16-bit symbols and
+taking a popcount of the result (lookup table), instead of expanding both
+sides to bit lists with Binary.bit_encode. Bit positions follow
+Binary.bit_encode order (index 0 = MSB).
+"""
+
+import numpy as np
+
+SYMBOL_BITS = 16
+SYMBOL_MASK = (1 << SYMBOL_BITS) - 1
+
+# number of set bits for every 16-bit value
+POPCOUNT16 = np.unpackbits(np.arange(1 << SYMBOL_BITS, dtype='>u2').view(np.uint8)).reshape(-1, SYMBOL_BITS).sum(axis=1).astype(np.uint8)
+
+def symbol_xor(original, received):
+    """
+    XOR of the overlapping part of two symbol sequences
+
+    Only the low 16 bits are compared (like Binary.bit_encode does).
+
+    Returns:
+        uint16 array of length min(len(original), len(received))
+    """
+    length = min(len(original), len(received))
+    original = np.asarray(original[:length], dtype=np.int64)
+    received = np.asarray(received[:length], dtype=np.int64)
+    return ((original ^ received) & SYMBOL_MASK).astype(np.uint16)
+
+def bit_position_histogram(xor):
+    """Bit errors per bit position (MSB first) of the XOR of two symbol arrays"""
+    if len(xor) == 0:
+        return np.zeros(SYMBOL_BITS, dtype=np.int64)
+    bits = np.unpackbits(np.asarray(xor, dtype='>u2').view(np.uint8)).reshape(-1, SYMBOL_BITS)
+    return bits.sum(axis=0, dtype=np.int64)
+
+def errors_per_codeword(symbol_errors, symbols_per_codeword):
+    """
+    Number of wrong symbols in each codeword
+
+    Args:
+        symbol_errors: boolean array, True where a symbol is wrong
+        symbols_per_codeword: codeword (or decoded block) length in symbols
+
+    Returns:
+        int array with one count per (possibly partial, last) codeword
+    """
+    symbol_errors = np.asarray(symbol_errors, dtype=np.int64)
+    n_codewords = -(-len(symbol_errors) // symbols_per_codeword)
+    padded = np.zeros(n_codewords * symbols_per_codeword, dtype=np.int64)
+    padded[:len(symbol_errors)] = symbol_errors
+    return padded.reshape(n_codewords, symbols_per_codeword).sum(axis=1)
+
+def count_errors(original, received, symbols_per_codeword=None):
+    """
+    Bit and symbol errors between two symbol sequences
+
+    Args:
+        original: transmitted symbols
+        received: received / decoded symbols (compared over the common length)
+        symbols_per_codeword: if given, also histogram the errors per codeword
+
+    Returns:
+        dict with 'bit_errors', 'symbol_errors', 'total_bits', 'total_symbols',
+        'bit_position_histogram' and, with symbols_per_codeword, 'codeword_histogram'
+        (codeword_histogram[e] = number of codewords with e wrong symbols)
+    """
+    xor = symbol_xor(original, received)
+    wrong = xor != 0
+
+    counts = {
+        'bit_errors': int(POPCOUNT16[xor].sum(dtype=np.int64)),
+        'symbol_errors': int(wrong.sum()),
+        'total_bits': len(xor) * SYMBOL_BITS,
+        'total_symbols': len(xor),
+        'bit_position_histogram': bit_position_histogram(xor)
+    }
+
+    if symbols_per_codeword:
+        per_codeword = errors_per_codeword(wrong, symbols_per_codeword)
+        counts['codeword_histogram'] = np.bincount(per_codeword, minlength=symbols_per_codeword + 1)
+
+    return counts
+
+def nonzero_bins(histogram):
+    """{bin: count} of the non-empty bins of a histogram (compact form for printing)"""
+    histogram = np.asarray(histogram)
+    return {int(b): int(histogram[b]) for b in np.flatnonzero(histogram)}
+
+class ErrorCounter:
+    def __init__(self, symbols_per_codeword=None):
+        """
+        symbols_per_codeword: block length used for the per-codeword histogram (None to skip it)
+        """
+        self.symbols_per_codeword = symbols_per_codeword
+        self.reset()
+
+    def reset(self):
+        self.bit_errors = 0
+        self.symbol_errors = 0
+        self.total_bits = 0
+        self.total_symbols = 0
+        self.bit_position_histogram = np.zeros(SYMBOL_BITS, dtype=np.int64)
+        self.codeword_histogram = np.zeros((self.symbols_per_codeword or 0) + 1, dtype=np.int64)
+
+    def update(self, original, received):
+        """Add one chunk to the totals and return its own counts"""
+        counts = count_errors(original, received, self.symbols_per_codeword)
+
+        self.bit_errors += counts['bit_errors']
+        self.symbol_errors += counts['symbol_errors']
+        self.total_bits += counts['total_bits']
+        self.total_symbols += counts['total_symbols']
+        self.bit_position_histogram += counts['bit_position_histogram']
+        if self.symbols_per_codeword:
+            self.codeword_histogram += counts['codeword_histogram']
+
+        return counts
+
+    def stats(self):
+        """Cumulative BER/SER and counts"""
+        return {
+            'ber': self.bit_errors / self.total_bits if self.total_bits > 0 else 1.0,
+            'ser': self.symbol_errors / self.total_symbols if self.total_symbols > 0 else 1.0,
+            'bit_errors': self.bit_errors,
+            'symbol_errors': self.symbol_errors,
+            'total_bits': self.total_bits,
+            'total_symbols': self.total_symbols,
+            'bit_position_histogram': self.bit_position_histogram.tolist(),
+            'codeword_histogram': self.codeword_histogram.tolist()
+        }
@@ -0,0 +1,160 @@
+"""
+Per-codeword error profiles collected during simulation
+
+Instead of a single BER/SER number this records, for every RS codeword
+(1D) or N x N block (2D):
+- the number of pre-FEC symbol errors (histogram over 0..N, or per row /
+  per column / per block for 2D)
+- the decoder outcome, found by comparing against the transmitted codeword:
+    clean            - received without errors
+    corrected        - received with errors, decoder returned the transmitted codeword
+    detected_failure - the decoder reported the codeword as uncorrectable
+    miscorrected     - the decoder returned a valid-looking but wrong codeword
+
+All counts come from comparing stacked numpy arrays of transmitted, received
+and decoded codewords, so collecting them costs a few array ops per chunk.
+A measured pre-FEC histogram gives the codeword error rate of any
+t-correcting code of the same length without re-simulating
+(see cer_by_t and postfec.cer_from_histogram).
+"""
+
+import json
+import numpy as np
+
+from postfec import cer_from_histogram
+
+OUTCOMES = ("clean", "corrected", "detected_failure", "miscorrected")
+
+def stack_codewords(codewords, size):
+    """Stack a list of codewords into an int64 array of shape (count, size)"""
+    return np.asarray([list(cw[:size]) for cw in codewords], dtype=np.int64).reshape(len(codewords), size)
+
+def classify_codewords(tx, rx, corrected, failed):
+    """
+    Classify each codeword by decoder outcome
+
+    Args:
+        tx: transmitted codewords, shape (count, size)
+        rx: received codewords before decoding, same shape
+        corrected: decoder output codewords, same shape
+        failed: boolean array, True where the decoder detected a failure
+
+    Returns:
+        int array of indices into OUTCOMES, one per codeword
+    """
+    failed = np.asarray(failed, dtype=bool)
+    received_ok = np.all(tx == rx, axis=1)
+    decoded_ok = np.all(tx == corrected, axis=1)
+
+    outcome = np.full(len(failed), OUTCOMES.index("miscorrected"))
+    outcome[decoded_ok] = OUTCOMES.index("corrected")
+    outcome[decoded_ok & received_ok] = OUTCOMES.index("clean")
+    outcome[failed] = OUTCOMES.index("detected_failure")
+    return outcome
+
+class ErrorProfile:
+    def __init__(self, n, k, mode="1D", n2=None, k2=None):
+        """
+        n, k: Reed-Solomon code parameters
+        mode: '1D' (one codeword of n symbols) or '2D' (n2 x n product block)
+        n2, k2: 2D column code (default n, k - square block)
+        """
+        self.n = n
+        self.k = k
+        self.n2 = n if n2 is None else n2
+        self.k2 = k if k2 is None else k2
+        self.mode = mode
+        self.block_size = n if mode == "1D" else self.n2 * n
+        self.message_size = k if mode == "1D" else self.k2 * k
+
+        self.codewords = 0
+        self.codeword_histogram = np.zeros(self.block_size + 1, dtype=np.int64)
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+
+        if mode == "2D":
+            self.row_histogram = np.zeros(n + 1, dtype=np.int64)
+            self.column_histogram = np.zeros(self.n2 + 1, dtype=np.int64)
+
+    def update(self, tx_codewords, rx_codewords, corrected_codewords, failed):
+        """
+        Add one batch of codewords
+
+        Args:
+            tx_codewords: transmitted (encoded) codewords, block_size symbols each
+            rx_codewords: received codewords before RS decoding
+            corrected_codewords: decoder output codewords
+            failed: per codeword, True where the decoder detected a failure
+        """
+        count = min(len(tx_codewords), len(rx_codewords), len(corrected_codewords), len(failed))
+        if count == 0:
+            return
+
+        tx = stack_codewords(tx_codewords[:count], self.block_size)
+        rx = stack_codewords(rx_codewords[:count], self.block_size)
+        corrected = stack_codewords(corrected_codewords[:count], self.block_size)
+        wrong = tx != rx
+
+        # pre-FEC symbol errors per codeword / row / column
+        self.codeword_histogram += np.bincount(wrong.sum(axis=1), minlength=self.block_size + 1)
+        if self.mode == "2D":
+            blocks = wrong.reshape(count, self.n2, self.n)
+            self.row_histogram += np.bincount(blocks.sum(axis=2).ravel(), minlength=self.n + 1)
+            self.column_histogram += np.bincount(blocks.sum(axis=1).ravel(), minlength=self.n2 + 1)
+
+        # decoder outcomes
+        outcome_counts = np.bincount(classify_codewords(tx, rx, corrected, failed[:count]), minlength=len(OUTCOMES))
+        for name, outcome_count in zip(OUTCOMES, outcome_counts):
+            self.outcomes[name] += int(outcome_count)
+        self.codewords += count
+
+    def cer_by_t(self):
+        """
+        Codeword error rate a t-correcting code would have on the measured
+        pre-FEC errors, for t = 0..n (2D uses the per-row histogram - each row
+        is an RS(n,k) codeword)
+        """
+        histogram = self.codeword_histogram if self.mode == "1D" else self.row_histogram
+        return [cer_from_histogram(histogram, t) for t in range(len(histogram))]
+
+    def summary(self):
+        """Plain dict of all counters (JSON serialisable)"""
+        data = {
+            "n": self.n,
+            "k": self.k,
+            "n2": self.n2,
+            "k2": self.k2,
+            "mode": self.mode,
+            "codewords": self.codewords,
+            "outcomes": dict(self.outcomes),
+            "codeword_histogram": self.codeword_histogram.tolist()
+        }
+        if self.mode == "2D":
+            data["row_histogram"] = self.row_histogram.tolist()
+            data["column_histogram"] = self.column_histogram.tolist()
+        data["cer_by_t"] = self.cer_by_t()
+        return data
+
+    def save(self, path):
+        """Write the summary as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=4)
+
+    def print_outcomes(self):
+        """One line with the decoder outcome counts (parsed by tester.py)"""
+        print(f"Codewords: {self.codewords} (clean {self.outcomes['clean']}, "
+              f"corrected {self.outcomes['corrected']}, "
+              f"detected failures {self.outcomes['detected_failure']}, "
+              f"miscorrected {self.outcomes['miscorrected']})")
+
+    def print_summary(self):
+        """Short human readable report of the histograms"""
+        # trim trailing empty bins
+        histogram = self.codeword_histogram
+        last = np.nonzero(histogram)[0]
+        histogram = histogram[:last[-1] + 1] if len(last) else histogram[:1]
+
+        print(f"Error profile: {self.codewords} codewords")
+        print(f"  Pre-FEC symbol errors per codeword: {histogram.tolist()}")
+        if self.mode == "2D":
+            print(f"  Pre-FEC symbol errors per row: {self.row_histogram.tolist()}")
+            print(f"  Pre-FEC symbol errors per column: {self.column_histogram.tolist()}")
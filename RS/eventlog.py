@@ -0,0 +1,217 @@
+"""
+Level-gated structured event log shared by the RS/ modules
+
+Modules get a named logger and emit events (a name plus keyword fields)
+instead of printing:
+
+    log = get_logger("rs2d")
+    ...
+    if log.debug_enabled:
+        log.debug("converged", iterations=iterations)
+
+Each logger keeps a plain boolean per level, updated by configure(), so a hot
+path with the level disabled pays one attribute lookup and builds no strings
+or arrays. Enabled events go to
+- the console (stderr, so stdout keeps only the result lines tester.py parses)
+- optionally a JSONL file, one JSON object per event, rotated by size
+
+The configuration is also exported in the environment (RS_LOG_LEVEL,
+RS_LOG_JSONL, RS_LOG_JSONL_LEVEL) so worker processes (pipeline.py) pick it up
+on import. Every record carries the pid and concurrent writers append to the
+same file, but only the process that configured the log (model.py's main
+process) rotates it. The others never rotate: before each write they check
+that the path is still the file they hold open and reopen it if the owner
+has rotated it away, so every event lands in the current file once, in order.
+The size check runs on the owner's writes, so while only workers write the
+current file can grow past max_bytes until the owner's next event.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": OFF}
+LEVEL_NAMES = {level: name.upper() for name, level in LEVELS.items()}
+
+def parse_level(level):
+    """Level number from a number or a name ('debug', 'INFO', ...)"""
+    if isinstance(level, int):
+        return level
+    try:
+        return LEVELS[level.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown log level '{level}', expected one of {list(LEVELS)}")
+
+def to_json(value):
+    """json.dumps default: numpy arrays / scalars as plain lists / numbers"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+class RotatingJSONLSink:
+    def __init__(self, path, max_bytes=10 * 1024 * 1024, backups=3, rotate=True):
+        """
+        path: JSONL file to append to
+        max_bytes: rotate before a write would grow the file past this
+        backups: rotated files kept (path.1 newest .. path.<backups> oldest)
+        rotate: this process owns the rotation (False: append only, follow the owner's rotations)
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rotates = rotate
+        self.pid = os.getpid()  # a forked child inherits the sink but not the rotation
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'a')
+
+    def rotate(self):
+        """Shift path -> path.1 -> path.2 ..., dropping the oldest"""
+        self.file.close()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            if os.path.exists(self.path):
+                os.replace(self.path, f"{self.path}.1")
+            self.file = open(self.path, 'a')
+        else:
+            self.file = open(self.path, 'w')
+
+    def reopen_if_rotated(self):
+        """Append-only writers: reopen path if the owner has rotated the open file away"""
+        try:
+            current = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            current = None
+        if current != os.fstat(self.file.fileno()).st_ino:
+            self.file.close()
+            self.file = open(self.path, 'a')
+
+    def write(self, record):
+        line = json.dumps(record, default=to_json) + "\n"
+        with self.lock:
+            if self.rotates and os.getpid() == self.pid:
+                # the file size, including what other processes appended
+                size = os.fstat(self.file.fileno()).st_size
+                if size > 0 and size + len(line) > self.max_bytes:
+                    self.rotate()
+            else:
+                self.reopen_if_rotated()
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+class EventLogger:
+    def __init__(self, name):
+        self.name = name
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the enabled levels (called by configure)"""
+        self.debug_enabled = enabled(DEBUG)
+        self.info_enabled = enabled(INFO)
+        self.warning_enabled = enabled(WARNING)
+        self.error_enabled = enabled(ERROR)
+
+    def event(self, level, event, **fields):
+        """
+        Emit one event if its level is enabled
+
+        Args:
+            level: DEBUG / INFO / WARNING / ERROR
+            event: short event name, e.g. 'converged'
+            fields: JSON serialisable values (numpy arrays are converted)
+        """
+        if level >= _state["console_level"]:
+            details = " ".join(f"{key}={value}" for key, value in fields.items())
+            print(f"[{LEVEL_NAMES.get(level, level)}] {self.name}.{event} {details}".rstrip(), file=sys.stderr)
+        sink = _state["sink"]
+        if sink is not None and level >= _state["sink_level"]:
+            record = {"time": time.time(), "pid": os.getpid(), "level": LEVEL_NAMES.get(level, level),
+                      "logger": self.name, "event": event}
+            record.update(fields)
+            sink.write(record)
+
+    def debug(self, event, **fields):
+        self.event(DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.event(INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.event(WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.event(ERROR, event, **fields)
+
+_state = {"console_level": WARNING, "sink": None, "sink_level": OFF}
+_loggers = {}
+
+def enabled(level):
+    """Whether an event of this level goes anywhere (console or file)"""
+    return level >= _state["console_level"] or (_state["sink"] is not None and level >= _state["sink_level"])
+
+def get_logger(name):
+    """Shared logger for a module / component name"""
+    if name not in _loggers:
+        _loggers[name] = EventLogger(name)
+    return _loggers[name]
+
+def configure(level="warning", jsonl_path=None, jsonl_level="debug", max_bytes=10 * 1024 * 1024,
+              backups=3, export=True, rotate=True):
+    """
+    Set the console level and the JSONL sink for all loggers
+
+    Args:
+        level: console level name or number ('off' for none)
+        jsonl_path: JSONL event file (None = no file)
+        jsonl_level: lowest level written to the file
+        max_bytes, backups: rotation of the file (see RotatingJSONLSink)
+        export: also set RS_LOG_* environment variables for child processes
+        rotate: this process rotates the file (False for worker processes, which only append)
+    """
+    if _state["sink"] is not None:
+        _state["sink"].close()
+    _state["console_level"] = parse_level(level)
+    _state["sink_level"] = parse_level(jsonl_level)
+    _state["sink"] = RotatingJSONLSink(jsonl_path, max_bytes, backups, rotate) if jsonl_path else None
+    for logger in _loggers.values():
+        logger.refresh()
+
+    if export:
+        os.environ["RS_LOG_LEVEL"] = LEVEL_NAMES.get(_state["console_level"], str(_state["console_level"]))
+        os.environ["RS_LOG_JSONL_LEVEL"] = LEVEL_NAMES.get(_state["sink_level"], str(_state["sink_level"]))
+        if jsonl_path:
+            os.environ["RS_LOG_JSONL"] = jsonl_path
+        else:
+            os.environ.pop("RS_LOG_JSONL", None)
+
+def configure_from_env():
+    """Apply RS_LOG_LEVEL / RS_LOG_JSONL / RS_LOG_JSONL_LEVEL if set"""
+    level = os.environ.get("RS_LOG_LEVEL")
+    jsonl_path = os.environ.get("RS_LOG_JSONL")
+    if level is None and jsonl_path is None:
+        return
+    # set by a parent process, which owns the rotation of the file
+    configure(level or "warning", jsonl_path, os.environ.get("RS_LOG_JSONL_LEVEL", "debug"), export=False,
+              rotate=False)
+
+configure_from_env()
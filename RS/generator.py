@@ -1,3 +1,4 @@
+from prbs import PRBS
 
 def data_in(r=32):
     # yield a number from 0-2^5-1, so 0-31 a upcounter
@@ -5,6 +6,13 @@ def data_in(r=32):
         for i in range(r):
             yield i
 
+def prbs_in(order=31, r=32, block=4096):
+    # same range as data_in(r) (r a power of 2), from a PRBS instead of an upcounter
+    source = PRBS(order)
+    bits = r.bit_length() - 1
+    while True:
+        yield from source.symbols(block, bits).tolist()
+
 # test
 if __name__ == "__main__":
     for i in data_in():
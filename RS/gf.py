@@ -0,0 +1,169 @@
+"""
+Batched (numpy) Reed-Solomon parity over the reedsolo GF(2^16) field
+
+reedsolo encodes one message at a time in pure Python. Here the same
+systematic encoder (remainder of m(x) * x^nsym by the generator polynomial) is
+run as an LFSR over a whole batch of messages: each of the k message symbols
+is one vectorised step over all rows, so the Python loop runs k times per
+batch instead of k * nsym times per message. Log/exp tables, generator
+polynomial and symbol order are taken from the RSCodec, so the parity is
+bit-exact with RSCodec.encode.
+
+decode() is the matching batched errors-and-erasures decoder (syndromes,
+Berlekamp-Massey, Chien search, Forney), again with one vectorised step per
+codeword symbol or per parity symbol over all rows. It is a bounded-distance
+decoder like RSCodec.decode: it returns the same codeword when a row is
+correctable, and reports a failure where reedsolo raises ReedSolomonError.
+"""
+
+import numpy as np
+
+class FieldTables:
+    def __init__(self, codec):
+        """
+        codec: reedsolo.RSCodec (its tables and generator polynomial are used)
+        """
+        self.nsym = codec.nsym
+        self.fcr = codec.fcr
+        self.log = np.asarray(codec.gf_log, dtype=np.int64)
+        self.exp = np.asarray(codec.gf_exp, dtype=np.int64)  # 2 * field size long - no modulo needed
+        self.order = len(self.log) - 1  # multiplicative group order (65535)
+        generator = codec.gen[codec.nsym]
+        self.log_generator = self.log[np.asarray(generator[1:], dtype=np.int64)]  # monic: skip g[0] = 1
+
+    def parity(self, messages):
+        """
+        Parity symbols of many messages at once
+
+        Args:
+            messages: (rows, k) int array of message symbols
+        Returns:
+            (rows, nsym) int64 parity symbols - RSCodec.encode(row)[k:] for every row
+        """
+        messages = np.asarray(messages, dtype=np.int64)
+        remainder = np.zeros((len(messages), self.nsym), dtype=np.int64)
+        for i in range(messages.shape[1]):
+            feedback = messages[:, i] ^ remainder[:, 0]
+            remainder[:, :-1] = remainder[:, 1:]
+            remainder[:, -1] = 0
+            nonzero = feedback != 0
+            if nonzero.any():
+                terms = self.exp[self.log[feedback[nonzero]][:, None] + self.log_generator[None, :]]
+                remainder[nonzero] ^= terms
+        return remainder
+
+    def encode(self, messages):
+        """(rows, k) messages -> (rows, k + nsym) systematic codewords"""
+        messages = np.asarray(messages, dtype=np.int64)
+        return np.concatenate([messages, self.parity(messages)], axis=1)
+
+    def multiply(self, a, b):
+        """Element-wise field product of two int arrays"""
+        return np.where((a != 0) & (b != 0), self.exp[self.log[a] + self.log[b]], 0)
+
+    def scale(self, a, log_c):
+        """a * alpha^log_c element-wise (log_c a scalar or broadcastable array in [0, order))"""
+        return np.where(a != 0, self.exp[self.log[a] + log_c], 0)
+
+    def inverse(self, a):
+        """Element-wise inverse (0 for 0)"""
+        return np.where(a != 0, self.exp[self.order - self.log[a]], 0)
+
+    def evaluate(self, poly, log_x):
+        """
+        Evaluate polynomials at points (Horner)
+
+        Args:
+            poly: (rows, degree + 1) coefficients, ascending powers
+            log_x: (points,) logs of the evaluation points
+        Returns:
+            (rows, points) values
+        """
+        value = np.zeros((len(poly), len(log_x)), dtype=np.int64)
+        for j in range(poly.shape[1] - 1, -1, -1):
+            value = self.scale(value, log_x[None, :]) ^ poly[:, j:j + 1]
+        return value
+
+    def syndromes(self, received):
+        """(rows, n) received words -> (rows, nsym) syndromes r(alpha^(fcr + i))"""
+        powers = (self.fcr + np.arange(self.nsym)) % self.order
+        syndromes = np.zeros((len(received), self.nsym), dtype=np.int64)
+        for j in range(received.shape[1]):
+            syndromes = self.scale(syndromes, powers[None, :]) ^ received[:, j:j + 1]
+        return syndromes
+
+    def decode(self, received, erasures=None, chunk_rows=4096):
+        """
+        Errors-and-erasures decode of many received words at once
+
+        Args:
+            received: (rows, n) int array of received words (any n up to the field size)
+            erasures: optional (rows, n) bool mask of erased positions
+            chunk_rows: rows per vectorised pass (bounds the temporary arrays)
+        Returns:
+            (decoded, failed) - (rows, n) int64 words (the received word unchanged
+            where decoding failed) and a (rows,) bool array of detected failures
+        """
+        received = np.asarray(received, dtype=np.int64)
+        decoded = received.copy()
+        failed = np.zeros(len(received), dtype=bool)
+        for start in range(0, len(received), chunk_rows):
+            rows = slice(start, start + chunk_rows)
+            mask = None if erasures is None else np.asarray(erasures[rows], dtype=bool)
+            decoded[rows], failed[rows] = self.decode_chunk(received[rows], mask)
+        return decoded, failed
+
+    def decode_chunk(self, received, erasures):
+        rows, n = received.shape
+        nsym = self.nsym
+        syndromes = self.syndromes(received)
+        log_locator = n - 1 - np.arange(n)  # position j is X_j = alpha^(n-1-j)
+
+        # erasure locator Gamma(x) = prod (1 + X_j x), ascending powers
+        gamma = np.zeros((rows, nsym + 1), dtype=np.int64)
+        gamma[:, 0] = 1
+        erased = np.zeros(rows, dtype=np.int64)
+        if erasures is not None:
+            erased = erasures.sum(axis=1)
+            for j in np.flatnonzero(erasures.any(axis=0)):
+                term = self.scale(gamma[:, :-1], log_locator[j])
+                gamma[:, 1:] ^= np.where(erasures[:, j:j + 1], term, 0)
+
+        # Berlekamp-Massey started from the erasure locator (errors found: found)
+        locator = gamma.copy()
+        previous = gamma.copy()
+        found = np.zeros(rows, dtype=np.int64)
+        for r in range(1, nsym + 1):
+            active = r > erased
+            terms = min(r, nsym + 1)
+            delta = np.bitwise_xor.reduce(self.multiply(locator[:, :terms], syndromes[:, r - 1::-1][:, :terms]), axis=1)
+            shifted = np.concatenate([np.zeros((rows, 1), dtype=np.int64), previous[:, :-1]], axis=1)
+            update = active & (delta != 0)
+            grow = update & (2 * found <= r - 1 - erased)
+            updated = locator ^ self.multiply(delta[:, None], shifted)
+            previous = np.where(grow[:, None], self.multiply(self.inverse(delta)[:, None], locator),
+                                np.where(active[:, None], shifted, previous))
+            found = np.where(grow, r - erased - found, found)
+            locator = np.where(update[:, None], updated, locator)
+
+        # Chien search over the n positions of the (shortened) code
+        log_x = (self.order - log_locator) % self.order  # X_j^-1
+        roots = self.evaluate(locator, log_x) == 0
+        nonzero = locator != 0
+        degree = np.where(nonzero.any(axis=1), nsym - np.argmax(nonzero[:, ::-1], axis=1), 0)
+        failed = (erased > nsym) | (2 * found + erased > nsym) | (roots.sum(axis=1) != degree)
+
+        # Forney: e_j = X_j^(1-fcr) Omega(X_j^-1) / Lambda'(X_j^-1)
+        evaluator = np.zeros((rows, nsym), dtype=np.int64)
+        for j in range(nsym):
+            evaluator[:, j:] ^= self.multiply(locator[:, j:j + 1], syndromes[:, :nsym - j])
+        derivative = np.zeros((rows, nsym), dtype=np.int64)
+        derivative[:, 0::2] = locator[:, 1::2]
+        omega = self.evaluate(evaluator, log_x)
+        slope = self.evaluate(derivative, log_x)
+        failed |= (roots & (slope == 0)).any(axis=1)
+        magnitude = self.multiply(omega, self.inverse(slope))
+        magnitude = self.scale(magnitude, ((1 - self.fcr) * log_locator % self.order)[None, :])
+
+        errors = np.where(roots & ~failed[:, None], magnitude, 0)
+        return received ^ errors, failed
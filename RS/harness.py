@@ -0,0 +1,291 @@
+"""
+Codeword-level error-injection harness for decoder capability maps
+
+Usage: python harness.py --n 69 --k 65 --errors 0:4 --erasures 0:4
+       python harness.py --n 24 --k 20 --mode 2D --pattern random --errors 0:60:4 --blocks 500
+       python harness.py --n 24 --k 20 --mode 2D --grid 4x4 --json ./logs/capability.json
+
+Instead of noise, every codeword (1D) or n2 x n block (2D) of a batch gets
+exactly e symbol errors and f erasures at positions chosen by a pattern:
+- random: e distinct positions anywhere in the codeword / block
+- burst:  e consecutive positions in transmission order (row-major for 2D)
+- row:    (2D) whole rows - e // n full rows plus e % n symbols of one more row
+- column: (2D) the same with columns
+Erasures go to random positions not hit by an error. The batch is decoded with
+the batched decoders (decode_blocks, gf.py) and every word is classified as in
+errorprofile.py (corrected / detected_failure / miscorrected).
+
+Sweeping (e, f) gives a decode-success map. For the iterative 2D decoder the
+--grid map puts errors on every cell of an a x b rectangle of rows x columns
+(a = 1..R, b = 1..C). A rectangle with more than t_col rows and more than t_row
+columns is a stopping set that no number of iterations can resolve, and random
+noise at a realistic SNR almost never produces one.
+"""
+
+import argparse
+import json
+import numpy as np
+
+from errorprofile import OUTCOMES, classify_codewords
+from reedsolomon import ReedSolomon1D, ReedSolomon2D
+from rng import make_rng
+
+PATTERNS = ("random", "burst", "row", "column")
+
+def random_positions(rng, blocks, size, count, exclude=None):
+    """(blocks, count) distinct random positions in [0, size) per block, avoiding the exclude mask"""
+    keys = rng.random((blocks, size))
+    if exclude is not None:
+        keys[exclude] = 2.0
+    return np.argsort(keys, axis=1)[:, :count]
+
+def line_positions(rng, blocks, lines, length, count, transpose=False):
+    """
+    Positions covering whole lines (rows, or columns with transpose) of a lines x length block
+
+    count // length random lines are hit completely and count % length random
+    symbols of one more line. Positions are row-major indices of the block.
+    """
+    full, partial = divmod(count, length)
+    if full + (partial > 0) > lines:
+        raise ValueError(f"{count} errors do not fit in {lines} lines of {length} symbols")
+    chosen = random_positions(rng, blocks, lines, full + (partial > 0))
+    line = np.repeat(chosen[:, :full], length, axis=1)
+    offset = np.tile(np.arange(length), full)[None, :].repeat(blocks, axis=0)
+    if partial:
+        line = np.concatenate([line, np.repeat(chosen[:, full:], partial, axis=1)], axis=1)
+        offset = np.concatenate([offset, random_positions(rng, blocks, length, partial)], axis=1)
+    if transpose:
+        return offset * lines + line
+    return line * length + offset
+
+def error_positions(pattern, rng, blocks, count, n, n2=None):
+    """
+    (blocks, count) flattened error positions for one pattern
+
+    Args:
+        pattern: one of PATTERNS ('row' / 'column' need n2)
+        count: errors per codeword / block
+        n: row length (codeword length for 1D)
+        n2: rows of a 2D block (None for 1D)
+    """
+    size = n * (n2 or 1)
+    if count > size:
+        raise ValueError(f"{count} errors do not fit in {size} symbols")
+    if pattern == "random":
+        return random_positions(rng, blocks, size, count)
+    if pattern == "burst":
+        start = rng.integers(0, size - count + 1, blocks)
+        return start[:, None] + np.arange(count)[None, :]
+    if n2 is None:
+        raise ValueError(f"Pattern '{pattern}' needs a 2D block")
+    if pattern == "row":
+        return line_positions(rng, blocks, n2, n, count)
+    if pattern == "column":
+        # columns of the row-major block: line = column index, offset = row
+        return line_positions(rng, blocks, n, n2, count, transpose=True)
+    raise ValueError(f"Unknown pattern '{pattern}', expected one of {PATTERNS}")
+
+def grid_positions(rng, blocks, rows, cols, n, n2):
+    """(blocks, rows * cols) positions of the cells of a random rows x cols rectangle"""
+    row = random_positions(rng, blocks, n2, rows)
+    col = random_positions(rng, blocks, n, cols)
+    return (row[:, :, None] * n + col[:, None, :]).reshape(blocks, -1)
+
+def corrupt(rng, codewords, errors, erasures=0):
+    """
+    Received words with errors at the given positions and f random erasures
+
+    Args:
+        codewords: (blocks, size) transmitted words
+        errors: (blocks, e) error positions - each gets a random non-zero error value
+        erasures: erasures per word, at random positions without an error
+    Returns:
+        (received, erasure mask) - the mask is None without erasures
+    """
+    received = codewords.copy()
+    rows = np.arange(len(codewords))[:, None]
+    received[rows, errors] ^= rng.integers(1, 1 << 16, errors.shape)
+    if not erasures:
+        return received, None
+    hit = np.zeros(codewords.shape, dtype=bool)
+    hit[rows, errors] = True
+    erased = random_positions(rng, len(codewords), codewords.shape[1], erasures, exclude=hit)
+    mask = np.zeros(codewords.shape, dtype=bool)
+    mask[rows, erased] = True
+    received[rows, erased] ^= rng.integers(0, 1 << 16, erased.shape)  # erased value is unknown, may be right
+    return received, mask
+
+class CapabilityHarness:
+    def __init__(self, n, k, mode="1D", n2=None, k2=None, max_iterations=None, seed=0):
+        """
+        n, k: RS(n,k) code (row code of a 2D block)
+        mode: '1D' or '2D'
+        n2, k2: 2D column code (default n, k - square block)
+        max_iterations: 2D iteration cap (None = until no change)
+        seed: root seed, every map point draws from its own stream (rng.py)
+        """
+        self.n = n
+        self.k = k
+        self.mode = mode
+        self.max_iterations = max_iterations
+        self.seed = seed
+        if mode == "2D":
+            self.rs = ReedSolomon2D(n, k, n2, k2)
+            self.n2, self.k2 = self.rs.n2, self.rs.k2
+        else:
+            self.rs = ReedSolomon1D(n, k)
+            self.n2, self.k2 = None, None
+
+    @property
+    def size(self):
+        """Symbols per codeword / block"""
+        return self.n * (self.n2 or 1)
+
+    def codewords(self, rng, blocks):
+        """(blocks, size) random codewords / product blocks"""
+        messages = rng.integers(0, 1 << 16, (blocks, self.k * (self.k2 or 1)))
+        return self.rs.encode_blocks(messages, self.n, self.k)
+
+    def decode(self, received, erasures):
+        """(decoded, failed, iterations) of a batch - iterations all 1 in 1D"""
+        if self.mode == "2D":
+            cap = np.inf if self.max_iterations is None else self.max_iterations
+            return self.rs.decode_blocks(received, self.n, self.k, cap, erasures)
+        decoded, failed = self.rs.decode_blocks(received, self.n, self.k, erasures)
+        return decoded, failed, np.ones(len(received), dtype=np.int64)
+
+    def run_batch(self, rng, blocks, positions, erasures=0):
+        """Encode, corrupt at positions (blocks, e), decode and count outcomes"""
+        tx = self.codewords(rng, blocks)
+        rx, mask = corrupt(rng, tx, positions, erasures)
+        decoded, failed, iterations = self.decode(rx, mask)
+        outcome = np.bincount(classify_codewords(tx, rx, decoded, failed), minlength=len(OUTCOMES))
+        point = {name: int(count) for name, count in zip(OUTCOMES, outcome)}
+        point["blocks"] = blocks
+        point["success_rate"] = (point["clean"] + point["corrected"]) / blocks
+        if self.mode == "2D":
+            point["mean_iterations"] = float(iterations.mean())
+            point["max_iterations"] = int(iterations.max())
+        return point
+
+    def error_map(self, errors, erasures=(0,), pattern="random", blocks=1000):
+        """
+        Success map over error and erasure counts
+
+        Args:
+            errors: error counts e per word
+            erasures: erasure counts f per word
+            pattern: error pattern (see PATTERNS)
+            blocks: words per (e, f) point
+        Returns:
+            list of point dicts: errors, erasures and the outcome counts / rates
+        """
+        points = []
+        for e in errors:
+            for f in erasures:
+                if e + f > self.size:
+                    continue
+                rng = make_rng(self.seed, "harness", pattern, e, f)
+                positions = error_positions(pattern, rng, blocks, e, self.n, self.n2)
+                points.append({"errors": e, "erasures": f, **self.run_batch(rng, blocks, positions, f)})
+        return points
+
+    def grid_map(self, max_rows, max_cols, blocks=1000):
+        """
+        2D success map of full rows x cols error rectangles
+
+        Returns:
+            list of point dicts with rows, cols and the outcome counts / rates
+        """
+        if self.mode != "2D":
+            raise ValueError("Grid maps need a 2D block")
+        points = []
+        for rows in range(1, max_rows + 1):
+            for cols in range(1, max_cols + 1):
+                rng = make_rng(self.seed, "harness", "grid", rows, cols)
+                positions = grid_positions(rng, blocks, rows, cols, self.n, self.n2)
+                points.append({"rows": rows, "cols": cols, "errors": rows * cols, **self.run_batch(rng, blocks, positions)})
+        return points
+
+    def describe(self):
+        if self.mode == "2D":
+            return f"RS({self.n},{self.k}) x RS({self.n2},{self.k2}) 2D"
+        return f"RS({self.n},{self.k}) 1D"
+
+def print_map(points, row_key, col_key):
+    """Success-rate table: one line per row_key value, one column per col_key value"""
+    cols = sorted({point[col_key] for point in points})
+    print(f"  {row_key:>8} \\ {col_key:<8}" + "".join(f"{col:>9}" for col in cols))
+    for row in sorted({point[row_key] for point in points}):
+        cells = {point[col_key]: point for point in points if point[row_key] == row}
+        line = "".join(f"{cells[col]['success_rate']:>9.3f}" if col in cells else f"{'':>9}" for col in cols)
+        print(f"  {row:>19}" + line)
+
+def print_outcomes(points, keys):
+    """Outcome counts per point (failures and miscorrections only)"""
+    for point in points:
+        if point["success_rate"] < 1:
+            label = " ".join(f"{key}={point[key]}" for key in keys)
+            print(f"  {label}: detected_failure {point['detected_failure']}, miscorrected {point['miscorrected']}"
+                  + (f", iterations mean {point['mean_iterations']:.2f} max {point['max_iterations']}"
+                     if "mean_iterations" in point else ""))
+
+def parse_range(text):
+    """'a:b[:step]' (inclusive) or 'a,b,c' into a list of ints"""
+    if ':' in text:
+        parts = [int(part) for part in text.split(':')]
+        return list(range(parts[0], parts[1] + 1, parts[2] if len(parts) > 2 else 1))
+    return [int(part) for part in text.split(',')]
+
+def parse_grid(text):
+    """'RxC' into (R, C)"""
+    rows, cols = text.lower().split('x')
+    return int(rows), int(cols)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Decode-success maps of RS decoders under exact error / erasure patterns',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    parser.add_argument('--n', type=int, default=69, help='Codeword length (row code for 2D)')
+    parser.add_argument('--k', type=int, default=65, help='Data symbols (row code for 2D)')
+    parser.add_argument('--n2', type=int, default=None, help='2D column code length')
+    parser.add_argument('--k2', type=int, default=None, help='2D column code data symbols')
+    parser.add_argument('--mode', choices=['1D', '2D'], default='1D')
+    parser.add_argument('--pattern', choices=PATTERNS, default='random')
+    parser.add_argument('--errors', type=parse_range, default=None,
+                        help="Error counts per word, 'a:b[:step]' or 'a,b,c' (default 0 .. 2t + 2)")
+    parser.add_argument('--erasures', type=parse_range, default=[0], help='Erasure counts per word')
+    parser.add_argument('--grid', type=parse_grid, default=None,
+                        help="2D only: map full RxC error rectangles instead of --errors")
+    parser.add_argument('--blocks', type=int, default=1000, help='Words per map point')
+    parser.add_argument('--max_iterations', type=int, default=None, help='2D iteration cap')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', type=str, default=None, help='Write the map to this JSON file')
+    args = parser.parse_args()
+
+    harness = CapabilityHarness(args.n, args.k, args.mode, args.n2, args.k2, args.max_iterations, args.seed)
+    print(f"{harness.describe()}, {args.blocks} words per point")
+    if args.grid:
+        points = harness.grid_map(*args.grid, blocks=args.blocks)
+        print("Success rate of full error rectangles:")
+        print_map(points, "rows", "cols")
+        print_outcomes(points, ("rows", "cols"))
+    else:
+        errors = args.errors if args.errors is not None else list(range(args.n - args.k + 3))
+        points = harness.error_map(errors, args.erasures, args.pattern, args.blocks)
+        print(f"Success rate, pattern '{args.pattern}':")
+        print_map(points, "errors", "erasures")
+        print_outcomes(points, ("errors", "erasures"))
+
+    if args.json:
+        result = {"code": harness.describe(), "n": args.n, "k": args.k, "n2": harness.n2, "k2": harness.k2,
+                  "mode": args.mode, "pattern": "grid" if args.grid else args.pattern, "seed": args.seed,
+                  "max_iterations": args.max_iterations, "points": points}
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=4)
+        print(f"Map written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Per-stage profiling hooks for the link simulation
+
+Stages are methods of the link classes (Transmitter.encode, Channel.add_noise,
+DFE.equalize, ReedSolomon1D.decode_codeword, ...). A Profiler wraps them in
+place while it is installed and records, per stage:
+- call count
+- wall time, inclusive (with the stages it calls) and self (without them -
+  self times add up to the time spent inside instrumented stages)
+- symbols processed (length of the data argument) and symbols/sec
+- optionally net bytes allocated (tracemalloc, slow - off by default)
+
+Nothing is wrapped unless a Profiler is installed, so the simulation runs at
+full speed when profiling is off. Stages called once per symbol (e.g.
+PAM.demodulate inside LMS.equalize) include about a microsecond of wrapper
+overhead per call in their times. Stages running in pipeline worker processes
+(pipeline.py) are not seen by the profiler of the main process.
+"""
+
+import json
+import time
+import tracemalloc
+
+def data_length(args):
+    """Default symbol count: length of the first sized argument (the data)"""
+    for arg in args:
+        if hasattr(arg, '__len__') and not isinstance(arg, str):
+            return len(arg)
+    return 0
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.self_seconds = 0.0
+        self.symbols = 0
+        self.alloc_bytes = 0
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "self_seconds": self.self_seconds,
+            "symbols": self.symbols,
+            "symbols_per_sec": self.symbols / self.seconds if self.seconds > 0 else 0.0,
+            "alloc_bytes": self.alloc_bytes
+        }
+
+class Profiler:
+    def __init__(self, track_allocations=False):
+        """
+        track_allocations: also record net allocated bytes per stage with tracemalloc
+        """
+        self.track_allocations = track_allocations
+        self.stages = {}
+        self.patched = []
+        self.start_time = None
+        self.child_seconds = [0.0]  # time spent in nested stages, one entry per open call
+
+    def wrap(self, func, stage):
+        """Timed wrapper around func, recording into stats of `stage`"""
+        stats = self.stages.setdefault(stage, StageStats())
+        track_allocations = self.track_allocations
+        child_seconds = self.child_seconds
+        # methods get self as the first argument - the data comes after it
+        skip = 0 if isinstance(func, staticmethod) else 1
+        func = func.__func__ if isinstance(func, staticmethod) else func
+
+        def wrapper(*args, **kwargs):
+            if track_allocations:
+                before = tracemalloc.get_traced_memory()[0]
+            child_seconds.append(0.0)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = child_seconds.pop()
+                child_seconds[-1] += elapsed
+            stats.seconds += elapsed
+            stats.self_seconds += elapsed - nested
+            stats.calls += 1
+            stats.symbols += data_length(args[skip:])
+            if track_allocations:
+                stats.alloc_bytes += max(0, tracemalloc.get_traced_memory()[0] - before)
+            return result
+
+        wrapper.__wrapped__ = func
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        return wrapper
+
+    def instrument(self, cls, name, stage=None):
+        """
+        Replace cls.name with a timed wrapper (undone by uninstall)
+
+        Args:
+            cls: class owning the method
+            name: method name (plain or static method)
+            stage: report name (default 'Class.method')
+        """
+        original = cls.__dict__[name]
+        wrapper = self.wrap(original, stage or f"{cls.__name__}.{name}")
+        setattr(cls, name, staticmethod(wrapper) if isinstance(original, staticmethod) else wrapper)
+        self.patched.append((cls, name, original))
+
+    def install(self, targets):
+        """
+        Instrument a list of (class, method names) and start the clock
+
+        Example:
+            profiler.install([(Channel, ["convolve", "add_noise"]), (DFE, ["equalize"])])
+        """
+        for cls, names in targets:
+            for name in names:
+                if name in cls.__dict__:
+                    self.instrument(cls, name)
+        if self.track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.start_time = time.perf_counter()
+
+    def uninstall(self):
+        """Restore all original methods"""
+        for cls, name, original in reversed(self.patched):
+            setattr(cls, name, original)
+        self.patched = []
+        if self.track_allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def report(self):
+        """
+        Per-stage statistics (JSON serialisable), stages sorted by self time
+
+        Returns:
+            dict with 'total_seconds' (since install) and 'stages' {name: stats}
+        """
+        total = time.perf_counter() - self.start_time if self.start_time is not None else 0.0
+        stages = {name: stats.to_dict() for name, stats in
+                  sorted(self.stages.items(), key=lambda item: -item[1].self_seconds) if stats.calls}
+        for stats in stages.values():
+            stats["share"] = stats["self_seconds"] / total if total > 0 else 0.0
+        return {"total_seconds": total, "stages": stages}
+
+    def save(self, path):
+        """Write the report as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=4)
+
+    def print_report(self):
+        print_report(self.report())
+
+SUMMED = ("calls", "seconds", "self_seconds", "symbols", "alloc_bytes")
+
+def merge_reports(reports):
+    """Sum several reports (e.g. the iterations of one SNR point) into one"""
+    merged = {"total_seconds": 0.0, "stages": {}}
+    for report in reports:
+        merged["total_seconds"] += report["total_seconds"]
+        for name, stats in report["stages"].items():
+            total = merged["stages"].setdefault(name, dict.fromkeys(SUMMED, 0))
+            for key in SUMMED:
+                total[key] += stats[key]
+
+    for stats in merged["stages"].values():
+        stats["symbols_per_sec"] = stats["symbols"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        stats["share"] = stats["self_seconds"] / merged["total_seconds"] if merged["total_seconds"] > 0 else 0.0
+    merged["stages"] = dict(sorted(merged["stages"].items(), key=lambda item: -item[1]["self_seconds"]))
+    return merged
+
+def print_report(report):
+    """Table of the per-stage breakdown"""
+    print(f"Stage profile ({report['total_seconds']:.3f} s total, share of self time):")
+    print(f"  {'stage':<32}{'calls':>9}{'self s':>9}{'share':>8}{'incl s':>9}{'symbols/s':>13}")
+    for name, stats in report["stages"].items():
+        print(f"  {name:<32}{stats['calls']:>9}{stats['self_seconds']:>9.3f}{stats['share'] * 100:>7.1f}%"
+              f"{stats['seconds']:>9.3f}{stats['symbols_per_sec']:>13.0f}")
+    outside = report["total_seconds"] - sum(stats["self_seconds"] for stats in report["stages"].values())
+    print(f"  {'(outside instrumented stages)':<41}{outside:>9.3f}")
@@ -0,0 +1,188 @@
+"""
+Symbol interleavers / deinterleavers for the streaming link
+
+Sits between RS encode and Gray mapping (and between Gray decode and RS
+decode on the receive side), on the 16-bit RS symbol stream, so a burst of
+symbol errors from DFE error propagation is spread over several codewords:
+
+- BlockInterleaver: depth D rows of W symbols (W = one codeword) are written
+  row by row and read column by column - a burst of up to D symbols hits
+  each codeword at most once
+- ConvolutionalInterleaver: P branches with per-branch delays (the ZCU102
+  convolutional_interleaver uses (P-1-i) * D on branch i); symbol t goes
+  through branch t mod P. Same spreading as a block interleaver at about half
+  the latency and memory
+
+Both carry their state between calls (process) and are flushed at the end of
+the stream (flush), like the streaming FIR in stream.py. inverse() gives the
+matching deinterleaver, which drops the fill symbols in front of the stream,
+so interleaver + deinterleaver returns the original symbol stream.
+"""
+
+import numpy as np
+
+SYMBOL_BITS = 16
+
+class BlockInterleaver:
+    def __init__(self, depth, width, deinterleave=False):
+        """
+        depth: rows per block (D codewords)
+        width: symbols per row (W, normally the codeword size)
+        deinterleave: act as the matching deinterleaver
+        """
+        if depth < 1 or width < 1:
+            raise ValueError(f"Block interleaver needs depth >= 1 and width >= 1, got {depth} x {width}")
+        self.depth = depth
+        self.width = width
+        self.deinterleave = deinterleave
+        self.buffer = np.zeros(0, dtype=np.int64)
+
+    def inverse(self):
+        """Matching deinterleaver (fresh state)"""
+        return BlockInterleaver(self.depth, self.width, not self.deinterleave)
+
+    def permute(self, block, rows):
+        """(Re)order one block of `rows` rows"""
+        if self.deinterleave:
+            return block.reshape(self.width, rows).T.ravel()
+        return block.reshape(rows, self.width).T.ravel()
+
+    def process(self, data):
+        """Add symbols and return all complete blocks, permuted"""
+        data = np.concatenate([self.buffer, np.asarray(data, dtype=np.int64)])
+        block_size = self.depth * self.width
+        n_blocks = len(data) // block_size
+        self.buffer = data[n_blocks * block_size:]
+        blocks = data[:n_blocks * block_size].reshape(n_blocks, block_size)
+        return np.concatenate([self.permute(block, self.depth) for block in blocks]) if n_blocks else self.buffer[:0]
+
+    def flush(self):
+        """Last, partial block (fewer rows, zero padded to a whole row)"""
+        rows = -(-len(self.buffer) // self.width)
+        block = np.zeros(rows * self.width, dtype=np.int64)
+        block[:len(self.buffer)] = self.buffer
+        self.buffer = self.buffer[:0]
+        return self.permute(block, rows)
+
+    @property
+    def latency_symbols(self):
+        """End-to-end delay of interleaver + deinterleaver: a whole block is buffered on each side"""
+        return 2 * self.depth * self.width
+
+    @property
+    def memory_symbols(self):
+        """Storage of one side (one D x W block)"""
+        return self.depth * self.width
+
+    @property
+    def extra_rows(self):
+        """Codeword rows a stage can release at once beyond its input (held back until a block is full)"""
+        return self.depth
+
+    def describe(self):
+        return f"block {self.depth} x {self.width}"
+
+class ConvolutionalInterleaver:
+    def __init__(self, delays, deinterleave=False):
+        """
+        delays: per-branch delay in branch cycles (P = len(delays) branches,
+                branch i delays its symbols by delays[i] * P symbol periods)
+        deinterleave: act as the matching deinterleaver (branch delays max - delays[i]
+                      and the max(delays) * P fill symbols in front are dropped)
+        """
+        delays = [int(delay) for delay in delays]
+        if not delays or min(delays) < 0:
+            raise ValueError(f"Convolutional interleaver needs non-negative branch delays, got {delays}")
+        self.delays = delays
+        self.deinterleave = deinterleave
+        self.branches = len(delays)
+        self.span = max(delays) * self.branches  # end-to-end delay in symbols
+
+        branch_delays = [max(delays) - delay for delay in delays] if deinterleave else delays
+        self.lags = np.asarray(branch_delays, dtype=np.int64) * self.branches
+        self.history = np.zeros(int(self.lags.max()), dtype=np.int64)  # last symbols seen (zero fill at start)
+        self.position = 0  # symbols processed (branch of symbol t is t mod P)
+        self.skip = self.span if deinterleave else 0
+
+    @classmethod
+    def uniform(cls, branches, depth):
+        """P branches with delays (P-1-i) * D, as the ZCU102 convolutional_interleaver"""
+        return cls([(branches - 1 - i) * depth for i in range(branches)])
+
+    def inverse(self):
+        """Matching deinterleaver (fresh state)"""
+        return ConvolutionalInterleaver(self.delays, not self.deinterleave)
+
+    def process(self, data):
+        """Delay every symbol by its branch delay (output length = input length, minus the skipped fill)"""
+        data = np.asarray(data, dtype=np.int64)
+        buffer = np.concatenate([self.history, data])
+        t = self.position + np.arange(len(data))
+        output = buffer[len(self.history) + np.arange(len(data)) - self.lags[t % self.branches]]
+
+        self.position += len(data)
+        if len(self.history):
+            self.history = buffer[len(buffer) - len(self.history):]
+        if self.skip:
+            dropped = min(self.skip, len(output))
+            output = output[dropped:]
+            self.skip -= dropped
+        return output
+
+    def flush(self):
+        """Interleaver: push the symbols still in the branch delays out with zero fill"""
+        if self.deinterleave:
+            return np.zeros(0, dtype=np.int64)
+        return self.process(np.zeros(self.span, dtype=np.int64))
+
+    @property
+    def latency_symbols(self):
+        """End-to-end delay of interleaver + deinterleaver"""
+        return self.span
+
+    @property
+    def memory_symbols(self):
+        """Storage of one side (sum of the branch delay lines)"""
+        return sum(self.delays)
+
+    @property
+    def extra_rows(self):
+        """Codeword rows a stage can release at once beyond its input (a shifted partial row)"""
+        return 1
+
+    def describe(self):
+        return f"convolutional {self.branches} branches, delays {self.delays}"
+
+def build_interleaver(kind, codeword_size, depth=None, branches=None, delays=None):
+    """
+    Interleaver for the model.py options (None for kind 'none')
+
+    Args:
+        kind: 'none', 'block' or 'convolutional'
+        codeword_size: row width of the block interleaver
+        depth: block rows / convolutional delay step D
+        branches: convolutional branches P
+        delays: explicit convolutional branch delays (overrides branches / depth)
+    """
+    if kind == "none":
+        return None
+    if kind == "block":
+        return BlockInterleaver(depth or 4, codeword_size)
+    if delays:
+        return ConvolutionalInterleaver(delays)
+    return ConvolutionalInterleaver.uniform(branches or 4, depth or 2)
+
+def cost_report(interleaver):
+    """Latency and memory of an interleaver / deinterleaver pair (JSON serialisable)"""
+    memory = 2 * interleaver.memory_symbols
+    return {
+        "interleaver": interleaver.describe(),
+        "latency_symbols": interleaver.latency_symbols,
+        "memory_symbols": memory,
+        "memory_bits": memory * SYMBOL_BITS
+    }
+
+def print_cost(interleaver):
+    report = cost_report(interleaver)
+    print(f"Interleaver: {report['interleaver']} - latency {report['latency_symbols']} symbols, "
+          f"memory {report['memory_symbols']} symbols ({report['memory_bits'] / 8192:.1f} KiB, TX + RX)")
@@ -0,0 +1,164 @@
+"""
+Iteration-count / decode-latency statistics of the 2D (product) RS decoder
+
+Each row + column pass of ReedSolomon2D.decode_codeword is one iteration; the
+hardware rs_2d_decode state machine needs one pass of n2 row + n column
+decodes per iteration, so the iteration count sets decode latency and buffer depth.
+
+Per SNR this collects:
+- a histogram of iterations per block (and how many blocks hit max_iterations)
+- symbols corrected / rows+columns still failing at each iteration index
+- the BER penalty of an iteration cap: the decoder state after c iterations
+  is exactly what a decoder capped at c iterations outputs, so comparing the
+  data symbols after every iteration with the transmitted ones gives the bit
+  errors for every cap c from a single uncapped run
+"""
+
+import json
+import numpy as np
+
+from errorcount import POPCOUNT16, SYMBOL_BITS, symbol_xor
+
+def bit_errors(tx, rx):
+    """Bit errors between two symbol sequences"""
+    return int(POPCOUNT16[symbol_xor(tx, rx)].sum(dtype=np.int64))
+
+def add_padded(total, values):
+    """total + values for 1D int arrays of different lengths"""
+    values = np.asarray(values, dtype=np.int64)
+    if len(values) > len(total):
+        total = np.concatenate([total, np.zeros(len(values) - len(total), dtype=np.int64)])
+    total[:len(values)] += values
+    return total
+
+class IterationProfile:
+    def __init__(self, n, k, n2=None, k2=None):
+        """
+        n, k: RS(n,k) row code of the n2 x n product block
+        n2, k2: column code (default n, k - square block)
+        """
+        self.n = n
+        self.k = k
+        self.n2 = n if n2 is None else n2
+        self.k2 = k if k2 is None else k2
+        self.blocks = 0
+        self.not_converged = 0
+        self.total_bits = 0
+        self.final_bit_errors = 0
+        self.iteration_histogram = np.zeros(1, dtype=np.int64)  # index = iterations of a block
+        # index i = iteration i + 1
+        self.corrections = np.zeros(0, dtype=np.int64)
+        self.failures = np.zeros(0, dtype=np.int64)
+        self.blocks_reaching = np.zeros(0, dtype=np.int64)
+        # extra bit errors (vs the full decode) of a decoder capped after iteration i + 1
+        self.excess_bit_errors = np.zeros(0, dtype=np.int64)
+
+    def update(self, stats, tx_message=None):
+        """
+        Add one decoded block
+
+        Args:
+            stats: stats dict of ReedSolomon2D.decode_codeword(..., return_stats=True)
+            tx_message: transmitted k2 x k data symbols - needed (with stats['history'])
+                        for the cap penalty
+        """
+        iterations = stats["iterations"]
+        self.blocks += 1
+        self.not_converged += not stats["converged"]
+        if iterations >= len(self.iteration_histogram):
+            self.iteration_histogram = add_padded(self.iteration_histogram, np.zeros(iterations + 1, dtype=np.int64))
+        self.iteration_histogram[iterations] += 1
+        self.corrections = add_padded(self.corrections, stats["corrections"])
+        self.failures = add_padded(self.failures, stats["failures"])
+        self.blocks_reaching = add_padded(self.blocks_reaching, np.ones(iterations, dtype=np.int64))
+
+        history = stats.get("history")
+        if tx_message is not None and history:
+            errors = np.array([bit_errors(tx_message, message) for message in history], dtype=np.int64)
+            self.total_bits += len(history[-1]) * SYMBOL_BITS
+            self.final_bit_errors += int(errors[-1])
+            self.excess_bit_errors = add_padded(self.excess_bit_errors, errors - errors[-1])
+
+    def add_summary(self, summary):
+        """Merge a summary() of another run (e.g. another iteration of the same SNR point)"""
+        self.blocks += summary["blocks"]
+        self.not_converged += summary["not_converged"]
+        self.total_bits += summary["total_bits"]
+        self.final_bit_errors += summary["final_bit_errors"]
+        self.iteration_histogram = add_padded(self.iteration_histogram, summary["iteration_histogram"])
+        self.corrections = add_padded(self.corrections, summary["corrections_by_iteration"])
+        self.failures = add_padded(self.failures, summary["failures_by_iteration"])
+        self.blocks_reaching = add_padded(self.blocks_reaching, summary["blocks_reaching_iteration"])
+        self.excess_bit_errors = add_padded(self.excess_bit_errors, summary["excess_bit_errors"])
+
+    def quantile(self, q):
+        """Smallest iteration count covering a fraction q of the blocks"""
+        if self.blocks == 0:
+            return 0
+        cumulative = np.cumsum(self.iteration_histogram)
+        return int(np.searchsorted(cumulative, q * self.blocks))
+
+    def cap_table(self):
+        """
+        Effect of capping the decoder at c iterations, for c = 1 .. max iterations seen
+
+        Returns:
+            list of dicts with 'cap', 'blocks_cut' (blocks that needed more
+            iterations), 'ber' and 'ber_penalty' (BER minus the BER of the full decode)
+        """
+        table = []
+        full_ber = self.final_bit_errors / self.total_bits if self.total_bits else None
+        cumulative = np.cumsum(self.iteration_histogram)
+        for cap in range(1, len(self.iteration_histogram)):
+            row = {"cap": cap, "blocks_cut": int(self.blocks - cumulative[cap])}
+            if self.total_bits:
+                excess = int(self.excess_bit_errors[cap - 1]) if cap - 1 < len(self.excess_bit_errors) else 0
+                row["ber"] = (self.final_bit_errors + excess) / self.total_bits
+                row["ber_penalty"] = row["ber"] - full_ber
+            table.append(row)
+        return table
+
+    def summary(self):
+        """Plain dict of all counters (JSON serialisable)"""
+        mean = (np.arange(len(self.iteration_histogram)) * self.iteration_histogram).sum() / self.blocks if self.blocks else 0.0
+        return {
+            "n": self.n,
+            "k": self.k,
+            "n2": self.n2,
+            "k2": self.k2,
+            "blocks": self.blocks,
+            "not_converged": self.not_converged,
+            "mean_iterations": float(mean),
+            "p99_iterations": self.quantile(0.99),
+            "max_iterations": len(self.iteration_histogram) - 1,
+            "row_decodes_per_iteration": self.n + self.n2,
+            "iteration_histogram": self.iteration_histogram.tolist(),
+            "corrections_by_iteration": self.corrections.tolist(),
+            "failures_by_iteration": self.failures.tolist(),
+            "blocks_reaching_iteration": self.blocks_reaching.tolist(),
+            "total_bits": self.total_bits,
+            "final_bit_errors": self.final_bit_errors,
+            "excess_bit_errors": self.excess_bit_errors.tolist(),
+            "cap_table": self.cap_table()
+        }
+
+    def save(self, path):
+        """Write the summary as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=4)
+
+    def print_line(self):
+        """One line summary of the iteration counts"""
+        summary = self.summary()
+        print(f"Decode iterations: mean {summary['mean_iterations']:.2f}, p99 {summary['p99_iterations']}, "
+              f"max {summary['max_iterations']} ({self.blocks} blocks, {self.not_converged} hit max_iterations)")
+
+    def print_summary(self):
+        """Histograms and the iteration cap table"""
+        print(f"  Blocks by iterations: {self.iteration_histogram.tolist()}")
+        print(f"  Symbols corrected per iteration: {self.corrections.tolist()}")
+        print(f"  Failing rows+columns per iteration: {self.failures.tolist()}")
+        print("  Iteration cap -> blocks cut short, BER (penalty vs full decode):")
+        for row in self.cap_table():
+            ber = f"{row['ber']:.3e} ({row['ber_penalty']:+.3e})" if "ber" in row else "n/a"
+            print(f"    {row['cap']:>4}  {row['blocks_cut']:>8}  {ber}")
@@ -1,14 +1,27 @@
-import random
 import numpy as np
 import scipy as sp
 import sys
 import argparse
 
-from reedsolomon import ReedSolomon1D, ReedSolomon2D
+from reedsolomon import ReedSolomon1D, ReedSolomon2D, product_message
 from encode import Binary, GrayCode
 from slicer import Slicer
 from equalizer import FFE, DFE, LMS
 from pam import PAM
+from stopping import ConfidenceStopper
+from rng import derive_seed, make_rng, random_seed, random_symbols
+from errorcount import ErrorCounter, count_errors, nonzero_bins
+from errorprofile import ErrorProfile
+from iterprofile import IterationProfile
+from stream import link
+from pipeline import pipelined_link
+from interleave import build_interleaver, print_cost
+from prbs import POLYNOMIALS, PRBS, PRBS_SYMBOL_BITS
+from multisnr import BatchDFE, MultiSNRLink
+from precode import DEFAULT_EPF, DEFAULT_RSER, AUILink
+import burstmodel
+from instrument import Profiler
+import eventlog
 
 """
 Enhanced PAM/Reed-Solomon Communication System
@@ -32,14 +45,26 @@ python model.py --mu 0.0000001 --max_iterations 500 --pam_levels 6
 
 # Quick test with minimal data
 python model.py --data_size 32 --training_size 50
+
+# Reproducible run (every random stream is derived from the seed)
+python model.py --pam_levels 6 --snr_db 25.0 --seed 1234
 """
 
 DEBUG = True
 
+log = eventlog.get_logger("model")
+
 def debug_print(*args, **kwargs):
     if DEBUG:
         print(*args, **kwargs)
 
+def code_label(args):
+    """RS(n,k), or RS(n,k)xRS(n2,k2) for a rectangular 2D product code"""
+    label = f"RS({args.n},{args.k})"
+    if args.mode == "2D" and (args.n2 or args.k2):
+        label += f"xRS({args.n2 or args.n},{args.k2 or args.k})"
+    return label
+
 def calculate_sigma_from_snr(snr_db, pam_level, symbol_separation=48):
     """Calculate noise sigma for given SNR using peak power normalization"""
     
@@ -62,6 +87,8 @@ class Transmitter:
 
         self.N = self.config.get("N") or 16
         self.K = self.config.get("K") or 8
+        self.N2 = self.config.get("N2") or self.N  # 2D column code (default square block)
+        self.K2 = self.config.get("K2") or self.K
         self.N_ERR = self.config.get("N_ERR") or 3
         self.MODE = self.config.get("MODE", "1D")
         self.METHOD = self.config.get("METHOD", "random")
@@ -71,6 +98,9 @@ class Transmitter:
         
         # Store original data for error calculation
         self.original_symbols = []
+        
+        # RS codewords of the last transmission (for error profiles / miscorrection checks)
+        self.encoded_codewords = []
 
     def transmit(self, data):
         "transmit the data through the channel"
@@ -78,13 +108,14 @@ class Transmitter:
         
         # Store original data for error calculation
         self.original_symbols = data.copy()
+        self.encoded_codewords = []
 
         if self.MODE == "1D":
             rs = ReedSolomon1D(self.N, self.K)
             size = self.K
         elif self.MODE == "2D":
-            rs = ReedSolomon2D(self.N, self.K)
-            size = self.K * self.K if not self.raw else self.N * self.N
+            rs = ReedSolomon2D(self.N, self.K, self.N2, self.K2)
+            size = self.K * self.K2 if not self.raw else self.N * self.N2
 
         # encode each chunk individually (like physical systems)
         for i in range(len(data)):
@@ -118,6 +149,7 @@ class Transmitter:
             encoded_data = data
         else:
             encoded_data = rs.encode(data, self.N, self.K)
+            self.encoded_codewords.append(encoded_data)
 
         # bit encoding
         encoded_bits = Binary.bit_encode(encoded_data)
@@ -130,12 +162,16 @@ class Transmitter:
 
 
 class Channel:
-    def __init__(self, h=None, receiver=None, config=None, clean=False, sigma=None):
+    def __init__(self, h=None, receiver=None, config=None, clean=False, sigma=None, rng=None):
+        """
+        rng: numpy Generator for the channel noise (swap it per chunk for independent streams)
+        """
         self.receiver = receiver
         self.config = config or {}
         self.h = h if h is not None else [1, 0.5]  # default channel response
         self.sigma = sigma if sigma is not None else self.config.get("SIGMA", 5)  # default sigma
         self.clean = clean  # if True, we don't apply ISI or noise
+        self.rng = rng if rng is not None else make_rng(self.config.get("SEED", 0), "noise")
 
     def get_channel_response(self):
         return self.h
@@ -156,11 +192,11 @@ class Channel:
         if mode == "none":
             return data
         elif mode == "gaussian":
-            noise = np.random.normal(0, self.sigma, len(data))
+            noise = self.rng.normal(0, self.sigma, len(data))
             return [d + n for d, n in zip(data, noise)]
         elif mode == "uniform":
             # add uniform noise
-            noise = [random.randint(range[0], range[1]) for _ in data]
+            noise = self.rng.integers(range[0], range[1] + 1, len(data)).tolist()
             return [d + n for d, n in zip(data, noise)]
         else:
             raise ValueError(f"Unknown noise mode: {mode}")
@@ -194,10 +230,20 @@ class Receiver:
         self.config = config or {}
         self.N = self.config.get("N") or 16
         self.K = self.config.get("K") or 8
+        self.N2 = self.config.get("N2") or self.N  # 2D column code (default square block)
+        self.K2 = self.config.get("K2") or self.K
         self.MODE = self.config.get("MODE", "1D")
 
         self.received = []
         self.reference = [] # n-pam symbols received from the channel (for equalizer training)
+        
+        # RS codewords before / after decoding and detected decoder failures of the last decode
+        self.received_codewords = []
+        self.corrected_codewords = []
+        self.decode_failed = []
+        
+        # 2D decoder iteration statistics of the last decode (config "ITERATION_STATS")
+        self.decode_stats = []
 
         self.ffe = ffe
         self.dfe = dfe
@@ -243,22 +289,13 @@ class Receiver:
 
     def update_error_counters(self, original_chunk, received_chunk):
         """Update error counters after each chunk processing using same logic as calculate_ber"""
-        min_length = min(len(original_chunk), len(received_chunk))
-        if min_length > 0:
-            # Symbol errors - same logic as existing SER calculation
-            chunk_symbol_errors = sum(1 for a, b in zip(original_chunk[:min_length], received_chunk[:min_length]) if a != b)
-            
-            # Bit errors - same logic as existing calculate_ber method
-            original_bits = Binary.bit_encode(original_chunk[:min_length])
-            received_bits = Binary.bit_encode(received_chunk[:min_length])
-            min_bit_length = min(len(original_bits), len(received_bits))
-            chunk_bit_errors = sum(1 for a, b in zip(original_bits[:min_bit_length], received_bits[:min_bit_length]) if a != b)
-            
-            # Update cumulative counters
-            self.cumulative_symbol_errors += chunk_symbol_errors
-            self.cumulative_bit_errors += chunk_bit_errors
-            self.cumulative_symbols_processed += min_length
-            self.cumulative_bits_processed += min_bit_length
+        counts = count_errors(original_chunk, received_chunk)
+        
+        # Update cumulative counters
+        self.cumulative_symbol_errors += counts['symbol_errors']
+        self.cumulative_bit_errors += counts['bit_errors']
+        self.cumulative_symbols_processed += counts['total_symbols']
+        self.cumulative_bits_processed += counts['total_bits']
 
     def get_cumulative_stats(self):
         """Return current cumulative BER/SER statistics"""
@@ -276,26 +313,12 @@ class Receiver:
 
     def calculate_ber(self, transmitter):
         """Calculate BER by comparing original symbols vs final received symbols"""
-        min_length = min(len(transmitter.original_symbols), len(self.received))
-        if min_length > 0:
-            # Convert original symbols to bits
-            original_symbol_bits = Binary.bit_encode(transmitter.original_symbols[:min_length])
-            # Convert received symbols to bits  
-            received_symbol_bits = Binary.bit_encode(self.received[:min_length])
-            
-            # Compare bits
-            min_bit_length = min(len(original_symbol_bits), len(received_symbol_bits))
-            bit_errors = sum(1 for a, b in zip(original_symbol_bits[:min_bit_length], received_symbol_bits[:min_bit_length]) if a != b)
-            total_bits = min_bit_length
-            ber = bit_errors / total_bits if total_bits > 0 else 1.0
-        else:
-            bit_errors = 0
-            total_bits = 0
-            ber = 1.0
+        counts = count_errors(transmitter.original_symbols, self.received)
+        total_bits = counts['total_bits']
         
         return {
-            'ber': ber,
-            'bit_errors': bit_errors,
+            'ber': counts['bit_errors'] / total_bits if total_bits > 0 else 1.0,
+            'bit_errors': counts['bit_errors'],
             'total_bits': total_bits
         }
 
@@ -312,12 +335,12 @@ class Receiver:
             # Calculate expected bits per chunk (before RS encoding)
             expected_bits_per_chunk = self.K * 16
         elif self.MODE == "2D":
-            rs = ReedSolomon2D(self.N, self.K)
+            rs = ReedSolomon2D(self.N, self.K, self.N2, self.K2)
             max_iterations = self.config.get("MAX_ITERATIONS_RS_2D", 250)
             decode_args = (self.N, self.K, max_iterations)
-            size = self.N * self.N
+            size = self.N * self.N2
             # Calculate expected bits per chunk (before RS encoding)  
-            expected_bits_per_chunk = self.K * self.K * 16
+            expected_bits_per_chunk = self.K * self.K2 * 16
 
         # Calculate how many gray symbols each chunk should produce
         bits_per_symbol = 2 if n_levels == 4 else (5 if n_levels == 6 else 3)
@@ -340,7 +363,7 @@ class Receiver:
             chunk_bits = GrayCode.gray_decode(chunk_symbols, n_levels)
             
             # Remove padding: trim to expected length
-            clean_chunk_bits = chunk_bits[:expected_bits_per_chunk + (size - (self.K if self.MODE == "1D" else self.K * self.K)) * 16]
+            clean_chunk_bits = chunk_bits[:expected_bits_per_chunk + (size - (self.K if self.MODE == "1D" else self.K * self.K2)) * 16]
             all_clean_bits.extend(clean_chunk_bits)
         
         # Convert clean bits back to symbols and process normally
@@ -348,6 +371,11 @@ class Receiver:
 
         # rs decode - decode each 'size' symbols
         symbols = []
+        self.received_codewords = []
+        self.corrected_codewords = []
+        self.decode_failed = []
+        self.decode_stats = []
+        collect_stats = self.MODE == "2D" and self.config.get("ITERATION_STATS", False)
         if self.raw:
             symbols = decoded_data
         else:
@@ -356,11 +384,18 @@ class Receiver:
                 if len(data_slice) < size:
                     data_slice += [0] * (size - len(data_slice))
 
-                decoded_slice = rs.decode(data_slice, *decode_args)
-                if decoded_slice is None:
-                    symbols.extend(data_slice[:self.K if self.MODE == "1D" else self.K * self.K])
+                # on a detected failure the received (1D) / partially corrected (2D) block is passed on
+                if collect_stats:
+                    codeword, failed, stats = rs.decode_codeword(data_slice, *decode_args,
+                                                                 return_stats=True, keep_history=True)
+                    self.decode_stats.append(stats)
                 else:
-                    symbols.extend(decoded_slice if self.MODE == "1D" else decoded_slice)
+                    codeword, failed = rs.decode_codeword(data_slice, *decode_args)
+                symbols.extend(rs.message(codeword, self.N, self.K))
+
+                self.received_codewords.append(data_slice)
+                self.corrected_codewords.append(codeword)
+                self.decode_failed.append(failed)
 
         return symbols
 
@@ -402,6 +437,74 @@ class Receiver:
         # store the received data
         self.received = decoded_data[:]
 
+def data_block_size(config, raw):
+    """Data symbols per transmitted block (one RS codeword's message, or one raw chunk)"""
+    if config["MODE"] == "1D":
+        return config["K"]
+    return config["N"] * config["N2"] if raw else config["K"] * config["K2"]
+
+def build_prbs(args):
+    """PRBS data source for --prbs (None = uniform random data symbols)"""
+    if args.prbs is None:
+        return None
+    return PRBS(args.prbs, args.prbs_seed)
+
+def build_aui_links(args, seed):
+    """(aui1, aui2) EPF links before RS encoding / after RS decoding (precode.AUILink, None if off)"""
+    precode = args.precode in ("aui", "all")
+    return tuple(
+        AUILink(name, args.epf_rser, args.epf, precode, make_rng(seed, "epf", name))
+        if args.aui_links in (name, "both") else None
+        for name in ("aui1", "aui2")
+    )
+
+def data_symbols(prbs, rng, offset, size):
+    """size data symbols: the PRBS from data symbol `offset` on, or random ones from rng"""
+    if prbs is None:
+        return random_symbols(rng, size)
+    return prbs.seek(offset * PRBS_SYMBOL_BITS).symbols(size, PRBS_SYMBOL_BITS).tolist()
+
+def build_error_profile(config, raw):
+    """Per-codeword error profile / decoder outcome collector (RS modes only)"""
+    if raw:
+        return None
+    return ErrorProfile(config["N"], config["K"], config["MODE"], config["N2"], config["K2"])
+
+def report_error_profile(profile, args):
+    """Print decoder outcomes, plus the histograms (and JSON) if requested"""
+    if profile is None:
+        return
+    profile.print_outcomes()
+    if args.error_profile or args.error_profile_json:
+        profile.print_summary()
+    if args.error_profile_json:
+        profile.save(args.error_profile_json)
+        print(f"Error profile saved to {args.error_profile_json}")
+
+def build_iteration_profile(config, raw):
+    """2D decoder iteration count / cap penalty collector (2D RS mode only)"""
+    if raw or config["MODE"] != "2D":
+        return None
+    return IterationProfile(config["N"], config["K"], config["N2"], config["K2"])
+
+def update_iteration_profile(iteration_profile, decode_stats, tx_codewords, n, k):
+    """Add the decoder stats of a batch of blocks, compared against the transmitted data"""
+    if iteration_profile is None:
+        return
+    for stats, codeword in zip(decode_stats, tx_codewords):
+        iteration_profile.update(stats, product_message(list(codeword), n, k, iteration_profile.k2))
+
+def report_iteration_profile(iteration_profile, args):
+    """Print the iteration summary line, plus histograms / cap table (and JSON) if requested"""
+    if iteration_profile is None:
+        return
+    iteration_profile.print_line()
+    if args.iteration_profile or args.iteration_profile_json:
+        iteration_profile.print_summary()
+    if args.iteration_profile_json:
+        iteration_profile.save(args.iteration_profile_json)
+        print(f"Iteration profile saved to {args.iteration_profile_json}")
+
 def run_single_mode(args):
     """Run single-shot mode (existing behavior)"""
     # Use parsed arguments
@@ -414,6 +517,7 @@ def run_single_mode(args):
     training_size = args.training_size
     raw_mode = args.raw
     clean_mode = args.clean
+    seed = args.seed if args.seed is not None else random_seed()
     
     # Use consistent symbol separation for peak power normalization
     symbol_separation = 48.0
@@ -421,16 +525,17 @@ def run_single_mode(args):
     # Determine sigma: use provided sigma or calculate from SNR
     if args.sigma is not None:
         sigma = args.sigma
-        mode_str = "RAW" if raw_mode else f"RS({N},{K})"
+        mode_str = "RAW" if raw_mode else code_label(args)
         print(f"Testing {mode_str} with {pam_levels}-PAM using sigma={sigma}")
     else:
         snr_db = args.snr_db
         sigma = calculate_sigma_from_snr(snr_db, pam_levels, symbol_separation)
-        mode_str = "RAW" if raw_mode else f"RS({N},{K})"
+        mode_str = "RAW" if raw_mode else code_label(args)
         print(f"Testing {mode_str} with {pam_levels}-PAM at {snr_db} dB SNR (peak power normalized)")
         print(f"Calculated sigma: {sigma:.6f}")
     
     print(f"Symbol separation: {symbol_separation} (peak power normalization)")
+    print(f"Seed: {seed}")
     
     mode_flags = []
     if raw_mode: mode_flags.append("RAW (no Reed-Solomon)")
@@ -455,11 +560,14 @@ def run_single_mode(args):
     config = {
         "N": N,
         "K": K,
+        "N2": args.n2 or N,
+        "K2": args.k2 or K,
         "MAX_ITERATIONS_RS_2D": MAX_ITERATIONS_RS_2D,
         "N_ERR": 3,
         "MODE": args.mode,
-        "SEED": 0,
+        "SEED": seed,
         "EQ_MODE": "lms", # "zero_forcing" or "lms" 
+        "ITERATION_STATS": args.mode == "2D" and not args.raw,
     }
     receiver = Receiver(
         config=config,
@@ -486,7 +594,7 @@ def run_single_mode(args):
     # Skip training and equalization if clean mode is enabled
     if not clean_mode and config['EQ_MODE'] == "lms":
         # Training phase - use random data for better constellation coverage
-        training_data = [random.randint(0, 225) for _ in range(training_size)]
+        training_data = random_symbols(make_rng(seed, "train", "data"), training_size)
 
         # Clean training (no noise)
         transmitter.raw = True
@@ -497,6 +605,7 @@ def run_single_mode(args):
 
         # Noisy training 
         channel.clean = False
+        channel.rng = make_rng(seed, "train", "noise")
         transmitter.transmit(training_data)
         noisy_response = receiver.reference[:]
 
@@ -510,36 +619,36 @@ def run_single_mode(args):
     receiver.adapt_weights = not clean_mode  # No adaptation needed in clean mode
 
     # Generate test data of specified size
-    test_data = [random.randint(0, 225) for _ in range(data_size)]
+    test_data = data_symbols(build_prbs(args), make_rng(seed, "test", "data"), 0, data_size)
+    channel.rng = make_rng(seed, "test", "noise")
 
     # Transmit and receive
     transmitter.transmit(test_data)
-
-    # Calculate POST-FEC SER (Final decoded symbols vs original)
-    received_data = receiver.received
-    min_length = min(len(test_data), len(received_data))
-    symbol_errors = sum(1 for a, b in zip(test_data[:min_length], received_data[:min_length]) if a != b)
+    profile = build_error_profile(config, raw_mode)
+    if profile is not None:
+        profile.update(transmitter.encoded_codewords, receiver.received_codewords,
+                       receiver.corrected_codewords, receiver.decode_failed)
+    iteration_profile = build_iteration_profile(config, raw_mode)
+    update_iteration_profile(iteration_profile, receiver.decode_stats, transmitter.encoded_codewords, N, K)
+
+    # Calculate POST-FEC SER / BER (Final decoded symbols vs original)
+    counts = count_errors(test_data, receiver.received, data_block_size(config, raw_mode))
+    min_length = counts['total_symbols']
+    symbol_errors = counts['symbol_errors']
+    total_bit_errors = counts['bit_errors']
+    total_bits = counts['total_bits']
     ser = symbol_errors / min_length if min_length > 0 else 1.0
-
-    # Calculate POST-FEC BER (Final decoded symbols vs original)
-    if min_length > 0:
-        # Convert original and final received symbols to bits
-        original_bits = Binary.bit_encode(test_data[:min_length])
-        received_bits = Binary.bit_encode(received_data[:min_length])
-        
-        # Compare bits
-        min_bit_length = min(len(original_bits), len(received_bits))
-        bit_errors = sum(1 for a, b in zip(original_bits[:min_bit_length], received_bits[:min_bit_length]) if a != b)
-        ber = bit_errors / min_bit_length if min_bit_length > 0 else 1.0
-    else:
-        ber = 1.0
+    ber = total_bit_errors / total_bits if total_bits > 0 else 1.0
 
     # Print results in original format
-    total_bit_errors = int(ber * min_bit_length) if min_length > 0 else 0
-    total_bits = min_bit_length if min_length > 0 else 0
-    
     print(f"BER: {ber:.5f} ({total_bit_errors} errors in {total_bits} bits)")
     print(f"SER: {ser:.5f} ({symbol_errors} errors in {min_length} symbols)")
+    log.info("result", mode="single", ber=ber, ser=ser, bit_errors=total_bit_errors, bits=total_bits,
+             symbol_errors=symbol_errors, symbols=min_length)
+    debug_print(f"Bit errors per bit position (MSB first): {counts['bit_position_histogram'].tolist()}")
+    debug_print(f"Blocks by number of wrong symbols (non-empty bins): {nonzero_bins(counts['codeword_histogram'])}")
+    report_error_profile(profile, args)
+    report_iteration_profile(iteration_profile, args)
 
 
 def check_error_limit_reached(cumulative_bit_errors, max_bit_errors):
@@ -550,28 +659,107 @@ def check_data_limit_reached(cumulative_symbols_processed, max_data_symbols):
     """Check if the maximum data limit has been reached"""
     return cumulative_symbols_processed >= max_data_symbols
 
-def evaluate_stopping_criteria(cumulative_bit_errors, max_bit_errors, cumulative_symbols_processed, max_data_symbols):
+def evaluate_stopping_criteria(cumulative_bit_errors, max_bit_errors, cumulative_symbols_processed, max_data_symbols,
+                               cumulative_bits_processed=0, stopper=None):
     """
     Evaluate stopping criteria after each chunk and return stopping decision
+
+    If a ConfidenceStopper is given, it replaces the fixed error limit - the
+    data limit still applies.
     
     Returns:
         tuple: (should_stop, stop_reason)
         - should_stop: boolean indicating if transmission should stop
-        - stop_reason: string indicating which criterion was triggered ('error_limit', 'data_limit', or None)
+        - stop_reason: string indicating which criterion was triggered ('error_limit', 'data_limit',
+          'confidence', 'above_cliff', 'below_cliff', or None)
     """
-    if check_error_limit_reached(cumulative_bit_errors, max_bit_errors):
+    if stopper is not None:
+        should_stop, stop_reason = stopper.check(cumulative_bit_errors, cumulative_bits_processed)
+        if should_stop:
+            return True, stop_reason
+    elif check_error_limit_reached(cumulative_bit_errors, max_bit_errors):
         return True, "error_limit"
-    elif check_data_limit_reached(cumulative_symbols_processed, max_data_symbols):
+
+    if check_data_limit_reached(cumulative_symbols_processed, max_data_symbols):
         return True, "data_limit"
     else:
         return False, None
 
+def build_stopper(args):
+    """Create the confidence-interval stopper from the CLI arguments (None if disabled)"""
+    if args.target_rel_width is None:
+        return None
+    return ConfidenceStopper(
+        rel_width=args.target_rel_width,
+        confidence=args.confidence,
+        method=args.ci_method,
+        ber_high=args.cliff_ber_high,
+        ber_low=args.cliff_ber_low
+    )
+
+# [pre, ..., cursor, post, ...] - channel response of continuous mode
+CHANNEL_RESPONSE = [0.2, 1.0, 0.4]
+
+def continuous_config(args, seed):
+    """Link configuration of continuous mode (Transmitter / Receiver / link_codec)"""
+    return {
+        "N": args.n,
+        "K": args.k,
+        "N2": args.n2 or args.n,
+        "K2": args.k2 or args.k,
+        "MAX_ITERATIONS_RS_2D": args.max_iterations,
+        "N_ERR": 3,
+        "MODE": args.mode,
+        "SEED": seed,
+        "EQ_MODE": "lms", # "zero_forcing" or "lms"
+        "ITERATION_STATS": args.mode == "2D" and not args.raw,
+    }
+
+def build_continuous_link(config, pam, h, sigma, mu, raw, clean, symbol_separation=48.0):
+    """
+    Untrained equalizers and the Transmitter -> Channel -> Receiver chain of continuous mode
+
+    Returns:
+        (transmitter, channel, receiver) - the equalizers are receiver.ffe / dfe / lms
+    """
+    ffe = FFE(tap_weights=None, n_pre_taps=1, n_post_taps=1)
+    dfe = DFE(symbol_seperation=symbol_separation, tap_weights=None, n_taps=2, pam=pam)
+    lms = LMS(mu=mu, ffe=ffe, dfe=dfe, pam=pam)
+
+    receiver = Receiver(config=config, ffe=ffe, dfe=dfe, lms=lms, pam=pam, raw=raw)
+    channel = Channel(config=config, receiver=receiver, h=h, sigma=sigma, clean=clean)
+    transmitter = Transmitter(config=config, channel=channel, pam=pam, raw=raw)
+    return transmitter, channel, receiver
+
+def train_link(transmitter, channel, receiver, seed, training_size):
+    """
+    LMS training on random data: the same symbols sent clean and noisy, the
+    clean response as the reference (leaves the chain in raw / noisy state)
+    """
+    # Training phase - use random data for better constellation coverage
+    training_data = random_symbols(make_rng(seed, "train", "data"), training_size)
+
+    # Clean training (no noise)
+    transmitter.raw = True
+    receiver.raw = True
+    channel.clean = True
+    transmitter.transmit(training_data)
+    clean_response = receiver.reference[:]
+
+    # Noisy training
+    channel.clean = False
+    channel.rng = make_rng(seed, "train", "noise")
+    transmitter.transmit(training_data)
+    noisy_response = receiver.reference[:]
+
+    # Train LMS equalizer
+    receiver.lms.equalize(noisy_response, reference=clean_response)
+
 def run_continuous_mode(args):
     """Run continuous mode until stopping criteria met"""
     # Use parsed arguments
     N = args.n
     K = args.k
-    MAX_ITERATIONS_RS_2D = args.max_iterations
     mu = args.mu
     pam_levels = args.pam_levels
     chunk_size = args.chunk_size
@@ -580,6 +768,9 @@ def run_continuous_mode(args):
     training_size = args.training_size
     raw_mode = args.raw
     clean_mode = args.clean
+    seed = args.seed if args.seed is not None else random_seed()
+    stopper = build_stopper(args)
+    prbs = build_prbs(args)
     
     # Use consistent symbol separation for peak power normalization
     symbol_separation = 48.0
@@ -587,87 +778,47 @@ def run_continuous_mode(args):
     # Determine sigma: use provided sigma or calculate from SNR
     if args.sigma is not None:
         sigma = args.sigma
-        mode_str = "RAW" if raw_mode else f"RS({N},{K})"
+        mode_str = "RAW" if raw_mode else code_label(args)
         print(f"Testing {mode_str} with {pam_levels}-PAM using sigma={sigma} (Continuous Mode)")
     else:
         snr_db = args.snr_db
         sigma = calculate_sigma_from_snr(snr_db, pam_levels, symbol_separation)
-        mode_str = "RAW" if raw_mode else f"RS({N},{K})"
+        mode_str = "RAW" if raw_mode else code_label(args)
         print(f"Testing {mode_str} with {pam_levels}-PAM at {snr_db} dB SNR (peak power normalized) (Continuous Mode)")
         print(f"Calculated sigma: {sigma:.6f}")
     
     print(f"Symbol separation: {symbol_separation} (peak power normalization)")
+    print(f"Seed: {seed}")
     
     mode_flags = []
     if raw_mode: mode_flags.append("RAW (no Reed-Solomon)")
     if clean_mode: mode_flags.append("CLEAN (no channel effects)")
+    if args.precode != "none": mode_flags.append(f"PRECODE 1/(1+D) ({args.precode})")
+    if args.aui_links != "none":
+        mode_flags.append(f"EPF AUI links ({args.aui_links}, RSER={args.epf_rser:.3g}, EPF={args.epf:.3g})")
     if mode_flags:
         print(f"Mode: {', '.join(mode_flags)}")
     
     print(f"Chunk size: {chunk_size}, Max bit errors: {max_bit_errors}, Max data symbols: {max_data_symbols}")
+    if stopper is not None:
+        print(f"Early stopping: {stopper.method} interval, {stopper.confidence:.0%} confidence, "
+              f"relative width <= {stopper.rel_width} (cliff region: {stopper.ber_low} - {stopper.ber_high})")
     print()
     
     # Example usage
-    h = [0.2, 1.0, 0.4]  # [pre, ..., cursor, post, ...] - channel response
+    h = CHANNEL_RESPONSE
 
     # Create PAM instance with consistent symbol separation for peak power normalization
     pam = PAM(n=pam_levels, symbol_separation=symbol_separation)
 
-    ffe = FFE(tap_weights=None, n_pre_taps=1, n_post_taps=1)
-    dfe = DFE(symbol_seperation=symbol_separation, tap_weights=None, n_taps=2, pam=pam)
-
-    lms = LMS(mu=mu, ffe=ffe, dfe=dfe, pam=pam)
-
-    config = {
-        "N": N,
-        "K": K,
-        "MAX_ITERATIONS_RS_2D": MAX_ITERATIONS_RS_2D,
-        "N_ERR": 3,
-        "MODE": args.mode,
-        "SEED": 0,
-        "EQ_MODE": "lms", # "zero_forcing" or "lms" 
-    }
-    receiver = Receiver(
-        config=config,
-        ffe=ffe,
-        dfe=dfe,
-        lms=lms,
-        pam=pam,
-        raw=raw_mode
-    )
-    channel = Channel(
-        config=config,
-        receiver=receiver,
-        h=h,
-        sigma=sigma,
-        clean=clean_mode
-    )
-    transmitter = Transmitter(
-        config=config,
-        channel=channel,
-        pam=pam,
-        raw=raw_mode
-    )
+    config = continuous_config(args, seed)
+    transmitter, channel, receiver = build_continuous_link(config, pam, h, sigma, mu, raw_mode, clean_mode,
+                                                           symbol_separation)
+    ffe, dfe, lms = receiver.ffe, receiver.dfe, receiver.lms
 
     # Skip training and equalization if clean mode is enabled
     if not clean_mode and config['EQ_MODE'] == "lms":
-        # Training phase - use random data for better constellation coverage
-        training_data = [random.randint(0, 225) for _ in range(training_size)]
-
-        # Clean training (no noise)
-        transmitter.raw = True
-        receiver.raw = True
-        channel.clean = True
-        transmitter.transmit(training_data)
-        clean_response = receiver.reference[:]
-
-        # Noisy training 
-        channel.clean = False
-        transmitter.transmit(training_data)
-        noisy_response = receiver.reference[:]
-
-        # Train LMS equalizer
-        lms.equalize(noisy_response, reference=clean_response)
+        train_link(transmitter, channel, receiver, seed, training_size)
 
     # Test phase - set up for continuous mode
     transmitter.raw = raw_mode
@@ -676,66 +827,308 @@ def run_continuous_mode(args):
     receiver.adapt_weights = not clean_mode  # No adaptation needed in clean mode
 
     # Initialize cumulative counters for continuous mode
-    cumulative_bit_errors = 0
-    cumulative_symbol_errors = 0
-    cumulative_bits_processed = 0
-    cumulative_symbols_processed = 0
+    counter = ErrorCounter(data_block_size(config, raw_mode))
+    profile = build_error_profile(config, raw_mode)
+    iteration_profile = build_iteration_profile(config, raw_mode)
+    if iteration_profile is not None and (args.burst_model or args.pipeline_workers > 0):
+        # decode iterations are only recorded by the chunked and single-process streaming links
+        debug_print("Decode iterations: not collected with --burst_model / --pipeline_workers")
+        iteration_profile = None
     chunks_processed = 0
     stop_reason = ""
 
+    burst = load_burst_model(args, config, seed, pam, h, sigma, ffe, dfe) if args.burst_model else None
+    if burst is not None:
+        chunks_processed, stop_reason = run_burst_model(args, config, seed, burst, counter, profile, stopper)
+    elif args.streaming:
+        chunks_processed, stop_reason = run_streaming_link(
+            args, config, seed, pam, h, sigma, ffe, dfe, lms, counter, profile, stopper, iteration_profile
+        )
+
     # Continuous transmission loop
-    while True:
-        # Generate chunk of random data
-        chunk_data = [random.randint(0, 225) for _ in range(chunk_size)]
+    while not (args.streaming or args.burst_model):
+        # Generate chunk of random data (own data / noise streams per chunk)
+        chunk_data = data_symbols(prbs, make_rng(seed, "chunk", chunks_processed, "data"),
+                                  chunks_processed * chunk_size, chunk_size)
+        channel.rng = make_rng(seed, "chunk", chunks_processed, "noise")
         
         # Transmit and receive chunk
         transmitter.transmit(chunk_data)
         received_chunk = receiver.received
         
         # Calculate errors for this chunk
-        min_length = min(len(chunk_data), len(received_chunk))
-        if min_length > 0:
-            # Symbol errors
-            chunk_symbol_errors = sum(1 for a, b in zip(chunk_data[:min_length], received_chunk[:min_length]) if a != b)
-            
-            # Bit errors
-            original_bits = Binary.bit_encode(chunk_data[:min_length])
-            received_bits = Binary.bit_encode(received_chunk[:min_length])
-            min_bit_length = min(len(original_bits), len(received_bits))
-            chunk_bit_errors = sum(1 for a, b in zip(original_bits[:min_bit_length], received_bits[:min_bit_length]) if a != b)
-            
-            # Update cumulative counters
-            cumulative_symbol_errors += chunk_symbol_errors
-            cumulative_bit_errors += chunk_bit_errors
-            cumulative_symbols_processed += min_length
-            cumulative_bits_processed += min_bit_length
+        counter.update(chunk_data, received_chunk)
+        if profile is not None:
+            profile.update(transmitter.encoded_codewords, receiver.received_codewords,
+                           receiver.corrected_codewords, receiver.decode_failed)
+        update_iteration_profile(iteration_profile, receiver.decode_stats, transmitter.encoded_codewords, N, K)
         
         chunks_processed += 1
         
         # Evaluate stopping criteria after each chunk
         should_stop, stop_reason = evaluate_stopping_criteria(
-            cumulative_bit_errors, max_bit_errors, 
-            cumulative_symbols_processed, max_data_symbols
+            counter.bit_errors, max_bit_errors, 
+            counter.total_symbols, max_data_symbols,
+            counter.total_bits, stopper
         )
         
         if should_stop:
             break
     
     # Calculate final statistics
-    ber = cumulative_bit_errors / cumulative_bits_processed if cumulative_bits_processed > 0 else 1.0
-    ser = cumulative_symbol_errors / cumulative_symbols_processed if cumulative_symbols_processed > 0 else 1.0
+    ber = counter.stats()['ber']
+    ser = counter.stats()['ser']
+    cumulative_bit_errors = counter.bit_errors
+    cumulative_symbol_errors = counter.symbol_errors
+    cumulative_bits_processed = counter.total_bits
+    cumulative_symbols_processed = counter.total_symbols
     
     # Print results in same format as single mode - exact format compatibility
     print(f"BER: {ber:.5f} ({cumulative_bit_errors} errors in {cumulative_bits_processed} bits)")
     print(f"SER: {ser:.5f} ({cumulative_symbol_errors} errors in {cumulative_symbols_processed} symbols)")
+    log.info("result", mode="continuous", ber=ber, ser=ser, bit_errors=cumulative_bit_errors,
+             bits=cumulative_bits_processed, symbol_errors=cumulative_symbol_errors,
+             symbols=cumulative_symbols_processed, stop_reason=stop_reason, chunks=chunks_processed)
     
     # Report which stopping criterion was triggered (for debugging/validation)
     if stop_reason == "error_limit":
         debug_print(f"Stopped due to error limit: {cumulative_bit_errors} >= {max_bit_errors} bit errors")
     elif stop_reason == "data_limit":
         debug_print(f"Stopped due to data limit: {cumulative_symbols_processed} >= {max_data_symbols} symbols processed")
+    elif stop_reason in ("confidence", "above_cliff", "below_cliff"):
+        lower, upper = stopper.interval(cumulative_bit_errors, cumulative_bits_processed)
+        debug_print(f"Stopped early ({stop_reason}): BER interval [{lower:.3e}, {upper:.3e}]")
     debug_print(f"Processed {chunks_processed} chunks total")
+    debug_print(f"Bit errors per bit position (MSB first): {counter.bit_position_histogram.tolist()}")
+    debug_print(f"Blocks by number of wrong symbols (non-empty bins): {nonzero_bins(counter.codeword_histogram)}")
+    report_error_profile(profile, args)
+    report_iteration_profile(iteration_profile, args)
+
+    if args.burst_model_validate:
+        validate_burst_model(args, config, seed, burst, pam, h, sigma, ffe, dfe, counter, stopper)
+
+
+def link_codec(args, config):
+    """(rs, decode_args, message_size, codeword_size) of the streaming link for this configuration"""
+    N, K = config["N"], config["K"]
+    if args.raw:
+        size = data_block_size(config, True)
+        return None, (), size, size
+    if config["MODE"] == "1D":
+        return ReedSolomon1D(N, K), (N, K), K, N
+    rs = ReedSolomon2D(N, K, config["N2"], config["K2"])
+    return rs, (N, K, config["MAX_ITERATIONS_RS_2D"]), K * config["K2"], N * config["N2"]
+
+def consume_blocks(blocks, args, counter, profile, stopper, iteration_profile=None, n=None, k=None):
+    """
+    Count the errors of link blocks (stream.link dicts) until a stopping criterion is met
+
+    Returns:
+        (blocks_processed, stop_reason)
+    """
+    blocks_processed = 0
+    stop_reason = None
+    try:
+        for block in blocks:
+            counter.update(block['tx_messages'].ravel(), block['rx_messages'].ravel())
+            if profile is not None:
+                profile.update(block['tx_codewords'], block['rx_codewords'],
+                               block['corrected_codewords'], block['failed'])
+            if 'decode_stats' in block:
+                update_iteration_profile(iteration_profile, block['decode_stats'], block['tx_codewords'], n, k)
+            blocks_processed += 1
+
+            should_stop, stop_reason = evaluate_stopping_criteria(
+                counter.bit_errors, args.max_bit_errors,
+                counter.total_symbols, args.max_data_symbols,
+                counter.total_bits, stopper
+            )
+            if should_stop:
+                break
+    finally:
+        blocks.close()  # stops the pipeline worker processes
+
+    return blocks_processed, stop_reason
+
+def load_burst_model(args, config, seed, pam, h, sigma, ffe, dfe):
+    """
+    Burst model of the trained link (burstmodel.py), from the cache or measured now
+
+    The cache key is the configuration the error process depends on: noise, PAM
+    level, channel, equalizer taps (rounded) and code - not the seed, so runs with
+    the same trained taps share one measurement.
+    """
+    rs, _, message_size, codeword_size = link_codec(args, config)
+    raw = args.raw
+    prbs = build_prbs(args)
+    key = {
+        "sigma": round(float(sigma), 9),
+        "pam_levels": pam.n,
+        "h": list(h),
+        "ffe": None if raw else [round(float(w), 4) for w in ffe.tap_weights],
+        "dfe": None if raw else [round(float(w), 4) for w in dfe.tap_weights],
+        "code": "RAW" if raw else f"{config['MODE']} {code_label(args)}",
+        "data": prbs.describe() if prbs is not None else "random",
+        "symbols": args.burst_model_symbols
+    }
+    measure_seed = derive_seed(seed, "burst_model", "measure")
+    model, cached = burstmodel.load_or_measure(
+        key,
+        lambda: burstmodel.measure(measure_seed, pam, h, sigma, None if raw else ffe, None if raw else dfe,
+                                   rs, config["N"], config["K"], message_size, codeword_size,
+                                   args.burst_model_symbols, args.chunk_size, prbs),
+        args.burst_model_cache
+    )
+    print(f"Burst model ({'cached' if cached else 'measured'}): {model.describe()}")
+    if model.statistics["errors"] == 0:
+        print("Warning: no pre-FEC errors measured - the burst model gives no errors, "
+              "raise --burst_model_symbols or lower the SNR")
+    return model
+
+def run_burst_model(args, config, seed, model, counter, profile, stopper):
+    """
+    Continuous mode on the burst model: decode model error patterns only (burstmodel.simulate)
+
+    Returns:
+        (blocks_processed, stop_reason)
+    """
+    rs, _, message_size, _ = link_codec(args, config)
+    rows = max(1, args.chunk_size // message_size)
+    blocks = burstmodel.simulate(model, seed, rows, message_size, rs, config["N"], config["K"],
+                                 config["MAX_ITERATIONS_RS_2D"])
+    return consume_blocks(blocks, args, counter, profile, stopper)
+
+def validate_burst_model(args, config, seed, model, pam, h, sigma, ffe, dfe, counter, stopper):
+    """Run the full streaming link (same taps, no LMS adaptation) with the same limits and compare"""
+    rs, decode_args, message_size, codeword_size = link_codec(args, config)
+    full = ErrorCounter(counter.symbols_per_codeword)
+    blocks = link(seed, args.chunk_size, None, message_size, codeword_size, pam, h, sigma,
+                  rs=rs, n=config["N"], k=config["K"], decode_args=decode_args,
+                  ffe=None if args.raw else ffe, dfe=None if args.raw else dfe, clean=args.clean,
+                  prbs=build_prbs(args))
+    consume_blocks(blocks, args, full, None, stopper)
+    burstmodel.print_comparison(model, f"{pam.n}-PAM, sigma={sigma:.4f}", counter.stats(), full.stats(), seed)
+
+
+def run_streaming_link(args, config, seed, pam, h, sigma, ffe, dfe, lms, counter, profile, stopper,
+                       iteration_profile=None):
+    """
+    Continuous mode on the streaming pipeline (stream.py) - one long transmission
+    with carried channel / equalizer state instead of per-chunk Transmitter/Receiver calls
+
+    2D iteration statistics are collected in the single-process link only
+    (not with --pipeline_workers).
+
+    Returns:
+        (blocks_processed, stop_reason)
+    """
+    raw = args.raw
+    N, K = config["N"], config["K"]
+    rs, decode_args, message_size, codeword_size = link_codec(args, config)
+
+    link_args = (seed, args.chunk_size, None, message_size, codeword_size, pam, h, sigma)
+    interleaver = build_interleaver(args.interleaver, codeword_size, args.interleave_depth,
+                                    args.interleave_branches, args.interleave_delays)
+    if interleaver is not None:
+        print_cost(interleaver)
+
+    aui1, aui2 = build_aui_links(args, seed)
+    link_kwargs = dict(
+        rs=rs, n=N, k=K, decode_args=decode_args,
+        ffe=None if raw else ffe, dfe=None if raw else dfe,
+        lms=None if raw or args.clean else lms, clean=args.clean,
+        interleaver=interleaver, prbs=build_prbs(args),
+        precode=args.precode in ("pmd", "all"), aui1=aui1, aui2=aui2
+    )
+    if args.pipeline_workers > 0:
+        blocks = pipelined_link(*link_args, decode_workers=args.pipeline_workers, **link_kwargs)
+    else:
+        blocks = link(*link_args, decode_stats=iteration_profile is not None, **link_kwargs)
+
+    result = consume_blocks(blocks, args, counter, profile, stopper, iteration_profile, N, K)
+    for aui_link in (aui1, aui2):
+        if aui_link is not None:
+            # with --pipeline_workers AUI 1 comes back from the TX worker, which runs ahead of the decoder
+            ahead = " (TX worker, includes blocks sent past the stopping point)" if aui_link is aui1 and args.pipeline_workers else ""
+            debug_print(aui_link.describe() + ahead)
+    return result
 
+def run_multi_snr(args):
+    """
+    Continuous mode at every --multi_snr point in one pass (multisnr.py): the
+    data, RS encoding, modulation and channel ISI are shared, noise, equalizers
+    and decoding run batched over the points. Each point trains its own
+    equalizers like a single run and stops on its own criteria.
+    """
+    pam_levels = args.pam_levels
+    raw_mode = args.raw
+    seed = args.seed if args.seed is not None else random_seed()
+    snrs = args.multi_snr
+
+    # Use consistent symbol separation for peak power normalization
+    symbol_separation = 48.0
+    sigmas = [calculate_sigma_from_snr(snr_db, pam_levels, symbol_separation) for snr_db in snrs]
+
+    mode_str = "RAW" if raw_mode else code_label(args)
+    print(f"Testing {mode_str} with {pam_levels}-PAM at {len(snrs)} SNR points in one pass "
+          f"(peak power normalized) (Continuous Mode)")
+    print(f"Noise: {'independent draws per point' if args.independent_noise else 'one draw per block, scaled per point'}")
+    print(f"Symbol separation: {symbol_separation} (peak power normalization)")
+    print(f"Seed: {seed}")
+    print(f"Chunk size: {args.chunk_size}, Max bit errors: {args.max_bit_errors}, "
+          f"Max data symbols: {args.max_data_symbols}")
+    print()
+
+    h = CHANNEL_RESPONSE
+    pam = PAM(n=pam_levels, symbol_separation=symbol_separation)
+    config = continuous_config(args, seed)
+    ffes, dfes = [], []
+    for sigma in sigmas:
+        transmitter, channel, receiver = build_continuous_link(config, pam, h, sigma, args.mu, raw_mode, False,
+                                                               symbol_separation)
+        train_link(transmitter, channel, receiver, seed, args.training_size)
+        ffes.append(receiver.ffe)
+        dfes.append(receiver.dfe)
+
+    rs, decode_args, message_size, codeword_size = link_codec(args, config)
+    sweep = MultiSNRLink(seed, args.chunk_size, None, message_size, codeword_size, pam, h, sigmas,
+                         rs=rs, n=config["N"], k=config["K"], decode_args=decode_args,
+                         ffes=None if raw_mode else ffes, dfes=None if raw_mode else dfes,
+                         independent=args.independent_noise, prbs=build_prbs(args))
+
+    counters = [ErrorCounter(data_block_size(config, raw_mode)) for _ in snrs]
+    stoppers = [build_stopper(args) for _ in snrs]
+    stop_reasons = [None] * len(snrs)
+    chunks = [0] * len(snrs)
+    blocks = sweep.blocks()
+    try:
+        for block in blocks:
+            finished = []
+            for row, point in enumerate(block['points']):
+                counter = counters[point]
+                counter.update(block['tx_messages'].ravel(), block['rx_messages'][row].ravel())
+                chunks[point] += 1
+                should_stop, stop_reasons[point] = evaluate_stopping_criteria(
+                    counter.bit_errors, args.max_bit_errors,
+                    counter.total_symbols, args.max_data_symbols,
+                    counter.total_bits, stoppers[point]
+                )
+                if should_stop:
+                    finished.append(point)
+            sweep.retire(finished)
+    finally:
+        blocks.close()
+
+    print(f"{'SNR (dB)':>9} {'sigma':>9} {'BER':>11} {'SER':>11} {'bit errors':>11} {'bits':>12}  stop")
+    for snr_db, sigma, counter, stop_reason, chunks_processed in zip(snrs, sigmas, counters, stop_reasons, chunks):
+        stats = counter.stats()
+        print(f"{snr_db:>9.2f} {sigma:>9.4f} {stats['ber']:>11.3e} {stats['ser']:>11.3e} "
+              f"{counter.bit_errors:>11} {counter.total_bits:>12}  {stop_reason}")
+        log.info("result", mode="multi_snr", snr_db=snr_db, sigma=sigma, ber=stats['ber'], ser=stats['ser'],
+                 bit_errors=counter.bit_errors, bits=counter.total_bits, symbol_errors=counter.symbol_errors,
+                 symbols=counter.total_symbols, stop_reason=stop_reason, chunks=chunks_processed)
+    if sweep.dfe is not None:
+        debug_print(f"DFE samples run sequentially (after wrong decisions): {sweep.dfe.sequential_samples}")
 
 def validate_continuous_mode_parameters(args):
     """
@@ -747,6 +1140,64 @@ def validate_continuous_mode_parameters(args):
     Raises:
         ValueError: If continuous mode parameters are invalid
     """
+    if args.streaming and not args.continuous_mode:
+        raise ValueError("--streaming requires --continuous_mode")
+
+    if args.pipeline_workers < 0:
+        raise ValueError("--pipeline_workers must be >= 0")
+
+    if args.pipeline_workers and not args.streaming:
+        raise ValueError("--pipeline_workers requires --streaming")
+
+    if args.interleaver != "none" and not args.streaming:
+        raise ValueError("--interleaver requires --streaming (the chunked paths pad every chunk on its own)")
+
+    if (args.burst_model or args.burst_model_validate) and not args.continuous_mode:
+        raise ValueError("--burst_model / --burst_model_validate require --continuous_mode")
+
+    if (args.precode != "none" or args.aui_links != "none") and not args.streaming:
+        raise ValueError("--precode / --aui_links require --streaming")
+
+    if not 0 <= args.epf_rser <= 1 or not 0 <= args.epf < 1:
+        raise ValueError("--epf_rser must be in [0, 1] and --epf in [0, 1)")
+
+    if args.burst_model and (args.streaming or args.interleaver != "none"):
+        raise ValueError("--burst_model replaces the link - it cannot be combined with --streaming / --interleaver")
+
+    if args.burst_model_validate and not args.burst_model:
+        raise ValueError("--burst_model_validate requires --burst_model")
+
+    if args.prbs_seed is not None and args.prbs is None:
+        raise ValueError("--prbs_seed requires --prbs")
+    if args.prbs is not None:
+        PRBS(args.prbs, args.prbs_seed)  # seed range check
+
+    if args.multi_snr is not None:
+        if not args.continuous_mode:
+            raise ValueError("--multi_snr requires --continuous_mode")
+        if args.sigma is not None:
+            raise ValueError("--multi_snr replaces --snr_db / --sigma")
+        if args.streaming or args.burst_model or args.interleaver != "none" or args.clean:
+            raise ValueError("--multi_snr runs its own link - it cannot be combined with "
+                             "--streaming / --burst_model / --interleaver / --clean")
+        if args.error_profile or args.error_profile_json or args.iteration_profile or args.iteration_profile_json:
+            raise ValueError("--error_profile / --iteration_profile are not collected with --multi_snr")
+
+    if (args.iteration_profile or args.iteration_profile_json) and (args.burst_model or args.pipeline_workers):
+        raise ValueError("--iteration_profile is not collected with --burst_model / --pipeline_workers")
+
+    if args.independent_noise and args.multi_snr is None:
+        raise ValueError("--independent_noise requires --multi_snr")
+
+    if args.burst_model_symbols <= 0:
+        raise ValueError("--burst_model_symbols must be > 0")
+
+    if (args.n2 or args.k2) and args.mode != "2D":
+        raise ValueError("--n2 / --k2 (rectangular product code) require --mode 2D")
+
+    if not 0 < (args.k2 or args.k) < (args.n2 or args.n):
+        raise ValueError(f"column code RS({args.n2 or args.n},{args.k2 or args.k}) needs 0 < k2 < n2")
+    
     if not args.continuous_mode:
         return  # No validation needed if continuous mode is disabled
     
@@ -767,15 +1218,36 @@ def validate_continuous_mode_parameters(args):
     # Validate max_data_symbols > 0
     if args.max_data_symbols <= 0:
         errors.append(f"max_data_symbols must be greater than 0, got {args.max_data_symbols}")
+
+    # Validate early stopping parameters
+    if args.target_rel_width is not None and args.target_rel_width <= 0:
+        errors.append(f"target_rel_width must be greater than 0, got {args.target_rel_width}")
+    if not 0 < args.confidence < 1:
+        errors.append(f"confidence must be between 0 and 1, got {args.confidence}")
     
     if errors:
         error_message = "Invalid continuous mode configuration:\n" + "\n".join(f"  - {error}" for error in errors)
         raise ValueError(error_message)
 
 
-def main():
-    """Parse arguments and dispatch to appropriate mode"""
-    # Parse command line arguments with argparse
+# Link stages timed by --profile (instrument.py), chunked and streaming paths
+PROFILE_STAGES = [
+    (Transmitter, ["transmit", "encode"]),
+    (Channel, ["convolve", "add_noise"]),
+    (Receiver, ["receive", "decode"]),
+    (FFE, ["equalize"]),
+    (DFE, ["equalize", "equalize_block"]),
+    (BatchDFE, ["decide"]),
+    (LMS, ["equalize"]),
+    (GrayCode, ["gray_encode", "gray_decode", "gray_encode_array", "gray_decode_array"]),
+    (Binary, ["bit_encode", "bit_decode", "bit_encode_array", "bit_decode_array"]),
+    (PAM, ["modulate", "demodulate", "modulate_array", "demodulate_array"]),
+    (ReedSolomon1D, ["encode", "encode_blocks", "decode_codeword", "decode_blocks"]),
+    (ReedSolomon2D, ["encode", "encode_blocks", "decode_codeword", "decode_blocks"])
+]
+
+def build_parser():
+    """Command line parser of model.py (also used to build args for benchmarks)"""
     parser = argparse.ArgumentParser(
         description='Enhanced PAM/Reed-Solomon Communication System',
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
@@ -786,6 +1258,10 @@ def main():
                        help='Reed-Solomon N parameter (codeword length)')
     parser.add_argument('--k', type=int, default=8,
                        help='Reed-Solomon K parameter (message length)')
+    parser.add_argument('--n2', type=int, default=None,
+                       help='2D column code length / block rows (default: --n, square block)')
+    parser.add_argument('--k2', type=int, default=None,
+                       help='2D column code data symbols / data rows (default: --k)')
     parser.add_argument('--max_iterations', type=int, default=250,
                        help='Maximum iterations for 2D RS decoding')
     parser.add_argument('--mode', type=str, default='2D', choices=['1D', '2D'],
@@ -810,12 +1286,37 @@ def main():
     parser.add_argument('--training_size', type=int, default=100,
                        help='Number of symbols for LMS training')
     
+    parser.add_argument('--seed', type=int, default=None,
+                       help='Root seed for all random streams (default: random, printed for reruns)')
+    
     # System mode parameters
     parser.add_argument('--raw', action='store_true',
                        help='Disable Reed-Solomon error correction (raw transmission)')
     parser.add_argument('--clean', action='store_true',
                        help='Disable channel effects (no ISI or noise) for testing')
     
+    # Error profile (per-codeword pre-FEC errors and decoder outcomes)
+    parser.add_argument('--error_profile', action='store_true',
+                       help='Collect and print per-codeword error histograms and decoder outcomes')
+    parser.add_argument('--error_profile_json', type=str, default=None,
+                       help='Also save the error profile to this JSON file (implies --error_profile)')
+    parser.add_argument('--iteration_profile', action='store_true',
+                       help='Print 2D decoder iteration histograms and the BER penalty of each iteration cap (iterprofile.py)')
+    parser.add_argument('--iteration_profile_json', type=str, default=None,
+                       help='Also save the iteration profile to this JSON file (implies --iteration_profile)')
+    parser.add_argument('--profile', action='store_true',
+                       help='Time every link stage and print a per-stage throughput breakdown')
+    parser.add_argument('--profile_json', type=str, default=None,
+                       help='Also save the stage profile to this JSON file (implies --profile)')
+    parser.add_argument('--profile_allocations', action='store_true',
+                       help='Also record bytes allocated per stage (tracemalloc, slows the run down)')
+    parser.add_argument('--log_level', type=str, default='warning', choices=list(eventlog.LEVELS),
+                       help='Console level of the structured event log (stderr)')
+    parser.add_argument('--log_jsonl', type=str, default=None,
+                       help='Also write events to this rotating JSONL file (eventlog.py)')
+    parser.add_argument('--log_jsonl_level', type=str, default='debug', choices=list(eventlog.LEVELS),
+                       help='Lowest level written to the --log_jsonl file')
+    
     # Continuous mode parameters
     parser.add_argument('--continuous_mode', action='store_true',
                        help='Enable continuous mode operation')
@@ -825,8 +1326,60 @@ def main():
                        help='Maximum symbols to process in continuous mode')
     parser.add_argument('--chunk_size', type=int, default=1000,
                        help='Symbols per processing chunk in continuous mode')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Continuous mode on the streaming pipeline (carried channel/equalizer state, bounded memory)')
+    parser.add_argument('--pipeline_workers', type=int, default=0,
+                       help='Run the streaming stages in worker processes with this many RS decode workers (0 = single process)')
+    parser.add_argument('--interleaver', type=str, default='none', choices=['none', 'block', 'convolutional'],
+                       help='Symbol interleaver between RS encode and Gray mapping, with --streaming (interleave.py)')
+    parser.add_argument('--interleave_depth', type=int, default=None,
+                       help='Block interleaver rows (codewords, default 4) / convolutional delay step D (default 2)')
+    parser.add_argument('--interleave_branches', type=int, default=None,
+                       help='Convolutional interleaver branches P (default 4, branch i delay (P-1-i)*D)')
+    parser.add_argument('--interleave_delays', type=lambda text: [int(d) for d in text.split(',')], default=None,
+                       help='Explicit convolutional branch delays, comma separated (overrides branches / depth)')
+    parser.add_argument('--precode', type=str, default='none', choices=['none', 'aui', 'pmd', 'all'],
+                       help='1/(1+D) precoding on the AUI links (FPGA precode_en), the PMD link (channel + DFE) or all, with --streaming (precode.py)')
+    parser.add_argument('--aui_links', type=str, default='none', choices=['none', 'aui1', 'aui2', 'both'],
+                       help='EPF error-propagation AUI links before RS encoding (aui1) / after RS decoding (aui2), with --streaming (precode.py)')
+    parser.add_argument('--epf_rser', type=float, default=DEFAULT_RSER,
+                       help='EPF channel burst start probability after a correct symbol (FPGA RSER threshold / 2^64)')
+    parser.add_argument('--epf', type=float, default=DEFAULT_EPF,
+                       help='EPF channel burst continuation probability (FPGA EPF threshold / 2^64)')
+    parser.add_argument('--prbs', type=int, default=None, choices=sorted(POLYNOMIALS),
+                       help='Data symbols from this PRBS (8 bits per symbol, as the FPGA source) instead of random symbols (prbs.py)')
+    parser.add_argument('--prbs_seed', type=int, default=None,
+                       help='PRBS register seed (default: the FPGA seed for PRBS31 / PRBS63, 1 otherwise)')
+    parser.add_argument('--multi_snr', type=float, nargs='+', default=None, metavar='SNR_DB',
+                       help='Run all these SNR points in one pass over a shared transmitted stream (multisnr.py)')
+    parser.add_argument('--independent_noise', action='store_true',
+                       help='With --multi_snr, draw the noise of every point separately instead of scaling one draw')
+    parser.add_argument('--burst_model', action='store_true',
+                       help='Measure the DFE error process once, fit a burst model and decode model error patterns only (burstmodel.py)')
+    parser.add_argument('--burst_model_symbols', type=int, default=1000000,
+                       help='RS symbols of full link simulation measured for the burst model')
+    parser.add_argument('--burst_model_cache', type=str, default=burstmodel.DEFAULT_CACHE_DIR,
+                       help="Burst model cache directory ('' = no cache)")
+    parser.add_argument('--burst_model_validate', action='store_true',
+                       help='Also run the full streaming link with the same limits and compare BER/SER with the burst model')
+
+    # Confidence-interval early stopping (continuous mode)
+    parser.add_argument('--target_rel_width', type=float, default=None,
+                       help='Stop when the BER confidence interval relative width reaches this (replaces max_bit_errors)')
+    parser.add_argument('--confidence', type=float, default=0.95,
+                       help='Confidence level of the BER interval')
+    parser.add_argument('--ci_method', type=str, default='wilson', choices=['wilson', 'clopper_pearson'],
+                       help='Binomial confidence interval method')
+    parser.add_argument('--cliff_ber_high', type=float, default=None,
+                       help='Stop early when the BER interval is entirely above this value')
+    parser.add_argument('--cliff_ber_low', type=float, default=None,
+                       help='Stop early when the BER interval is entirely below this value')
     
-    args = parser.parse_args()
+    return parser
+
+def main():
+    """Parse arguments and dispatch to appropriate mode"""
+    args = build_parser().parse_args()
     
     # Validate continuous mode parameters
     try:
@@ -835,11 +1388,27 @@ def main():
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
     
+    eventlog.configure(args.log_level, args.log_jsonl, args.log_jsonl_level)
+    log.info("run", **{key: value for key, value in vars(args).items() if not key.startswith('log_')})
+
+    profiler = None
+    if args.profile or args.profile_json or args.profile_allocations:
+        profiler = Profiler(track_allocations=args.profile_allocations)
+        profiler.install(PROFILE_STAGES)
+    
     # Dispatch to appropriate mode
-    if args.continuous_mode:
+    if args.continuous_mode and args.multi_snr is not None:
+        run_multi_snr(args)
+    elif args.continuous_mode:
         run_continuous_mode(args)
     else:
         run_single_mode(args)
+    
+    if profiler is not None:
+        profiler.uninstall()
+        profiler.print_report()
+        if args.profile_json:
+            profiler.save(args.profile_json)
 
 
 if __name__ == "__main__":
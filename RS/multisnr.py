@@ -0,0 +1,297 @@
+"""
+Multi-SNR single pass: one transmitted stream, noise at many SNR points at once
+
+A continuous-mode SNR sweep repeats the source, RS encoding, Gray / PAM
+mapping and channel ISI at every point, although none of it depends on the
+noise. Here those stages run once per block, and everything after the noise
+runs on a (points, samples) array:
+
+    source -> frame -> RS encode -> Gray/PAM -> channel ISI           (once)
+           -> + noise -> FFE -> DFE -> Gray decode -> RS decode       (every point, batched)
+
+- Noise: by default every row is the same standard-normal draw of the
+  ("block", i, "noise") stream scaled by the sigma of its point, so row s is
+  exactly the stream.link received signal at sigma_s with the same seed
+  (common random numbers - the points differ by the SNR only). With
+  independent=True each point draws its own ("block", i, "noise", "snr", s)
+- FFE: one streaming FIR per point (every point has its own trained taps)
+- DFE: BatchDFE. With the transmitted symbols known, the feedback of a DFE
+  that decided correctly so far is known in advance, so the decisions of all
+  rows are one vectorized slicer pass. Only where a row decides wrong does its
+  feedback differ from that; the row is then run sample by sample (the
+  DFE.equalize_block loop, error propagation included) until it has decided
+  as many symbols in a row correctly as the DFE has taps, and the vectorized
+  decisions are valid again. The result is bit-exact with equalize_block at a
+  cost that scales with the errors, not the samples
+- RS decode: the received codewords of all points go through one batched
+  decode_blocks call
+- A point that has met its stopping criterion is retired and the batch
+  shrinks (high-SNR points usually need the most data, so they run last)
+
+The equalizer taps stay at their trained values: stream.link keeps adapting
+them with the LMS on every block, a sequential update per point that is not
+modelled here (like the burst model's full-link reference, burstmodel.py).
+"""
+
+import bisect
+from itertools import chain, tee
+
+import numpy as np
+
+from encode import Binary, GrayCode
+from rng import make_rng
+from stream import SYMBOL_BITS, FIRFilter, RowQueue, frame, gray_symbols, messages, rs_encode, source_blocks
+
+class BatchRechunker:
+    def __init__(self, rows, size, dtype=np.int64):
+        """
+        Rechunker over several streams of equal length at once
+
+        rows: number of streams (points)
+        size: row length
+        dtype: element type of the rows
+        """
+        self.size = size
+        self.buffer = np.zeros((rows, 0), dtype=dtype)
+
+    def push(self, data):
+        """Add (streams, length) data and return the complete rows as (streams, rows, size)"""
+        if self.buffer.shape[1]:
+            data = np.concatenate([self.buffer, data], axis=1)
+        n_rows = data.shape[1] // self.size
+        self.buffer = data[:, n_rows * self.size:].copy()
+        return data[:, :n_rows * self.size].reshape(len(data), n_rows, self.size)
+
+    def select(self, keep):
+        """Keep only the streams in `keep` (index array)"""
+        self.buffer = self.buffer[keep]
+
+class BatchDFE:
+    def __init__(self, dfes, pam):
+        """
+        DFE decisions of several trained DFEs (one per point) on known transmitted symbols
+
+        dfes: trained DFEs with the same number of taps - taps and previous
+              decisions are copied, the DFEs themselves are not changed
+        pam: PAM instance of the link
+        """
+        self.levels = [pam.get_level(i) for i in range(pam.n)]
+        self.level_array = np.asarray(self.levels, dtype=float)
+        self.thresholds = [(a + b) / 2 for a, b in zip(self.levels[:-1], self.levels[1:])]
+        self.threshold_array = np.asarray(self.thresholds, dtype=float)
+
+        taps = np.array([[float(w) for w in dfe.tap_weights] for dfe in dfes], dtype=float)
+        self.cursor = taps[:, 0]
+        self.post_taps = taps[:, 1:]
+        self.n_feedback = self.post_taps.shape[1]
+        # last decisions per row and last transmitted symbols, most recent first
+        self.previous = np.array([list(dfe.prev_symbols) for dfe in dfes], dtype=np.int64).reshape(len(dfes), -1)
+        self.tx_previous = np.zeros(self.n_feedback, dtype=np.int64)
+        self.sequential_samples = 0  # samples that needed the per-sample loop
+
+    def select(self, keep):
+        """Keep only the rows in `keep` (index array)"""
+        self.cursor = self.cursor[keep]
+        self.post_taps = self.post_taps[keep]
+        self.previous = self.previous[keep]
+
+    def decide(self, samples, tx):
+        """
+        Decisions for one block
+
+        Args:
+            samples: (rows, count) equalized (FFE output) samples
+            tx: (count,) transmitted symbols at the same positions
+        Returns:
+            (rows, count) int64 symbol decisions, as DFE.equalize_block per row
+        """
+        rows, count = samples.shape
+        taps = self.n_feedback
+        history = np.concatenate([self.tx_previous[::-1], tx])  # oldest first
+
+        # decisions with the feedback of correct past decisions (same operation order as equalize_block)
+        signal = samples * self.cursor[:, None]
+        for j in range(taps):
+            signal -= self.post_taps[:, j:j + 1] * self.level_array[history[taps - 1 - j:taps - 1 - j + count]]
+        decisions = np.searchsorted(self.threshold_array, signal, side='left')
+
+        wrong = decisions != tx
+        tx_list = None
+        for row in range(rows):
+            synced = np.array_equal(self.previous[row], self.tx_previous)
+            errors = np.flatnonzero(wrong[row])
+            if synced and not len(errors):
+                continue
+            if tx_list is None:
+                tx_list = history.tolist()
+            values = samples[row].tolist()
+            cursor = float(self.cursor[row])
+            post_taps = self.post_taps[row].tolist()
+
+            position = 0 if not synced else int(errors[0])
+            while position < count:
+                recent = np.concatenate([self.previous[row][::-1], decisions[row, max(0, position - taps):position]])
+                state = recent[len(recent) - taps:][::-1].tolist()
+                position = self._sequential(values, tx_list, cursor, post_taps, state, position, decisions[row])
+                following = bisect.bisect_left(errors, position)
+                if following == len(errors):
+                    break
+                position = int(errors[following])
+
+        if taps:
+            self.previous = np.concatenate([self.previous[:, ::-1], decisions], axis=1)[:, -taps:][:, ::-1]
+            self.tx_previous = history[-taps:][::-1].copy()
+        return decisions
+
+    def _sequential(self, values, tx_list, cursor, post_taps, state, start, out):
+        """
+        DFE.equalize_block loop from `start` until the last n_feedback decisions
+        are correct again (or the block ends)
+
+        Returns:
+            position after the last decision made
+        """
+        levels = self.levels
+        thresholds = self.thresholds
+        taps = self.n_feedback
+        prev_levels = [levels[symbol] for symbol in state]
+        matched = 0
+        position = start
+        while position < len(values):
+            equalized_signal = values[position] * cursor
+            for tap, level in zip(post_taps, prev_levels):
+                equalized_signal -= tap * level
+
+            symbol_out = bisect.bisect_left(thresholds, equalized_signal)
+            out[position] = symbol_out
+            prev_levels = [levels[symbol_out]] + prev_levels[:-1]
+            matched = matched + 1 if symbol_out == tx_list[taps + position] else 0
+            position += 1
+            if matched >= taps:
+                break
+        self.sequential_samples += position - start
+        return position
+
+class MultiSNRLink:
+    def __init__(self, seed, block_size, max_symbols, message_size, codeword_size, pam, h, sigmas,
+                 rs=None, n=None, k=None, decode_args=(), ffes=None, dfes=None, independent=False, prbs=None):
+        """
+        Streaming link (stream.link) evaluated at several noise levels in one pass
+
+        Args:
+            seed, block_size, max_symbols, message_size, codeword_size, pam, h,
+            rs, n, k, decode_args, prbs: as stream.link
+            sigmas: noise standard deviation of every point
+            ffes, dfes: trained equalizers per point (None for raw - hard slicing only)
+            independent: own noise draw per point instead of scaled copies of one draw
+        """
+        self.seed = seed
+        self.block_size = block_size
+        self.max_symbols = max_symbols
+        self.message_size = message_size
+        self.codeword_size = codeword_size
+        self.pam = pam
+        self.h = h
+        self.rs, self.n, self.k, self.decode_args = rs, n, k, decode_args
+        self.independent = independent
+        self.prbs = prbs
+
+        count = len(sigmas)
+        self.points = np.arange(count)  # original indices of the points still running
+        self.sigmas = np.asarray(sigmas, dtype=float)
+        self.ffes = None if dfes is None else [FIRFilter(ffe.tap_weights) for ffe in ffes]
+        self.dfe = None if dfes is None else BatchDFE(dfes, pam)
+
+        _, symbols_per_block, _, _ = GrayCode.get_gray_tables(pam.n)
+        self.symbols = BatchRechunker(count, symbols_per_block)
+        self.bits = BatchRechunker(count, SYMBOL_BITS, dtype=np.uint8)
+        self.codewords = BatchRechunker(count, codeword_size)
+
+    def retire(self, points):
+        """Stop simulating the given points (original indices)"""
+        keep = np.flatnonzero(~np.isin(self.points, points))
+        self.points = self.points[keep]
+        self.sigmas = self.sigmas[keep]
+        if self.dfe is not None:
+            self.ffes = [self.ffes[i] for i in keep]
+            self.dfe.select(keep)
+        for rechunker in (self.symbols, self.bits, self.codewords):
+            rechunker.select(keep)
+
+    def noise(self, index, size):
+        """(points, size) noise of channel block `index`"""
+        if not self.independent:
+            return self.sigmas[:, None] * make_rng(self.seed, "block", index, "noise").standard_normal(size)
+        return np.array([sigma * make_rng(self.seed, "block", index, "noise", "snr", int(point)).standard_normal(size)
+                         for point, sigma in zip(self.points, self.sigmas)]).reshape(len(self.points), size)
+
+    def equalize(self, received, tx, flush=False):
+        """FFE / DFE decisions of (points, samples) received samples (hard slicing in raw mode)"""
+        if self.dfe is None:
+            return self.pam.demodulate_array(received)
+        filtered = np.array([fir.process(row) for fir, row in zip(self.ffes, received)]).reshape(len(received), -1)
+        if flush:
+            tail = np.array([fir.flush() for fir in self.ffes]).reshape(len(received), -1)
+            filtered = np.concatenate([filtered, tail], axis=1)
+        return self.dfe.decide(filtered, tx[:filtered.shape[1]])
+
+    def demodulate(self, decisions):
+        """Gray symbols -> bits -> RS symbols -> (points, rows, codeword_size) received codewords"""
+        points = len(decisions)
+        groups = self.symbols.push(decisions)
+        gray_bits = GrayCode.gray_decode_array(groups.ravel(), self.pam.n).reshape(points, -1)
+        rs_symbols = Binary.bit_decode_array(self.bits.push(gray_bits).ravel(), SYMBOL_BITS).reshape(points, -1)
+        return self.codewords.push(rs_symbols)
+
+    def decode(self, received):
+        """Batched decode of (points, rows, codeword_size) codewords -> (corrected, failed)"""
+        points, rows, size = received.shape
+        if self.rs is None:
+            return received, np.zeros((points, rows), dtype=bool)
+        corrected, failed = self.rs.decode_blocks(received.reshape(-1, size), *self.decode_args)[:2]
+        return corrected.reshape(points, rows, size), failed.reshape(points, rows)
+
+    def blocks(self):
+        """
+        Yields:
+            dict per decoded block with 'points' (original indices of the rows),
+            'tx_messages' and 'tx_codewords' (rows, ...) shared by all points, and
+            'rx_messages', 'rx_codewords', 'corrected_codewords', 'failed' with a
+            leading points axis. Ends when every point is retired (or the source ends)
+        """
+        frames_tx, frames_ref = tee(frame(source_blocks(self.seed, self.block_size, self.max_symbols,
+                                                        prbs=self.prbs), self.message_size))
+        codewords_tx, codewords_ref = tee(rs_encode(frames_tx, self.rs, self.n, self.k))
+        tx_messages = RowQueue(frames_ref)
+        tx_codewords = RowQueue(codewords_ref)
+
+        fir = FIRFilter(self.h)
+        pending = np.zeros(0, dtype=np.int64)  # transmitted symbols not yet decided
+        for index, symbols in enumerate(chain(gray_symbols(codewords_tx, self.pam), [None])):
+            if not len(self.points):
+                return
+            flush = symbols is None
+            if flush:
+                isi = fir.flush()
+            else:
+                pending = np.concatenate([pending, symbols])
+                isi = fir.process(self.pam.modulate_array(symbols))
+
+            decisions = self.equalize(isi + self.noise(index, len(isi)), pending, flush)
+            pending = pending[decisions.shape[1]:]
+            received = self.demodulate(decisions)
+            count = received.shape[1]
+            if not count:
+                continue
+
+            corrected, failed = self.decode(received)
+            yield {
+                'points': self.points.copy(),
+                'tx_messages': tx_messages.pop(count),
+                'rx_messages': messages(corrected.reshape(-1, self.codeword_size), self.rs, self.n, self.k)
+                               .reshape(len(self.points), count, -1),
+                'tx_codewords': tx_codewords.pop(count),
+                'rx_codewords': received,
+                'corrected_codewords': corrected,
+                'failed': failed
+            }
@@ -1,3 +1,5 @@
+import numpy as np
+
 from slicer import Slicer
 
 class PAM:
@@ -29,6 +31,16 @@ class PAM:
         """Convert PAM levels back to symbols"""
         return Slicer.hard_slicer(levels, self.symbol_separation, self.n)
     
+    def modulate_array(self, symbols):
+        """Vectorized modulate (symbols outside the constellation map to 0 like modulate)"""
+        symbols = np.asarray(symbols, dtype=np.int64)
+        valid = (symbols >= 0) & (symbols < self.n)
+        return np.where(valid, np.asarray(self.levels)[np.clip(symbols, 0, self.n - 1)], 0.0)
+
+    def demodulate_array(self, levels):
+        """Vectorized demodulate"""
+        return Slicer.hard_slicer_array(levels, self.symbol_separation, self.n)
+
     def get_level(self, symbol):
         """Get PAM level for a single symbol"""
         return self.symbol_to_level_map.get(symbol, 0) 
@@ -0,0 +1,232 @@
+"""
+Pipelined multi-process execution of the streaming link
+
+The stages of stream.link run in separate worker processes connected by
+shared-memory block channels (bufferpool.py - arrays stay in shared memory,
+only block descriptors are queued), so one long low-BER point keeps several
+cores busy:
+
+    TX process       source -> frame -> [AUI 1] -> RS encode -> [interleave] -> Gray/[precode]/PAM -> channel
+                        |  samples channel              \\ reference channel (tx messages + codewords)
+    RX process       FFE/DFE (+LMS) -> [1+D decode] -> Gray decode -> [deinterleave] -> codeword batches
+                        |  one channel per decoder, batches dealt round-robin
+    decode workers   RS decode (embarrassingly parallel across codewords)
+                        |  one result channel per decoder, read back in the same round-robin order
+    main process     [AUI 2] -> error counting / stopping (model.py)
+
+Because batches are dealt and collected in the same fixed order, results come
+back in transmission order and a run gives exactly the same numbers as the
+single-process stream.link with the same seed.
+
+The reference channel is drained by its own thread in the main process, not
+in step with the decoded batches: a stage that holds data back (an
+interleaver, whose latency can span many blocks) would otherwise fill the
+reference channel and stall TX while RX still waits for its first codeword.
+TX can then only run ahead as far as the samples channel lets it. The main
+process also checks that the workers are alive and gives up after
+STALL_TIMEOUT seconds without a decoded batch, so a stalled stage cannot hang
+the run or leak the shared-memory segments.
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+
+import numpy as np
+
+from bufferpool import POLL_INTERVAL, BlockChannel
+from precode import PrecodeRX, PrecodeTX
+from stream import (RowQueue, aui, channel, demodulate, equalize, frame, interleave, modulate, rs_decode,
+                    rs_encode, source_blocks)
+
+STALL_TIMEOUT = 300.0  # seconds without a decoded batch before the pipeline is declared stalled
+LIVENESS_INTERVAL = 1.0  # seconds between worker liveness checks while waiting for a batch
+
+def run_stage(target, stop, *args):
+    """Run one stage in its worker process - any failure stops the whole pipeline"""
+    try:
+        target(*args, stop)
+    except BaseException:
+        stop.set()
+        raise
+
+def tx_stage(samples_out, reference_out, seed, block_size, max_symbols, message_size,
+             pam, h, sigma, rs, n, k, clean, interleaver, prbs, precode, aui1, reports, stop):
+    """TX process: data, RS encode, modulation and channel - AUI 1 goes back on reports at the end"""
+    def with_reference(frames):
+        # messages and their codewords go to the main process for error counting
+        for messages in frames:
+            codewords = next(rs_encode(aui([messages], aui1), rs, n, k))
+            reference_out.send_all(np.hstack([messages, codewords]), stop)
+            yield codewords
+
+    frames = frame(source_blocks(seed, block_size, max_symbols, prbs=prbs), message_size)
+    symbols = interleave(with_reference(frames), interleaver)
+    precoder = PrecodeTX(pam.n) if precode else None
+    for samples in channel(modulate(symbols, pam, precoder), h, sigma, seed, clean):
+        if stop.is_set() or not samples_out.send_all(samples, stop):
+            break
+
+    samples_out.end()
+    reference_out.end()
+    if aui1 is not None:
+        reports.put(aui1)
+
+def rx_stage(samples_in, decode_out, pam, codeword_size, ffe, dfe, lms, deinterleaver, precode, stop):
+    """RX process: equalization, slicing and Gray decoding, codeword batches dealt round-robin"""
+    # the equalizer reads each sample block in place; it is released once the next one is pulled
+    samples = (rows.ravel() for rows in samples_in.blocks(stop))
+    max_rows = decode_out[0].max_rows
+    batch = 0
+    decoder = PrecodeRX(pam.n) if precode else None
+    for rows in demodulate(equalize(samples, ffe, dfe, pam, lms), pam.n, codeword_size, deinterleaver, decoder):
+        for start in range(0, len(rows), max_rows):
+            if stop.is_set() or not decode_out[batch % len(decode_out)].send(rows[start:start + max_rows], stop):
+                return
+            batch += 1
+
+    for out in decode_out:
+        out.end()
+
+def decode_stage(codewords_in, results_out, rs, n, k, decode_args, stop):
+    """Decode worker: RS decode each batch, results packed as [received | messages | corrected | failed]"""
+    for rows in codewords_in.blocks(stop):
+        messages, corrected, failed = next(rs_decode([rows], rs, n, k, decode_args))
+        packed = np.hstack([rows, messages, corrected, failed[:, None]])
+        if not results_out.send(packed, stop):
+            return
+    results_out.end()
+
+def read_reference(reference, rows_queue, stop):
+    """Reference thread: copy each reference block onto a thread queue and release it at once"""
+    for rows in reference.blocks(stop):
+        rows_queue.put(rows.copy())
+    rows_queue.put(None)
+
+def queued_rows(rows_queue, stop):
+    """Blocks put on the queue by read_reference, until its end marker (or stop)"""
+    while True:
+        try:
+            rows = rows_queue.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            if stop.is_set():
+                return
+            continue
+        if rows is None:
+            return
+        yield rows
+
+def receive_result(result_channel, processes, stop, stall_timeout):
+    """
+    Next decoded batch, checking the workers while waiting
+
+    Raises RuntimeError if a worker died without reporting (killed, out of
+    memory) or no batch arrived for stall_timeout seconds
+    """
+    waited = 0.0
+    while True:
+        try:
+            return result_channel.receive(stop, timeout=LIVENESS_INTERVAL)
+        except TimeoutError:
+            waited += LIVENESS_INTERVAL
+        dead = [process.name for process in processes if process.exitcode not in (None, 0)]
+        if dead:
+            raise RuntimeError(f"pipeline worker(s) {', '.join(dead)} exited without finishing the stream")
+        if stall_timeout is not None and waited >= stall_timeout:
+            raise RuntimeError(f"pipeline stalled: no decoded batch for {waited:g} s")
+
+def pipelined_link(seed, block_size, max_symbols, message_size, codeword_size, pam, h, sigma,
+                   rs=None, n=None, k=None, decode_args=(), ffe=None, dfe=None, lms=None, clean=False,
+                   interleaver=None, prbs=None, precode=False, aui1=None, aui2=None, decode_workers=2, n_slots=8,
+                   stall_timeout=STALL_TIMEOUT):
+    """
+    Same interface and output as stream.link, with the stages in separate processes
+
+    Args:
+        decode_workers: number of RS decode processes
+        n_slots: pool blocks per channel (how many blocks each stage may run ahead)
+        stall_timeout: seconds without a decoded batch before giving up (None waits forever)
+        (all other arguments as stream.link)
+
+    aui1 runs in the TX worker; its state comes back when the pipeline stops,
+    so its counters are filled in as with stream.link (including any blocks
+    TX had sent ahead of the stopping point).
+
+    Yields:
+        dict per decoded batch, like stream.link - the arrays are views into
+        shared memory and only valid until the next batch is requested
+    """
+    ctx = mp.get_context()
+    stop = ctx.Event()
+    # blocks are sized so every stream.link block fits in one pool block (a frame can
+    # carry one extra row, demodulation one more partial codeword, an interleaver
+    # releases up to extra_rows more at once) - blocks are then never split and the stopping checks in model.py see the same blocks
+    batch_rows = max(1, block_size // message_size) + 2 + (interleaver.extra_rows if interleaver is not None else 0)
+    symbols_per_block = batch_rows * codeword_size * 16 + 16
+    samples = BlockChannel(n_slots, symbols_per_block, 1, np.float64, ctx)
+    reference = BlockChannel(n_slots, batch_rows, message_size + codeword_size, np.int64, ctx)
+    codewords = [BlockChannel(n_slots, batch_rows, codeword_size, np.int64, ctx) for _ in range(decode_workers)]
+    result_width = codeword_size + message_size + codeword_size + 1
+    results = [BlockChannel(n_slots, batch_rows, result_width, np.int64, ctx) for _ in range(decode_workers)]
+    channels = [samples, reference] + codewords + results
+    reports = ctx.Queue()  # final AUI 1 link of the TX worker (counters and EPF state)
+
+    stages = [
+        (tx_stage, samples, reference, seed, block_size, max_symbols, message_size,
+         pam, h, sigma, rs, n, k, clean, interleaver, prbs, precode, aui1, reports),
+        (rx_stage, samples, codewords, pam, codeword_size, ffe, dfe, lms,
+         interleaver.inverse() if interleaver is not None else None, precode)
+    ]
+    stages += [(decode_stage, codewords[i], results[i], rs, n, k, decode_args)
+               for i in range(decode_workers)]
+    processes = [ctx.Process(target=run_stage, args=(stage[0], stop) + stage[1:], daemon=True)
+                 for stage in stages]
+
+    for process in processes:
+        process.start()
+
+    # reference rows are regrouped across blocks, so they are copied out (on their own thread)
+    rows_queue = queue.Queue()
+    reader = threading.Thread(target=read_reference, args=(reference, rows_queue, stop), daemon=True)
+    reader.start()
+
+    try:
+        tx_rows = RowQueue(queued_rows(rows_queue, stop))
+        worker = 0
+        while True:
+            result_channel = results[worker]
+            received = receive_result(result_channel, processes, stop, stall_timeout)
+            if received is None:
+                break
+            block_id, packed = received
+            worker = (worker + 1) % decode_workers
+
+            count = len(packed)
+            tx = tx_rows.pop(count)
+            rx_codewords, rest = packed[:, :codeword_size], packed[:, codeword_size:]
+            yield {
+                'tx_messages': tx[:, :message_size],
+                'rx_messages': rest[:, :message_size] if aui2 is None else aui2.process(rest[:, :message_size]),
+                'tx_codewords': tx[:, message_size:],
+                'rx_codewords': rx_codewords,
+                'corrected_codewords': rest[:, message_size:message_size + codeword_size],
+                'failed': rest[:, -1].astype(bool)
+            }
+            result_channel.release(block_id)
+        if stop.is_set():
+            raise RuntimeError("a pipeline stage failed (see its traceback above)")
+    finally:
+        stop.set()
+        if aui1 is not None:
+            # AUI 1 ran on the TX worker's copy - take over its counters like stream.link updates it in place
+            try:
+                aui1.load_state(reports.get(timeout=5))
+            except queue.Empty:
+                pass
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        reader.join(timeout=5)
+        for block_channel in channels:
+            block_channel.close()
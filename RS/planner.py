@@ -0,0 +1,208 @@
+"""
+Adaptive SNR point placement for BER sweeps
+
+Fits a monotone surrogate of log10(BER) vs SNR to all results so far - a
+Gaussian process around a quadratic trend, with the posterior mean forced to
+be non-increasing - and picks the next SNR point(s) where the surrogate is
+most uncertain about where the curve crosses the target BER levels.
+"""
+
+import numpy as np
+
+LN10 = np.log(10)
+
+def monotone_decreasing(y, w=None):
+    """
+    Weighted isotonic regression (pool adjacent violators) for a non-increasing sequence
+
+    Args:
+        y: values in x order
+        w: weights (default all 1)
+
+    Returns:
+        closest non-increasing sequence in the weighted least squares sense
+    """
+    y = np.asarray(y, dtype=float)
+    w = np.ones_like(y) if w is None else np.asarray(w, dtype=float)
+
+    # blocks of [mean, weight, count]
+    blocks = []
+    for value, weight in zip(y, w):
+        blocks.append([value, weight, 1])
+        # merge while the previous block is lower than the current one
+        while len(blocks) > 1 and blocks[-2][0] < blocks[-1][0]:
+            v2, w2, c2 = blocks.pop()
+            v1, w1, c1 = blocks.pop()
+            blocks.append([(v1 * w1 + v2 * w2) / (w1 + w2), w1 + w2, c1 + c2])
+
+    return np.concatenate([np.full(count, value) for value, _, count in blocks])
+
+def log_ber_observation(bit_errors, total_bits):
+    """
+    log10(BER) observation and its variance from raw error counts
+
+    Zero-error points are treated as an upper bound (3 / total_bits, ~95%)
+    with a wide variance so they only pull the curve down loosely.
+
+    Returns:
+        (log10_ber, variance) or None if there is no data
+    """
+    if total_bits <= 0:
+        return None
+    if bit_errors == 0:
+        return np.log10(3.0 / total_bits), 0.5 ** 2
+
+    ber = bit_errors / total_bits
+    # delta method: var(log10 p) ~ (1 - p) / (errors * ln(10)^2)
+    variance = (1 - ber) / (bit_errors * LN10 ** 2)
+    return np.log10(ber), max(variance, 1e-4)
+
+class AdaptivePlanner:
+    def __init__(self, snr_min, snr_max, target_bers=(1e-2, 1e-3, 1e-4, 1e-5),
+                 length_scale=None, min_snr_gap=0.05, tolerance=0.15, grid_size=400):
+        """
+        snr_min, snr_max: SNR range to plan in (dB)
+        target_bers: BER levels whose crossing SNR we want to pin down
+        length_scale: GP length scale in dB (default: a quarter of the range)
+        min_snr_gap: never place a point closer than this to an existing one
+        tolerance: stop when the posterior std of log10(BER) at every crossing is below this
+        """
+        self.snr_min = snr_min
+        self.snr_max = snr_max
+        self.target_levels = np.log10(np.asarray(target_bers, dtype=float))
+        self.length_scale = length_scale or (snr_max - snr_min) / 4
+        self.min_snr_gap = min_snr_gap
+        self.tolerance = tolerance
+        self.grid = np.linspace(snr_min, snr_max, grid_size)
+
+        self.x = np.array([])
+        self.y = np.array([])
+        self.noise = np.array([])
+        self.signal_var = 1.0
+        self.trend = np.zeros(1)
+
+    def fit(self, results):
+        """
+        Fit the surrogate to sweep results
+
+        Args:
+            results: list of dicts with 'snr_db', 'bit_errors' and 'total_bits'
+        """
+        x, y, noise = [], [], []
+        for result in results:
+            observation = log_ber_observation(result.get('bit_errors', 0), result.get('total_bits', 0))
+            if observation is None:
+                continue
+            x.append(result['snr_db'])
+            y.append(observation[0])
+            noise.append(observation[1])
+
+        self._set_data(np.array(x), np.array(y), np.array(noise))
+        return self
+
+    def _set_data(self, x, y, noise):
+        self.x, self.y, self.noise = x, y, noise
+        if len(x) == 0:
+            return
+
+        # quadratic trend (linear with few points) - the GP models what is left
+        degree = min(2, len(x) - 1)
+        self.trend = np.polyfit(x, y, degree, w=1 / np.sqrt(noise)) if degree > 0 else np.array([np.mean(y)])
+        residuals = y - np.polyval(self.trend, x)
+        self.signal_var = max(float(np.var(residuals)), 0.25)
+
+    def _kernel(self, a, b):
+        return self.signal_var * np.exp(-(a[:, None] - b[None, :]) ** 2 / (2 * self.length_scale ** 2))
+
+    def predict(self, snr):
+        """
+        Posterior of log10(BER) at the given SNR points
+
+        Returns:
+            (mean, std) arrays - the mean is monotone non-increasing in SNR
+        """
+        snr = np.atleast_1d(np.asarray(snr, dtype=float))
+        if len(self.x) == 0:
+            return np.zeros_like(snr), np.full_like(snr, np.sqrt(self.signal_var))
+
+        K = self._kernel(self.x, self.x) + np.diag(self.noise)
+        K_s = self._kernel(snr, self.x)
+        L = np.linalg.cholesky(K + 1e-9 * np.eye(len(self.x)))
+
+        residuals = self.y - np.polyval(self.trend, self.x)
+        alpha = np.linalg.solve(L.T, np.linalg.solve(L, residuals))
+        v = np.linalg.solve(L, K_s.T)
+
+        mean = np.polyval(self.trend, snr) + K_s @ alpha
+        var = np.maximum(self.signal_var - np.sum(v ** 2, axis=0), 1e-12)
+
+        # BER never increases with SNR and never exceeds 0.5
+        order = np.argsort(snr)
+        mean[order] = monotone_decreasing(mean[order], 1 / var[order])
+        mean = np.minimum(mean, np.log10(0.5))
+        return mean, np.sqrt(var)
+
+    def _acquisition(self, mean, std):
+        """Uncertainty weighted by how likely the curve crosses a target level there"""
+        score = np.zeros_like(mean)
+        for level in self.target_levels:
+            score += std * np.exp(-(mean - level) ** 2 / (2 * (std ** 2 + self.tolerance ** 2)))
+        return score
+
+    def crossing_uncertainty(self):
+        """
+        Posterior std of log10(BER) where the mean crosses each target level
+
+        Returns:
+            dict {target_ber: std or None if the crossing is outside the range}
+        """
+        mean, std = self.predict(self.grid)
+        uncertainty = {}
+        for level in self.target_levels:
+            below = np.nonzero(mean <= level)[0]
+            if len(below) == 0 or below[0] == 0:
+                uncertainty[float(10 ** level)] = None
+            else:
+                uncertainty[float(10 ** level)] = float(std[below[0]])
+        return uncertainty
+
+    def converged(self):
+        """True when every target crossing inside the range is pinned down to the tolerance"""
+        if len(self.x) < 3:
+            return False
+        return all(std is None or std < self.tolerance for std in self.crossing_uncertainty().values())
+
+    def next_points(self, n_points=1):
+        """
+        Choose the next SNR point(s) to measure
+
+        Several points are chosen greedily: each chosen point is added as a
+        pseudo-observation at the posterior mean (kriging believer) so the
+        next one goes somewhere else.
+
+        Returns:
+            list of SNR values (may be shorter than n_points if the range is exhausted)
+        """
+        x, y, noise = self.x.copy(), self.y.copy(), self.noise.copy()
+        chosen = []
+
+        for _ in range(n_points):
+            mean, std = self.predict(self.grid)
+            score = self._acquisition(mean, std)
+
+            # keep away from existing points
+            existing = np.concatenate([self.x, chosen]) if chosen else self.x
+            for snr in existing:
+                score[np.abs(self.grid - snr) < self.min_snr_gap] = -np.inf
+
+            best = int(np.argmax(score))
+            if not np.isfinite(score[best]):
+                break
+
+            snr = float(self.grid[best])
+            chosen.append(snr)
+            self._set_data(np.append(self.x, snr), np.append(self.y, mean[best]), np.append(self.noise, 1e-4))
+
+        # restore the real observations
+        self._set_data(x, y, noise)
+        return chosen
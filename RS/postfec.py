@@ -0,0 +1,248 @@
+"""
+Analytic post-FEC error rates for hard-decision 1D Reed-Solomon codes
+
+Usage: python postfec.py --ser 1e-3 --codes 69,65 102,96 200,168
+       python postfec.py --log ./logs/snr_sweep_4PAM_RAW_<timestamp>.log --codes 69,65 102,96
+       python postfec.py --log ./logs/snr_sweep_4PAM_RAW_<timestamp>.log --fit sigmoid --snr 18 18.5 19
+
+Given the pre-FEC RS symbol error rate (SER) this computes the codeword error
+rate (CER), post-FEC SER and post-FEC BER of RS(N,K) without simulation:
+a codeword fails when more than t = (N-K)/2 of its N symbols are in error.
+When errors are correlated (e.g. DFE error propagation) they can be modelled
+as bursts with a mean length in RS symbols.
+
+This is used to screen candidate codes quickly - only the finalists need to go
+through model.py / tester.py.
+"""
+
+import argparse
+import json
+import numpy as np
+from scipy.stats import binom
+
+SYMBOL_BITS = 16  # RS symbols are GF(2^16) (reedsolo c_exp=16)
+
+# curve types of parse.fit_error_rate_curve
+FIT_CURVES = ['complementary_erf', 'sigmoid', 'exponential']
+
+def correctable_errors(n, k):
+    """Number of symbol errors RS(n,k) can correct"""
+    return (n - k) // 2
+
+def codeword_error_pmf(ser, n, burst_length=1.0):
+    """
+    Distribution of the number of symbol errors in an n-symbol codeword
+
+    Args:
+        ser: pre-FEC symbol error rate (scalar or array)
+        n: codeword length in symbols
+        burst_length: mean error burst length in symbols (1.0 = independent errors)
+
+    Returns:
+        array of shape (len(ser), n + 1) - pmf[i, e] = P(e errors | ser[i])
+    """
+    ser = np.atleast_1d(np.asarray(ser, dtype=float))
+    errors = np.arange(n + 1)
+
+    if burst_length <= 1.0:
+        # independent errors - plain binomial
+        return binom.pmf(errors[None, :], n, ser[:, None])
+
+    # bursty errors: burst starts are binomial over the codeword, burst lengths
+    # are geometric with the given mean (so the average SER is preserved)
+    q = 1.0 / burst_length
+    length_pmf = np.zeros(n + 1)
+    length_pmf[1:] = q * (1 - q) ** (errors[1:] - 1)
+    length_pmf[n] += 1.0 - length_pmf.sum()  # lump the tail into n errors
+
+    # pmf of the total length of j bursts, j = 0..n (repeated convolution, capped at n)
+    totals = np.zeros((n + 1, n + 1))
+    totals[0, 0] = 1.0
+    for j in range(1, n + 1):
+        conv = np.convolve(totals[j - 1], length_pmf)
+        totals[j, :n] = conv[:n]
+        totals[j, n] = conv[n:].sum()
+
+    start_rate = np.clip(ser / burst_length, 0.0, 1.0)
+    starts_pmf = binom.pmf(errors[None, :], n, start_rate[:, None])
+    return starts_pmf @ totals
+
+def post_fec_rates(ser, n, k, burst_length=1.0, bit_errors_per_symbol_error=1.0):
+    """
+    Post-FEC error rates of RS(n,k) for a given pre-FEC SER
+
+    A failed codeword is passed through undecoded (like Receiver.decode does),
+    so it keeps its e symbol errors. Miscorrection is not modelled.
+
+    Args:
+        ser: pre-FEC symbol error rate (scalar or array)
+        n, k: Reed-Solomon code parameters
+        burst_length: mean error burst length in symbols
+        bit_errors_per_symbol_error: average wrong bits per wrong RS symbol
+                                     (pre-FEC BER * 16 / SER from a raw sweep)
+
+    Returns:
+        dict with 'cer', 'ser' and 'ber' arrays (one entry per input SER)
+    """
+    t = correctable_errors(n, k)
+    pmf = codeword_error_pmf(ser, n, burst_length)
+
+    errors = np.arange(n + 1)
+    uncorrectable = errors > t
+
+    cer = pmf[:, uncorrectable].sum(axis=1)
+    post_ser = (pmf[:, uncorrectable] * errors[uncorrectable]).sum(axis=1) / n
+    post_ber = post_ser * bit_errors_per_symbol_error / SYMBOL_BITS
+
+    return {
+        'cer': cer,
+        'ser': post_ser,
+        'ber': post_ber
+    }
+
+def cer_from_histogram(histogram, t):
+    """
+    Codeword error rate of a t-correcting code from a measured histogram
+
+    Args:
+        histogram: counts of codewords with 0, 1, 2, ... symbol errors
+        t: number of correctable symbol errors
+
+    Returns:
+        fraction of codewords with more than t errors
+    """
+    histogram = np.asarray(histogram, dtype=float)
+    total = histogram.sum()
+    if total == 0:
+        return 0.0
+    return histogram[t + 1:].sum() / total
+
+def screen_codes(ser, codes, burst_length=1.0, bit_errors_per_symbol_error=1.0, target_ber=None):
+    """
+    Evaluate a list of RS codes at one pre-FEC SER
+
+    Args:
+        ser: pre-FEC symbol error rate (scalar)
+        codes: list of (n, k) tuples
+        target_ber: if given, mark which codes meet it
+
+    Returns:
+        list of dicts sorted by code rate (highest first)
+    """
+    rows = []
+    for n, k in codes:
+        rates = post_fec_rates(ser, n, k, burst_length, bit_errors_per_symbol_error)
+        row = {
+            'n': n,
+            'k': k,
+            't': correctable_errors(n, k),
+            'rate': k / n,
+            'cer': float(rates['cer'][0]),
+            'ser': float(rates['ser'][0]),
+            'ber': float(rates['ber'][0])
+        }
+        if target_ber is not None:
+            row['meets_target'] = row['ber'] <= target_ber
+        rows.append(row)
+
+    rows.sort(key=lambda r: r['rate'], reverse=True)
+    return rows
+
+def ser_from_fit(snr_db, ser_mean, snr_points, curve_type='sigmoid'):
+    """
+    Evaluate a fitted pre-FEC SER curve (parse.fit_error_rate_curve) at new SNR points
+
+    Returns:
+        array of SER values, or None if the fit failed
+    """
+    from parse import fit_error_rate_curve  # parse pulls in matplotlib, only import when needed
+
+    fitted_func, _, _ = fit_error_rate_curve(np.asarray(snr_db), np.asarray(ser_mean), curve_type)
+    if fitted_func is None:
+        return None
+    return np.clip(fitted_func(np.asarray(snr_points, dtype=float)), 0.0, 1.0)
+
+def load_pre_fec_ser(log_path):
+    """
+    Load measured pre-FEC SER from a raw-mode sweep log
+
+    Returns:
+        snr_db, ser_mean, ber_mean as arrays
+    """
+    with open(log_path, 'r') as f:
+        data = json.load(f)
+
+    if not data.get('raw_mode', False):
+        print(f"Warning: {log_path} is not a raw sweep, SER is already post-FEC")
+
+    results = sorted(data['results'], key=lambda r: r['snr_db'])
+    snr_db = np.array([r['snr_db'] for r in results])
+    ser_mean = np.array([r['ser_mean'] for r in results])
+    ber_mean = np.array([r['ber_mean'] for r in results])
+    return snr_db, ser_mean, ber_mean
+
+def parse_code(text):
+    """Parse 'n,k' into a tuple"""
+    n, k = text.split(',')
+    return int(n), int(k)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Analytic post-FEC CER/BER for RS(N,K) codes',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--ser', type=float, nargs='+',
+                        help='Pre-FEC RS symbol error rate(s)')
+    source.add_argument('--log', type=str,
+                        help='Raw-mode sweep log (./logs/snr_sweep_*PAM_RAW_*.log)')
+    parser.add_argument('--codes', type=parse_code, nargs='+', default=[(69, 65), (102, 96), (200, 168)],
+                        help='RS codes as n,k')
+    parser.add_argument('--burst_length', type=float, default=1.0,
+                        help='Mean error burst length in RS symbols')
+    parser.add_argument('--bits_per_error', type=float, default=None,
+                        help='Average bit errors per symbol error (default: from log, else 1)')
+    parser.add_argument('--target_ber', type=float, default=None,
+                        help='Mark codes meeting this post-FEC BER')
+    parser.add_argument('--fit', type=str, default=None, choices=FIT_CURVES,
+                        help='With --log, screen on this fitted SER curve instead of the measured points')
+    parser.add_argument('--snr', type=float, nargs='+', default=None,
+                        help='With --fit, SNR points (dB) to evaluate the fit at (default: the measured SNRs)')
+    args = parser.parse_args()
+
+    if args.fit and not args.log:
+        parser.error("--fit requires --log")
+    if args.snr and not args.fit:
+        parser.error("--snr requires --fit")
+
+    if args.log:
+        snr_db, ser_values, ber_values = load_pre_fec_ser(args.log)
+        if args.bits_per_error is None:
+            valid = ser_values > 0
+            ratio = ber_values[valid] * SYMBOL_BITS / ser_values[valid]
+            args.bits_per_error = float(np.mean(ratio)) if ratio.size else 1.0
+        if args.fit:
+            points = np.asarray(args.snr if args.snr else snr_db, dtype=float)
+            ser_values = ser_from_fit(snr_db, ser_values, points, args.fit)
+            if ser_values is None:
+                parser.exit(1, f"Error: {args.fit} fit of the SER in {args.log} failed (needs 4 points with SER > 0)\n")
+            snr_db = points
+    else:
+        snr_db = [None] * len(args.ser)
+        ser_values = args.ser
+    bits_per_error = args.bits_per_error if args.bits_per_error is not None else 1.0
+
+    for snr, ser in zip(snr_db, ser_values):
+        header = (f"Pre-FEC SER: {ser:.3e}" + (f" ({args.fit} fit)" if args.fit else "")
+                  + (f" at {snr:.3f} dB" if snr is not None else ""))
+        print(header)
+        for row in screen_codes(ser, args.codes, args.burst_length, bits_per_error, args.target_ber):
+            flag = ""
+            if 'meets_target' in row:
+                flag = "  OK" if row['meets_target'] else "  --"
+            print(f"  RS({row['n']},{row['k']}) t={row['t']:<3} rate={row['rate']:.4f}  "
+                  f"CER: {row['cer']:.3e}  SER: {row['ser']:.3e}  BER: {row['ber']:.3e}{flag}")
+        print()
+
+if __name__ == "__main__":
+    main()
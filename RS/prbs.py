@@ -0,0 +1,156 @@
+"""
+Seekable PRBS generators (PRBS-7/9/15/20/23/31/63)
+
+Fibonacci LFSRs in the convention of the FPGA prbs.sv modules: the register
+shifts left, the new bit is the XOR of two taps and is both shifted in and
+output (prbs31: sr[30] ^ sr[27], i.e. x^31 + x^28 + 1; prbs63: sr[62] ^ sr[61]).
+PRBS20 uses x^20 + x^3 + 1 like richard/PAM4_SNR.py.
+
+- Bits are generated a block at a time, not a bit per Python step: the output
+  sequence satisfies s[t] = s[t-a] ^ s[t-b] for the taps (a, b), and since
+  (1 + x^b + x^a)^2 = 1 + x^2b + x^2a over GF(2) also s[t] = s[t-2^j a] ^ s[t-2^j b],
+  so once 2^j a bits exist the next 2^j b bits are one vectorized XOR
+- seek() jumps the register to any offset with precomputed powers A^(2^i) of
+  the LFSR step matrix over GF(2) (a matrix is stored as the images of the
+  unit vectors, as ints), so a worker can start at its own slice of the same
+  sequence without generating what comes before
+- words() packs the bits into 64-bit words, first bit in the MSB, and
+  symbols() into data symbols of a given width, like the FPGA shifts the
+  serial PRBS into RS symbols
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# order -> taps (a, b): new bit = register bit (a-1) ^ register bit (b-1)
+POLYNOMIALS = {
+    7: (7, 6),
+    9: (9, 5),
+    15: (15, 14),
+    20: (20, 3),
+    23: (23, 18),
+    31: (31, 28),
+    63: (63, 62)
+}
+
+# Reset seeds of the FPGA generators / checkers (the others start from 1)
+DEFAULT_SEEDS = {31: 0b1101000101011010010010100011111, 63: 1}
+
+# PRBS bits per data symbol (RS_SYMBOL_WIDTH of the FPGA prbs63_120_8 source)
+PRBS_SYMBOL_BITS = 8
+
+def apply(matrix, vector):
+    """GF(2) matrix (images of the unit vectors) times a bit vector (int)"""
+    result = 0
+    j = 0
+    while vector:
+        if vector & 1:
+            result ^= matrix[j]
+        vector >>= 1
+        j += 1
+    return result
+
+def compose(a, b):
+    """Matrix product a @ b (apply b first)"""
+    return [apply(a, column) for column in b]
+
+def step_matrix(order):
+    """One LFSR step as a GF(2) matrix on the register"""
+    a, b = POLYNOMIALS[order]
+    mask = (1 << order) - 1
+    columns = [(1 << (j + 1)) & mask for j in range(order)]
+    columns[a - 1] ^= 1
+    columns[b - 1] ^= 1
+    return columns
+
+@lru_cache(maxsize=None)
+def jump_matrices(order):
+    """A^(2^i) for i = 0 .. order-1 (covers every offset below the period)"""
+    matrices = [step_matrix(order)]
+    for _ in range(order - 1):
+        matrices.append(compose(matrices[-1], matrices[-1]))
+    return tuple(matrices)
+
+def jump(order, state, steps):
+    """Register after `steps` LFSR steps from `state`"""
+    steps %= (1 << order) - 1
+    for matrix in jump_matrices(order):
+        if not steps:
+            break
+        if steps & 1:
+            state = apply(matrix, state)
+        steps >>= 1
+    return state
+
+class PRBS:
+    def __init__(self, order=31, seed=None):
+        """
+        order: register length (a key of POLYNOMIALS)
+        seed: initial register, non-zero and below 2^order (default DEFAULT_SEEDS / 1)
+        """
+        if order not in POLYNOMIALS:
+            raise ValueError(f"Unsupported PRBS order {order}, choose from {sorted(POLYNOMIALS)}")
+        seed = DEFAULT_SEEDS.get(order, 1) if seed is None else int(seed)
+        if not 0 < seed < (1 << order):
+            raise ValueError(f"PRBS{order} seed must be in 1 .. 2^{order}-1, got {seed}")
+        self.order = order
+        self.taps = POLYNOMIALS[order]
+        self.seed = seed
+        self.period = (1 << order) - 1
+        self.state = seed
+        self.position = 0
+
+    def seek(self, offset):
+        """Move to bit `offset` of the sequence (jump-ahead from the seed)"""
+        self.state = jump(self.order, self.seed, offset)
+        self.position = offset
+        return self
+
+    def tell(self):
+        return self.position
+
+    def bits(self, count):
+        """Next `count` bits (uint8 0/1)"""
+        a, b = self.taps
+        order = self.order
+        # the register holds the last `order` bits, the newest in bit 0
+        sequence = np.zeros(order + count, dtype=np.uint8)
+        sequence[:order] = [(self.state >> i) & 1 for i in range(order - 1, -1, -1)]
+
+        position = order
+        lag_a, lag_b = a, b
+        while position < len(sequence):
+            size = min(lag_b, len(sequence) - position)
+            sequence[position:position + size] = (sequence[position - lag_a:position - lag_a + size]
+                                                  ^ sequence[position - lag_b:position - lag_b + size])
+            position += size
+            if position >= 2 * lag_a:
+                lag_a, lag_b = 2 * lag_a, 2 * lag_b
+
+        self.state = int("".join(map(str, sequence[-order:])), 2)
+        self.position += count
+        return sequence[order:]
+
+    def words(self, count, width=64):
+        """Next `count` words of `width` bits (<= 64), first bit in the MSB, as uint64"""
+        bits = self.bits(count * width).reshape(count, width).astype(np.uint64)
+        return bits @ (np.uint64(1) << np.arange(width - 1, -1, -1, dtype=np.uint64))
+
+    def symbols(self, count, bits=8):
+        """Next `count` data symbols of `bits` bits each (MSB first), as int64"""
+        return self.words(count, bits).astype(np.int64)
+
+    def check(self, received):
+        """Bit errors of received bits against the next bits of the sequence (like prbs31_checker)"""
+        received = np.asarray(received, dtype=np.uint8)
+        return int(np.count_nonzero(self.bits(len(received)) != received))
+
+    def describe(self):
+        a, b = self.taps
+        return f"PRBS{self.order} (x^{a} + x^{b} + 1, seed {self.seed:#x})"
+
+def slices(total, parts):
+    """(offset, count) of `parts` disjoint consecutive slices covering `total` bits / symbols"""
+    bounds = np.linspace(0, total, parts + 1).astype(np.int64)
+    return [(int(start), int(stop - start)) for start, stop in zip(bounds[:-1], bounds[1:])]
@@ -0,0 +1,164 @@
+"""
+1/(1+D) precoding and EPF error-propagation channels of the FPGA data path
+
+The ZCU102 BER simulator (BER_SIM_ZCU102/README.md) runs the data through
+an AUI link on either side of the FEC, each a Gray coder, a precoder, an EPF
+channel and the matching decoder:
+
+    PRBS -> Gray -> precode TX -> EPF 1 -> precode RX -> Gray decode -> RS encode
+         -> ... PMD link ... -> RS decode
+         -> Gray -> precode TX -> EPF 3 -> precode RX -> Gray decode -> error counting
+
+- PrecodeTX / PrecodeRX (precode.v): on M-level symbol indices the TX sends
+  y[n] = x[n] - y[n-1] and the RX returns r[n] + r[n-1], both mod M. With
+  z[n] = (-1)^n y[n] the TX recursion becomes a cumulative sum, so both are
+  a few numpy calls per block
+- EPFChannel (epf_channel.sv): an error burst starts with probability RSER
+  after a correct symbol and continues with probability EPF. An errored
+  symbol moves one level up or down, and the sign alternates from error to
+  error, like DFE error propagation through a positive post-cursor tap.
+  Levels wrap modulo M as in the 2-bit FPGA arithmetic. The burst flags come
+  from the vectorized Gilbert-Elliott chain in error.py (p = RSER,
+  r = 1 - EPF, always wrong in the bad state)
+- AUILink: one AUI link on rows of RS data symbols: bits -> PAM4 Gray ->
+  [precode TX] -> EPF -> [precode RX] -> Gray decode -> symbols. An RS symbol
+  is 8 PAM4 symbols, so the rows come back in the same shape
+
+Without precoding an EPF burst of L symbols gives L wrong symbols. With it
+the alternating errors cancel in r[n] + r[n-1], leaving one wrong symbol at
+each end of the burst (a single error also gives two). The same precoder
+can also be put around the PMD link (stream.link precode=True), so the ISI
+channel and DFE work on precoded levels.
+
+Every stage carries its state (precoder memory, burst state, error sign)
+between blocks, like the stream.py stages.
+"""
+
+import numpy as np
+
+from encode import Binary, GrayCode
+from error import GilbertElliott
+from errorcount import SYMBOL_BITS
+
+# EPF channel thresholds of ber_top.sv, compared against a uniform 64-bit random number
+FPGA_RSER = 0x00029F16B11C6D1E  # burst start: 4e-5
+FPGA_EPF = 0xC000000000000000   # burst continuation (epf_channel default): 0.75
+
+# levels of the AUI links (2-bit symbols in the FPGA)
+AUI_LEVELS = 4
+
+def threshold_probability(threshold):
+    """Probability of a 64-bit FPGA threshold (uniform 64-bit random number < threshold)"""
+    return threshold / 2 ** 64
+
+DEFAULT_RSER = threshold_probability(FPGA_RSER)
+DEFAULT_EPF = threshold_probability(FPGA_EPF)
+
+class PrecodeTX:
+    def __init__(self, levels=AUI_LEVELS):
+        """
+        1/(1+D) precoder, y[n] = x[n] - y[n-1] mod levels (precode_tx)
+
+        levels: symbol alphabet size M
+        """
+        self.levels = levels
+        self.memory = 0  # last sent symbol (register reset value 0)
+
+    def process(self, symbols):
+        """Precode a block of symbols (int64 array)"""
+        symbols = np.asarray(symbols, dtype=np.int64)
+        if not len(symbols):
+            return symbols.copy()
+        alternating = 1 - 2 * (np.arange(len(symbols)) % 2)
+        sent = np.mod(alternating * (np.cumsum(alternating * symbols) - self.memory), self.levels)
+        self.memory = int(sent[-1])
+        return sent
+
+class PrecodeRX:
+    def __init__(self, levels=AUI_LEVELS):
+        """
+        1+D decoder, x[n] = r[n] + r[n-1] mod levels (precode_rx)
+
+        levels: symbol alphabet size M
+        """
+        self.levels = levels
+        self.memory = 0  # last received symbol
+
+    def process(self, symbols):
+        """Decode a block of received symbols (int64 array)"""
+        symbols = np.asarray(symbols, dtype=np.int64)
+        if not len(symbols):
+            return symbols.copy()
+        previous = np.concatenate([[self.memory], symbols[:-1]])
+        self.memory = int(symbols[-1])
+        return np.mod(symbols + previous, self.levels)
+
+class EPFChannel:
+    def __init__(self, rser=DEFAULT_RSER, epf=DEFAULT_EPF, levels=AUI_LEVELS, rng=None):
+        """
+        Error-propagation symbol channel (epf_channel)
+
+        rser: probability that a burst starts after a correct symbol
+        epf: probability that a burst continues with the next symbol
+        levels: symbol alphabet size M (errors wrap modulo M)
+        rng: numpy Generator
+        """
+        self.rser = rser
+        self.epf = epf
+        self.levels = levels
+        self.channel = GilbertElliott(p=rser, r=1 - epf, rng=rng)
+        self.sign = 0  # err_sign: the next error goes up (0) or down (1)
+
+    def process(self, symbols):
+        """Apply the channel to a block of symbols (a copy is returned)"""
+        symbols = np.array(symbols, dtype=np.int64)
+        positions = np.flatnonzero(self.channel.error_mask(len(symbols)))
+        steps = np.where((np.arange(len(positions)) + self.sign) % 2 == 0, 1, -1)
+        symbols[positions] = np.mod(symbols[positions] + steps, self.levels)
+        self.sign = (self.sign + len(positions)) % 2
+        return symbols
+
+    def summary(self):
+        """Error counters and burst histogram (GilbertElliott.summary)"""
+        return self.channel.summary()
+
+class AUILink:
+    def __init__(self, name, rser=DEFAULT_RSER, epf=DEFAULT_EPF, precode=True, rng=None, levels=AUI_LEVELS):
+        """
+        AUI link on RS data symbols: Gray -> [precode TX] -> EPF -> [precode RX] -> Gray decode
+
+        name: label for the report ('aui1' before RS encoding, 'aui2' after RS decoding)
+        rser, epf: EPF channel probabilities
+        precode: 1/(1+D) precoding around the EPF channel (FPGA precode_en)
+        rng: numpy Generator of the EPF channel
+        levels: PAM levels of the link
+        """
+        self.name = name
+        self.levels = levels
+        self.precode = precode
+        self.precoder = PrecodeTX(levels) if precode else None
+        self.decoder = PrecodeRX(levels) if precode else None
+        self.epf = EPFChannel(rser, epf, levels, rng)
+        self.symbol_errors = 0  # wrong link symbols after the decoder
+
+    def process(self, rows):
+        """Send (rows, symbols) RS data symbols over the link, same shape back"""
+        rows = np.asarray(rows, dtype=np.int64)
+        symbols = GrayCode.gray_encode_array(Binary.bit_encode_array(rows.ravel(), SYMBOL_BITS), self.levels)
+        received = self.epf.process(symbols if self.precoder is None else self.precoder.process(symbols))
+        if self.decoder is not None:
+            received = self.decoder.process(received)
+        self.symbol_errors += int(np.count_nonzero(received != symbols))
+        bits = GrayCode.gray_decode_array(received, self.levels)
+        return Binary.bit_decode_array(bits, SYMBOL_BITS).reshape(rows.shape)
+
+    def load_state(self, other):
+        """Take over the state and counters of a copy that ran in another process (pipeline TX worker)"""
+        self.__dict__.update(other.__dict__)
+
+    def describe(self):
+        stats = self.epf.summary()
+        return (f"{self.name.upper()}: {self.levels}-PAM, {'1/(1+D) precoded' if self.precode else 'no precoding'}, "
+                f"EPF RSER={self.epf.rser:.3g} EPF={self.epf.epf:.3g} - {stats['errors']} channel errors "
+                f"(mean burst {stats['mean_burst_length']:.2f}), {self.symbol_errors} wrong symbols after the link "
+                f"in {stats['steps']}")
@@ -1,7 +1,13 @@
 import reedsolo, random, math
+import numpy as np
+
+from gf import FieldTables
+from eventlog import get_logger
 
 DEBUG = True
 
+log = get_logger("reedsolomon")
+
 def print_square_matrix(matrix):
     """
     Print a square matrix in a square
@@ -39,6 +45,14 @@ class ReedSolomon1D():
         :param k: The number of data symbols.
         """
         self.rs = reedsolo.RSCodec(n - k, c_exp=16)
+        self._field = None
+
+    @property
+    def field(self):
+        """Batched numpy encoder on the codec's field (gf.py), built on first use."""
+        if self._field is None:
+            self._field = FieldTables(self.rs)
+        return self._field
 
     def encode(self, data, n, k):
         """
@@ -52,6 +66,17 @@ class ReedSolomon1D():
 
         return self.rs.encode(data)
 
+    def encode_blocks(self, messages, n, k):
+        """
+        Encode many messages at once.
+
+        :param messages: (blocks, k) data symbols.
+        :param n: The total number of symbols in the codeword.
+        :param k: The number of data symbols.
+        :return: (blocks, n) int64 array of codewords.
+        """
+        return self.field.encode(messages)
+
     def decode(self, data, n, k):
         """
         Decode data using Reed-Solomon decoding.
@@ -67,15 +92,90 @@ class ReedSolomon1D():
             # print(f"Decoding error: {e}")
             return None
 
+    def decode_blocks(self, codewords, n, k, erasures=None):
+        """
+        Decode many received codewords at once (batched numpy decoder, gf.py).
+
+        :param codewords: (blocks, n) received symbols.
+        :param n: The total number of symbols in the codeword.
+        :param k: The number of data symbols.
+        :param erasures: Optional (blocks, n) bool mask of erased positions.
+        :return: (codewords, failed) - (blocks, n) int64 corrected codewords (received
+                 ones unchanged where decoding failed) and a (blocks,) bool failure flag.
+        """
+        return self.field.decode(codewords, erasures)
+
+    def decode_codeword(self, data, n, k):
+        """
+        Decode data and return the whole corrected codeword.
+
+        :param data: The received codeword.
+        :param n: The total number of symbols in the codeword.
+        :param k: The number of data symbols.
+        :return: (codeword, failed) - the corrected codeword (the received one
+                 unchanged if decoding failed) and whether the decoder detected a failure.
+        """
+        try:
+            return list(self.rs.decode(data)[1]), False
+        except reedsolo.ReedSolomonError as e:
+            return list(data), True
+
+    @staticmethod
+    def message(codeword, n, k):
+        """Data symbols of a (systematic) codeword."""
+        return codeword[:k]
+
+def product_message(codeword, n, k, k2=None):
+    """
+    Data symbols (top-left k2 x k) of a flattened n2 x n product block.
+
+    :param n, k: Row code RS(n,k).
+    :param k2: Data rows (column code k, default k - square block).
+    """
+    return sum((list(codeword[i * n:i * n + k]) for i in range(k if k2 is None else k2)), [])
+
 class ReedSolomon2D():
-    def __init__(self, n, k):
+    def __init__(self, n, k, n2=None, k2=None, check_corner=False):
         """
         Initialize the Reed-Solomon codec with given parameters.
 
+        The block is n2 rows x n columns: every row is an RS(n,k) codeword and every
+        column an RS(n2,k2) codeword, with k2 x k data symbols. Without n2 / k2 both
+        codes are RS(n,k) (square block). Any length below the field size is allowed,
+        so both codes can be shortened freely.
+
         :param n: The total number of symbols in the codeword.
         :param k: The number of data symbols.
+        :param n2: Column code length (number of rows of the block).
+        :param k2: Column code data symbols (number of data rows).
+        :param check_corner: Cross-check the parity-on-parity corner of every encoded
+                 block (also done when the event log is at debug level).
         """
+        self.n2 = n if n2 is None else n2
+        self.k2 = k if k2 is None else k2
+        if not 0 < self.k2 < self.n2:
+            raise ValueError(f"Column code RS({self.n2},{self.k2}) needs 0 < k2 < n2.")
         self.rs = reedsolo.RSCodec(n - k, c_exp=16)
+        self.rs_col = self.rs if self.n2 - self.k2 == n - k else reedsolo.RSCodec(self.n2 - self.k2, c_exp=16)
+        self.check_corner = check_corner
+        self._field = None
+        self._col_field = None
+
+    @property
+    def field(self):
+        """Batched numpy encoder on the row codec's field (gf.py), built on first use."""
+        if self._field is None:
+            self._field = FieldTables(self.rs)
+        return self._field
+
+    @property
+    def col_field(self):
+        """Batched numpy encoder of the column code."""
+        if self.rs_col is self.rs:
+            return self.field
+        if self._col_field is None:
+            self._col_field = FieldTables(self.rs_col)
+        return self._col_field
 
     def encode(self, data, n, k):
         """
@@ -86,92 +186,138 @@ class ReedSolomon2D():
         :param k: The number of data symbols.
         :return: The encoded data as bytes.
         """
-        # unflatten the data into a 2D array
-        data = [list(data[i:i + k]) for i in range(0, len(data), k)]
-
-        # get the 2d array size
-        parity_size = n - k
-        rows = len(data)
-        cols = len(data[0]) if rows > 0 else 0
-        arr_size = (rows + parity_size) * (cols + parity_size)
-
-        arr = [ [0] * (cols + parity_size) for _ in range(rows + parity_size) ]
-
-        # populate the array with data
-        for i in range(rows):
-            # encode the row
-            row_data = data[i]
-            encoded_row = self.rs.encode(row_data)
-
-            for j in range(len(encoded_row)):
-                try:
-                    arr[i][j] = encoded_row[j]
-                except IndexError as e:
-                    print(f"IndexError: {e} - arr size: {len(arr)}, i: {i}, j: {j}, encoded_row size: {len(encoded_row)}")
-                    raise
-
-        # encode the columns
-        for j in range(cols):
-            col_data = [arr[i][j] for i in range(rows)]
-            encoded_col = self.rs.encode(col_data)
-
-            for r in range(rows, rows + parity_size):
-                arr[r][j] = encoded_col[r]
-
-        # parity on parity!
-        # do by row
-        parity_parity_rows = [[0] * (cols + parity_size) for _ in range(parity_size)]
-        for i in range(rows, rows + parity_size):
-            # encode the row
-            row_data = arr[i][:cols]
-            encoded_row = self.rs.encode(row_data)
-
-            for j in range(len(encoded_row)):
-                parity_parity_rows[i - rows][j] = encoded_row[j]
-        
-        # do by col
-        parity_parity_cols = [[0] * (parity_size) for _ in range(rows + parity_size)]
-        for j in range(cols, cols + parity_size):
-            col_data = [arr[i][j] for i in range(rows + parity_size)][:cols]
-            encoded_col = self.rs.encode(col_data)
-            for r in range(len(encoded_col)):
-                parity_parity_cols[r][j - cols] = encoded_col[r]
-
-        # they should be the same!! - rules
-        # extra parity symbols from rows
-        ppr = [row[rows:] for row in parity_parity_rows]  # take only the parity part
-
-        # extra parity symbols from cols
-        ppc = parity_parity_cols[cols:]
-
-        # if same, add to arr - compared ppr and ppc
-        if ppr == ppc:
-            for i in range(parity_size):
-                for j in range(parity_size):
-                    arr[rows + i][cols + j] = ppr[i][j]
-        else:
-            print("Warning: Parity rows and columns do not match!")
-
-        # print_square_matrix(arr)
-
-        return sum(arr, [])  # flatten the 2D array to 1D bytes
-
-    def decode(self, data, n, k, max_iterations=math.inf):
+        return self.encode_blocks([list(data)], n, k)[0].tolist()
+
+    def encode_blocks(self, messages, n, k):
+        """
+        Product-encode many blocks at once.
+
+        Every data row is encoded first, then one column pass runs over all n
+        columns: the columns of the row parity give the parity-on-parity corner
+        directly, so it is not computed twice.
+
+        :param messages: (blocks, rows * k) data symbols, each block row-major (rows = k2 normally).
+        :param n: The total number of symbols in the codeword.
+        :param k: The number of data symbols.
+        :return: (blocks, (rows + n2 - k2) * n) int64 array of flattened blocks.
+        """
+        messages = np.asarray(messages, dtype=np.int64)
+        blocks = len(messages)
+        rows = messages.shape[1] // k
+
+        # row pass: (blocks, rows, n)
+        arr = self.field.encode(messages.reshape(blocks * rows, k)).reshape(blocks, rows, n)
+
+        # column pass over data and row parity columns: (blocks, n2 - k2, n)
+        parity_rows = self.n2 - self.k2
+        columns = arr.transpose(0, 2, 1).reshape(blocks * n, rows)
+        column_parity = self.col_field.parity(columns).reshape(blocks, n, parity_rows).transpose(0, 2, 1)
+
+        if self.check_corner or log.debug_enabled:
+            # encoding the parity rows must give the same corner (product code)
+            corner = self.field.parity(column_parity[:, :, :k].reshape(-1, k)).reshape(blocks, parity_rows, n - k)
+            assert np.array_equal(corner, column_parity[:, :, k:]), "Parity rows and columns do not match!"
+
+        return np.concatenate([arr, column_parity], axis=1).reshape(blocks, -1)
+
+    def decode_blocks(self, blocks, n, k, max_iterations=math.inf, erasures=None):
+        """
+        Iteratively decode many flattened n2 x n blocks at once.
+
+        Same row / column iteration as decode_codeword, with every row pass and
+        every column pass run as one batched decode (gf.py) over all blocks still
+        changing. A row or column that decodes clears its erasure flags, so the
+        erasures left after the row pass are passed on to the columns.
+
+        :param blocks: (blocks, n2 * n) received symbols, each block row-major.
+        :param n: The total number of symbols in the codeword.
+        :param k: The number of data symbols.
+        :param max_iterations: Iteration cap per block.
+        :param erasures: Optional (blocks, n2 * n) bool mask of erased positions.
+        :return: (blocks, failed, iterations) - corrected (blocks, n2 * n) int64 blocks,
+                 (blocks,) bool failure flags (some row or column still uncorrectable in
+                 the last iteration) and (blocks,) iterations run, as decode_codeword.
+        """
+        arr = np.array(blocks, dtype=np.int64).reshape(-1, self.n2, n)
+        erased = None if erasures is None else np.array(erasures, dtype=bool).reshape(arr.shape)
+        count = len(arr)
+        failed = np.zeros(count, dtype=bool)
+        iterations = np.zeros(count, dtype=np.int64)
+        active = np.arange(count)
+
+        iteration = 0
+        while len(active) and iteration < max_iterations:
+            iteration += 1
+            block = arr[active]
+            mask = None if erased is None else erased[active]
+            changes = np.zeros(len(active), dtype=np.int64)
+            failures = np.zeros(len(active), dtype=np.int64)
+
+            # rows with the row code, then columns (transposed) with the column code
+            for field in (self.field, self.col_field):
+                shape = block.shape
+                words = block.reshape(-1, shape[2])
+                decoded, row_failed = field.decode(words, None if mask is None else mask.reshape(-1, shape[2]))
+                changes += (decoded != words).reshape(shape).sum(axis=(1, 2))
+                failures += row_failed.reshape(shape[:2]).sum(axis=1)
+                block = decoded.reshape(shape).transpose(0, 2, 1)
+                if mask is not None:
+                    mask = (mask & row_failed.reshape(shape[:2])[:, :, None]).transpose(0, 2, 1)
+
+            arr[active] = block
+            if erased is not None:
+                erased[active] = mask
+            iterations[active] = iteration
+            failed[active] = failures > 0
+            active = active[changes > 0]
+
+        return arr.reshape(count, -1), failed, iterations
+
+    def decode(self, data, n, k, max_iterations=math.inf, return_stats=False):
         """
         Decode data using Reed-Solomon decoding.
 
         :param data: The encoded data to decode (as bytes) - flattened.
         :param n: The total number of symbols in the codeword.
         :param k: The number of data symbols.
-        :return: The decoded data as bytes.
+        :param return_stats: Also return the iteration statistics (see decode_codeword).
+        :return: The decoded data as bytes, or (data, stats) with return_stats.
+        """
+        if return_stats:
+            codeword, _, stats = self.decode_codeword(data, n, k, max_iterations, return_stats=True)
+            return self.message(codeword, n, k), stats
+        codeword, _ = self.decode_codeword(data, n, k, max_iterations)
+        return self.message(codeword, n, k)
+
+    def message(self, codeword, n, k):
+        """Data symbols (top-left k2 x k) of a flattened n2 x n block."""
+        return product_message(codeword, n, k, self.k2)
+
+    def decode_codeword(self, data, n, k, max_iterations=math.inf, return_stats=False, keep_history=False):
         """
-        # reconstruct 2D array into nxn
+        Iteratively decode a flattened n2 x n block and return the whole corrected block.
+
+        :param data: The encoded data to decode - flattened.
+        :param n: The total number of symbols in the codeword.
+        :param k: The number of data symbols.
+        :param return_stats: Also return a dict of iteration statistics:
+                 'iterations' (row + column passes run, including the final one without changes),
+                 'corrections' (symbols changed in each iteration),
+                 'failures' (uncorrectable rows + columns in each iteration),
+                 'converged' (stopped because an iteration changed nothing, not at max_iterations).
+        :param keep_history: With return_stats, also keep the k2 x k data symbols after every
+                 iteration in stats['history'] - the output a decoder capped at that many
+                 iterations would have given.
+        :return: (codeword, failed) - the (partially) corrected flattened block and
+                 whether some row or column was still uncorrectable in the last iteration,
+                 or (codeword, failed, stats) with return_stats.
+        """
+        # reconstruct 2D array into n2 x n
         arr = [data[i:i + n] for i in range(0, len(data), n)]
         rows = len(arr)
         cols = len(arr[0]) if rows > 0 else 0
-        parity_size = n - k
 
-        if rows != cols or rows != n or cols != n:
+        if rows != self.n2 or cols != n or len(data) != rows * cols:
             raise ValueError("Data does not match expected dimensions for Reed-Solomon 2D decoding.")
         
         # decode rows 
@@ -196,38 +342,61 @@ class ReedSolomon2D():
         """
 
         iterations = 0
+        failures = 0
+        converged = False
+        corrections_per_iteration = []
+        failures_per_iteration = []
+        history = []
         while iterations < max_iterations:
             iterations += 1
             changes = 0
+            failures = 0
 
-            for direction in ['ccw', 'cw']:
+            # rows with the row code, then (rotated) columns with the column code
+            for direction, codec in (('ccw', self.rs), ('cw', self.rs_col)):
                 # decode each row
-                for i in range(rows):
+                for i in range(len(arr)):
                     row_data = arr[i]
 
                     try:
-                        decoded_row = self.rs.decode(row_data)
+                        decoded_row = codec.decode(row_data)
                         if decoded_row is not None:
                             decoded_row = decoded_row[1]
                             arr[i] = list(decoded_row)
                             # print(f"Decoded row {i}: {arr[i]}")
-                            changes += sum(1 for j in range(cols) if arr[i][j] != row_data[j])
+                            changes += sum(1 for j in range(len(row_data)) if arr[i][j] != row_data[j])
                     except reedsolo.ReedSolomonError as e:
                         # print(f"Row decoding error: {e} - {list(row_data)}")
                         arr[i] = list(row_data)  # keep original row if decoding fails
+                        failures += 1
 
                 arr = rotate_matrix(arr, direction)
 
+            corrections_per_iteration.append(changes)
+            failures_per_iteration.append(failures)
+            if keep_history:
+                history.append(self.message(sum(arr, []), n, k))
+
             if changes == 0:
-                print(f"No changes made in iteration {iterations}, stopping decoding.")
+                converged = True
                 break
 
-        print(f"iterations: {iterations}")
-
-        # remove parity symbols
-        arr = [row[:cols - parity_size] for row in arr[:rows - parity_size]]
-
-        return sum(arr, [])
+        if log.debug_enabled:
+            log.debug("decode_2d", iterations=iterations, converged=converged, failures=failures,
+                      corrections=corrections_per_iteration)
+
+        if not return_stats:
+            return sum(arr, []), failures > 0
+
+        stats = {
+            "iterations": iterations,
+            "corrections": corrections_per_iteration,
+            "failures": failures_per_iteration,
+            "converged": converged
+        }
+        if keep_history:
+            stats["history"] = history
+        return sum(arr, []), failures > 0, stats
 
 # Example usage:
 if __name__ == "__main__":
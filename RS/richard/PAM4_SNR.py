@@ -1,170 +1,105 @@
-import numpy as np
-## function definitions
-
-def prbs20(seed):
-    """Genterates PRBS20 sequence
-
-    Parameters
-    ----------
-    seed : int
-        seed used to generate sequence
-        should be greater than 0 and less than 2^20
-
-    Returns
-    -------
-    array:
-        PRBS20 sequence
-    """
-    if (type(seed)!= int) or (seed>0xfffff) or (seed < 1):
-        print("seed must be positive int less than 2^20")
-        return False
-    
-    code = seed
-    seq = np.zeros(2**20-1, dtype=np.uint8)
-    i = 0
-    sequence_complete = False
-    
-    while(i<2**20):
-        next_bit = ((code>>19) ^ (code>>2)) & 0x00001
-        code = ((code<<1) | next_bit) & 0xfffff
-        seq[i] = next_bit
-        i = i+1
-        if (code==seed):
-            sequence_complete = True
-            break
-        
-    if sequence_complete:
-        return seq
-    else:
-        print ("error, PRBS sequence did not complete")
-        return False
-
-def gray_encode(x):
-    """does grey encoding on a sequnce of bits
-
-    Parameters
-    ----------
-    x : array
-        contains the input binary data in a numpy arrau
-    
-    Returns
-    -------
-    int
-        array of half the length of x contianing grey coded PAM-4 symbols
-
-    """
-    if (x.size%2):
-        print ("input must be even number of bits")
-        return False
-
-    n_bits = x.size
-    n_symbols = int(n_bits/2)
-    x = x.reshape([n_symbols,2])
-    out = np.zeros(n_symbols, dtype=np.uint8)
-
-    #print(x)
-    #print(x[0,0])
-    for i in range (n_symbols):
-        if (x[i,0] == 0):
-            if (x[i,1] == 0):
-                out[i]=0
-            else:
-                out[i]=1
-        else:
-            if (x[i,1] == 0):
-                out[i]=3
-            else:
-                out[i]=2
-
-    return out
-        
-def gray_decode(symbols):
-
-    n_symbols = symbols.size
-
-    n_bits = int(n_symbols*2)
-
-    out = np.zeros(n_bits, dtype=np.uint8)
-
-    for i in range(n_symbols):
-        if symbols[i] == 0:
-            out[2*i] = 0
-            out[2*i+1] = 0
-        elif symbols[i] == 1 :
-            out[2*i] = 0
-            out[2*i+1] = 1
-        elif symbols[i] == 2 :
-            out[2*i] = 1
-            out[2*i+1] = 1
-        elif symbols[i] == 3 :
-            out[2*i] = 1
-            out[2*i+1] = 0
-        else:
-            print(i)
-            print('unexpected symbol in data_in')
-            return False 
-    return out
-
-#script begins
-
-#run simulation on 1M bits
-n_bits = 1000000
-
-#Generate input data
-input_bits = prbs20(1)[:n_bits]
-
-#Gray encode to PAM-4 symbols
-input_symbols = gray_encode(input_bits)
-
-n_symbols = input_symbols.size
-
-#standard PAM4 levels
-levels = np.array([-3,-1,1,3])
-
-#calculate SNR for noise var of 0.1 AWGN channel
-avg_signal_power = np.sum(levels**2)/levels.size
-noise_variance = 0.1
-noise_standard_deviation = np.sqrt(noise_variance)
-SNR_dB = 10*np.log10(avg_signal_power/noise_variance)
-
-print(noise_variance, noise_standard_deviation)
-print("SNR of AWGN channel is %.20f dB"%SNR_dB)
-
-signal = np.zeros(n_symbols)
-
-#map symbols to PAM-4 levels
-for i in range(n_symbols):
-    signal[i] = levels[input_symbols[i]]
-
-#add noise
-print(f"signal: {signal}    noise: {np.random.normal(size=n_symbols,scale=noise_standard_deviation)}")
-signal_noise = signal + np.random.normal(size=n_symbols,scale=noise_standard_deviation)
-
-#slice
-thresholds = np.array([-2,0,2])
-output_symbols = np.zeros(n_symbols)
-for i in range(n_symbols):
-    if signal_noise[i]<thresholds[1]:
-        if signal_noise[i]<thresholds[0]:
-            output_symbols[i]=0
-        else:
-            output_symbols[i]=1
-    else:
-        if signal_noise[i]<thresholds[2]:
-            output_symbols[i]=2
-        else:
-            output_symbols[i]=3
-
-#check SER
-n_symbol_errors = np.sum(input_symbols!=output_symbols)
-SER = n_symbol_errors/n_symbols
-from decimal import Decimal
-print("SER is %.2E"%SER)
-
-#check BER
-output_bits = gray_decode(output_symbols)
-n_bit_errors = np.sum(input_bits!=output_bits)
-BER = n_bit_errors/n_bits
-print("BER is %.2E"%BER)
-
-
+"""Uncoded PAM-4 over AWGN, PRBS20 data - reference SER / BER against theory
+
+Importable: the functions are array based and the experiment only runs as a
+script. The simulation and the Q-function theory live in ../awgn.py (which
+also covers 6/8-PAM, batched noise sweeps and the model.py calibration check).
+
+The levels are -3, -1, 1, 3 and the SNR is average signal power over noise
+variance; model.py refers its SNR to the peak power instead, so the model.py
+run matching noise variance 0.1 here is --snr_db 19.54 (9 / 0.1), not 16.99 (5 / 0.1).
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from awgn import simulate, theory  # noqa: E402
+from encode import GrayCode  # noqa: E402
+from prbs import PRBS  # noqa: E402
+
+LEVELS = np.array([-3, -1, 1, 3])
+
+def prbs20(seed=1, n_bits=None):
+    """Generates PRBS20 sequence (x^20 + x^3 + 1)
+
+    Parameters
+    ----------
+    seed : int
+        seed used to generate sequence
+        should be greater than 0 and less than 2^20
+    n_bits : int, optional
+        number of bits (default one full period, 2^20-1)
+
+    Returns
+    -------
+    array:
+        PRBS20 sequence (uint8)
+    """
+    generator = PRBS(20, seed)
+    return generator.bits(generator.period if n_bits is None else n_bits)
+
+def gray_encode(x):
+    """Gray encodes a bit array into PAM-4 symbols (00->0, 01->1, 11->2, 10->3)
+
+    Parameters
+    ----------
+    x : array
+        input bits, even length
+
+    Returns
+    -------
+    array
+        symbols, half the length of x
+    """
+    if x.size % 2:
+        raise ValueError("input must be even number of bits")
+    return GrayCode.gray_encode_array(x, 4).astype(np.uint8)
+
+def gray_decode(symbols):
+    """Inverse of gray_encode: PAM-4 symbols back to bits"""
+    return GrayCode.gray_decode_array(symbols, 4)
+
+def snr_db(noise_variance, levels=LEVELS):
+    """Average signal power over noise variance, in dB"""
+    return 10 * np.log10(np.mean(np.asarray(levels) ** 2) / np.asarray(noise_variance))
+
+def run(noise_variances, n_bits=1000000, seed=0):
+    """Simulated and theoretical SER / BER for each noise variance (one batched pass)
+
+    Parameters
+    ----------
+    noise_variances : array
+        AWGN variances on the -3, -1, 1, 3 levels
+    n_bits : int
+        PRBS20 bits per noise variance
+    seed : int
+        noise seed
+
+    Returns
+    -------
+    dict
+        'snr_db', 'ser', 'ber' (simulated), 'ser_theory', 'ber_theory'
+    """
+    sigmas = np.sqrt(np.atleast_1d(noise_variances))
+    simulated = simulate(4, sigmas, n_bits, symbol_separation=3, seed=seed, prbs_order=20)
+    exact = theory(4, sigmas, symbol_separation=3)
+    return {
+        "snr_db": snr_db(sigmas ** 2),
+        "ser": simulated["ser"],
+        "ber": simulated["ber"],
+        "ser_theory": exact["ser"],
+        "ber_theory": exact["ber"]
+    }
+
+if __name__ == "__main__":
+    # run simulation on 1M bits at noise variance 0.1 (plus a few neighbours in the same pass)
+    noise_variances = np.array([0.1, 0.15, 0.2, 0.3])
+    results = run(noise_variances)
+    for i, variance in enumerate(noise_variances):
+        print(f"noise variance {variance:g} (sigma {np.sqrt(variance):.4f}): SNR of AWGN channel is "
+              f"{results['snr_db'][i]:.4f} dB")
+        print(f"  SER is {results['ser'][i]:.2E} (theory {results['ser_theory'][i]:.2E})")
+        print(f"  BER is {results['ber'][i]:.2E} (theory {results['ber_theory'][i]:.2E})")
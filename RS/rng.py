@@ -0,0 +1,61 @@
+"""
+Reproducible random streams for the simulation
+
+Every random component (data generation, channel noise, error injection)
+draws from its own numpy Generator. Generators come from a SeedSequence tree:
+the root is the run seed and each stream is addressed by a key such as
+("test", "noise") or ("chunk", 12, "data"), so
+
+- any single stream (and therefore any run / chunk) can be regenerated exactly
+- streams with different keys are statistically independent, also across
+  parallel workers
+"""
+
+import hashlib
+import numpy as np
+
+def _key_word(part):
+    """Map one key part to a non-negative integer"""
+    if isinstance(part, (int, np.integer)) and not isinstance(part, bool) and part >= 0:
+        return int(part)
+    if isinstance(part, (float, np.floating)):
+        part = repr(round(float(part), 6))
+    digest = hashlib.sha256(str(part).encode()).digest()
+    return int.from_bytes(digest[:8], "little")
+
+def stream_key(*parts):
+    """
+    Spawn key for a stream
+
+    Args:
+        parts: ints, floats or strings naming the stream (e.g. config hash, SNR, iteration, chunk)
+
+    Returns:
+        tuple of non-negative ints usable as a SeedSequence spawn_key
+    """
+    return tuple(_key_word(part) for part in parts)
+
+def seed_sequence(seed, *parts):
+    """SeedSequence for the stream named by parts under the root seed"""
+    return np.random.SeedSequence(entropy=seed, spawn_key=stream_key(*parts))
+
+def make_rng(seed, *parts):
+    """
+    Generator for the stream named by parts under the root seed
+
+    Example:
+        noise_rng = make_rng(seed, "chunk", 3, "noise")
+    """
+    return np.random.default_rng(seed_sequence(seed, *parts))
+
+def derive_seed(seed, *parts):
+    """Integer seed for a sub-run (e.g. one tester iteration passed to model.py --seed)"""
+    return int(seed_sequence(seed, *parts).generate_state(1, np.uint64)[0])
+
+def random_seed():
+    """Fresh root seed from OS entropy (print it so the run can be repeated)"""
+    return int(np.random.SeedSequence().entropy)
+
+def random_symbols(rng, size, high=225):
+    """size uniform random data symbols in [0, high] as a list"""
+    return rng.integers(0, high + 1, size).tolist()
@@ -1,3 +1,5 @@
+import numpy as np
+
 class Slicer:
      @staticmethod
      def hard_slicer(symbols, symbol_separation=48, n_levels=4):
@@ -25,4 +27,13 @@ class Slicer:
             min_distance_idx = distances_squared.index(min(distances_squared))
             decisions.append(min_distance_idx)
         
-        return decisions
\ No newline at end of file
+        return decisions
+
+     @staticmethod
+     def hard_slicer_array(symbols, symbol_separation=48, n_levels=4):
+        """
+        Vectorized hard_slicer - the constellation is uniform, so the nearest
+        point index is a scaled, rounded and clipped copy of the input
+        """
+        scaled = (np.asarray(symbols, dtype=float) / symbol_separation + 1) * (n_levels - 1) / 2
+        return np.clip(np.rint(scaled), 0, n_levels - 1).astype(np.int64)
@@ -0,0 +1,112 @@
+"""
+Confidence-interval based stopping rules for BER measurements
+
+Instead of running a fixed number of iterations / a fixed error count per SNR
+point, track a binomial confidence interval on the BER as data comes in and
+stop once it is tight enough, or once it shows the point is outside the
+BER range (cliff region) we care about.
+"""
+
+import numpy as np
+from scipy.stats import beta, norm
+
+def wilson_interval(errors, trials, confidence=0.95):
+    """
+    Wilson score interval for a binomial proportion
+
+    Args:
+        errors: number of errors observed
+        trials: number of bits (or symbols) observed
+        confidence: two-sided confidence level
+
+    Returns:
+        (lower, upper) bounds on the error rate
+    """
+    if trials <= 0:
+        return 0.0, 1.0
+
+    z = norm.ppf(0.5 + confidence / 2)
+    p = errors / trials
+    denom = 1 + z**2 / trials
+    center = (p + z**2 / (2 * trials)) / denom
+    half_width = z * np.sqrt(p * (1 - p) / trials + z**2 / (4 * trials**2)) / denom
+    return max(0.0, float(center - half_width)), min(1.0, float(center + half_width))
+
+def clopper_pearson_interval(errors, trials, confidence=0.95):
+    """
+    Clopper-Pearson (exact) interval for a binomial proportion
+
+    Args:
+        errors: number of errors observed
+        trials: number of bits (or symbols) observed
+        confidence: two-sided confidence level
+
+    Returns:
+        (lower, upper) bounds on the error rate
+    """
+    if trials <= 0:
+        return 0.0, 1.0
+
+    alpha = 1 - confidence
+    lower = beta.ppf(alpha / 2, errors, trials - errors + 1) if errors > 0 else 0.0
+    upper = beta.ppf(1 - alpha / 2, errors + 1, trials - errors) if errors < trials else 1.0
+    return float(lower), float(upper)
+
+INTERVALS = {
+    "wilson": wilson_interval,
+    "clopper_pearson": clopper_pearson_interval
+}
+
+def confidence_interval(errors, trials, confidence=0.95, method="wilson"):
+    """Confidence interval using the named method ('wilson' or 'clopper_pearson')"""
+    if method not in INTERVALS:
+        raise ValueError(f"Unknown interval method: {method}. Supported: {list(INTERVALS.keys())}")
+    return INTERVALS[method](errors, trials, confidence)
+
+DEFAULT_REL_WIDTH = 0.5  # relative BER interval width that ends an SNR point
+
+class ConfidenceStopper:
+    def __init__(self, rel_width=DEFAULT_REL_WIDTH, confidence=0.95, method="wilson", ber_high=None, ber_low=None):
+        """
+        rel_width: stop when (upper - lower) / BER drops to this value
+        confidence: confidence level of the interval
+        method: 'wilson' or 'clopper_pearson'
+        ber_high: stop when the whole interval is above this BER (left of the cliff)
+        ber_low: stop when the whole interval is below this BER (right of the cliff)
+        """
+        if method not in INTERVALS:
+            raise ValueError(f"Unknown interval method: {method}. Supported: {list(INTERVALS.keys())}")
+
+        self.rel_width = rel_width
+        self.confidence = confidence
+        self.method = method
+        self.ber_high = ber_high
+        self.ber_low = ber_low
+
+    def interval(self, errors, trials):
+        return confidence_interval(errors, trials, self.confidence, self.method)
+
+    def check(self, errors, trials):
+        """
+        Decide whether the measurement is good enough
+
+        Returns:
+            tuple: (should_stop, stop_reason)
+            - stop_reason: 'confidence', 'above_cliff', 'below_cliff' or None
+        """
+        if trials <= 0:
+            return False, None
+
+        lower, upper = self.interval(errors, trials)
+
+        if self.ber_high is not None and lower > self.ber_high:
+            return True, "above_cliff"
+        if self.ber_low is not None and upper < self.ber_low:
+            return True, "below_cliff"
+
+        if errors > 0 and self.rel_width is not None:
+            ber = errors / trials
+            if (upper - lower) / ber <= self.rel_width:
+                return True, "confidence"
+
+        return False, None
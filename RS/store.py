@@ -0,0 +1,131 @@
+"""
+Append-only result store for SNR sweeps
+
+Every model.py run (one iteration) and every finished SNR point is appended
+as one JSON line to ./store/results.jsonl as soon as it completes, so an
+interrupted sweep loses at most the run in progress. On startup the file is
+read back into an in-memory index keyed by
+
+    (config hash, PAM level, code, SNR, seed)
+
+and sweeps skip anything already in it. The store lives outside ./logs and
+./figs so tester.py's clean_directories() never touches it.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+DEFAULT_STORE_PATH = "./store/results.jsonl"
+
+def config_hash(config):
+    """
+    Stable hash of a full test configuration
+
+    Args:
+        config: configuration dict (e.g. tester.CONFIGS entry)
+
+    Returns:
+        16 hex digit hash - identical configs always give the same hash
+    """
+    text = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+def code_label(n, k):
+    """'RS(n,k)' or 'RAW' for uncoded runs"""
+    return "RAW" if n is None else f"RS({n},{k})"
+
+def make_key(cfg_hash, pam_level, code, snr_db, seed):
+    """Index key - SNR is rounded so float noise in the sweep does not create new keys"""
+    return (cfg_hash, int(pam_level), code, round(float(snr_db), 6), seed)
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_STORE_PATH, load=True):
+        """
+        path: JSONL file to append to (created if missing)
+        load: read existing records - False starts with an empty index, so
+              everything is re-measured (and still appended)
+        """
+        self.path = path
+        self.index = {}
+        self.lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if load:
+            self._load()
+
+    def _load(self):
+        """Rebuild the index from the file, ignoring a truncated last line"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # partial write from a killed run
+                    continue
+                self.index[self._record_key(record)] = record
+
+    @staticmethod
+    def _record_key(record):
+        return make_key(record['config_hash'], record['pam_level'], record['code'],
+                        record['snr_db'], record['seed'])
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, cfg_hash, pam_level, code, snr_db, seed):
+        """Stored record for this key, or None"""
+        return self.index.get(make_key(cfg_hash, pam_level, code, snr_db, seed))
+
+    def append(self, cfg_hash, pam_level, code, snr_db, seed, kind, result):
+        """
+        Write one record and add it to the index
+
+        Args:
+            cfg_hash: config_hash() of the sweep configuration
+            pam_level: PAM level
+            code: code_label() of the RS code
+            snr_db: SNR in dB
+            seed: seed of the model.py run - None for a whole SNR point
+            kind: 'iteration' or 'point'
+            result: result dict to store
+
+        Returns:
+            the stored record
+        """
+        record = {
+            "config_hash": cfg_hash,
+            "pam_level": int(pam_level),
+            "code": code,
+            "snr_db": float(snr_db),
+            "seed": seed,
+            "kind": kind,
+            "timestamp": datetime.now().isoformat(),
+            "result": result
+        }
+        line = json.dumps(record, default=float)
+
+        with self.lock:
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.index[self._record_key(record)] = record
+
+        return record
+
+    def points(self, cfg_hash, pam_level, code):
+        """All finished SNR points for one sweep, sorted by SNR"""
+        points = [record['result'] for key, record in self.index.items()
+                  if key[:3] == (cfg_hash, int(pam_level), code) and record['kind'] == 'point']
+        return sorted(points, key=lambda r: r['snr_db'])
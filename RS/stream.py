@@ -0,0 +1,378 @@
+"""
+Streaming (pull-based) link simulation for continuous mode
+
+The chunked path in model.py pushes every chunk through Transmitter ->
+Channel -> Receiver as Python lists and restarts the channel / equalizer at
+each chunk boundary. Here the link is a chain of generators over fixed-size
+numpy blocks:
+
+    source -> frame -> [AUI 1] -> RS encode -> [interleave] -> Gray -> [precode] -> PAM
+           -> channel -> equalizer/slicer -> [1+D decode] -> Gray decode -> [deinterleave]
+           -> RS decode -> [AUI 2] -> (error counter in model.py)
+
+Stages that need history (channel FIR, FFE, DFE decisions, bits left over
+between Gray blocks, partial codewords) carry it between blocks, so the
+stream behaves like one long transmission with no chunk edge effects, and
+memory stays bounded by a few blocks however long the run is.
+"""
+
+from collections import deque
+from itertools import tee
+
+import numpy as np
+from scipy.signal import lfilter, lfiltic
+
+from encode import Binary, GrayCode
+from reedsolomon import ReedSolomon2D
+from precode import PrecodeRX, PrecodeTX
+from prbs import PRBS_SYMBOL_BITS
+from rng import make_rng
+
+SYMBOL_BITS = 16
+
+class Rechunker:
+    def __init__(self, size, dtype=np.int64):
+        """
+        Regroup a stream of 1D arrays into rows of `size` elements
+
+        size: row length
+        dtype: element type of the rows
+        """
+        self.size = size
+        self.buffer = np.zeros(0, dtype=dtype)
+
+    def push(self, data):
+        """Add data and return all complete rows as a (rows, size) array"""
+        if len(self.buffer):
+            data = np.concatenate([self.buffer, data])
+        n_rows = len(data) // self.size
+        self.buffer = data[n_rows * self.size:].copy()
+        return data[:n_rows * self.size].reshape(n_rows, self.size)
+
+    def flush(self, fill=0):
+        """Pad the remainder to a full row (None if nothing is left)"""
+        if len(self.buffer) == 0:
+            return None
+        row = np.full(self.size, fill, dtype=self.buffer.dtype)
+        row[:len(self.buffer)] = self.buffer
+        self.buffer = self.buffer[:0]
+        return row.reshape(1, self.size)
+
+class RowQueue:
+    def __init__(self, rows):
+        """
+        FIFO of array rows, popped in a different grouping than they were pushed
+
+        rows: iterator of 2D arrays
+        """
+        self.rows = rows
+        self.pending = deque()
+
+    def pop(self, count):
+        """Next `count` rows as one 2D array"""
+        out = []
+        while count > 0:
+            if not self.pending:
+                self.pending.append(next(self.rows))
+            block = self.pending[0]
+            take = min(count, len(block))
+            out.append(block[:take])
+            if take == len(block):
+                self.pending.popleft()
+            else:
+                self.pending[0] = block[take:]
+            count -= take
+        return np.concatenate(out)
+
+class FIRFilter:
+    def __init__(self, taps):
+        """
+        Streaming FIR with the same alignment as np.convolve(..., mode='same')
+
+        taps: filter taps (channel response or FFE tap weights)
+        """
+        self.taps = np.asarray(taps, dtype=float)
+        self.state = np.zeros(len(self.taps) - 1)
+        self.history = np.zeros(len(self.taps) - 1)  # last inputs, oldest first
+        self.delay = (len(self.taps) - 1) // 2  # 'same' drops this many leading outputs
+        self.skip = self.delay
+
+    def set_taps(self, taps):
+        """
+        Switch to new taps (same length) between blocks
+
+        The lfilter state is a mix of past inputs weighted by the old taps, so
+        it is rebuilt from the past inputs for the new taps: the next block is
+        filtered as if the new taps had been in place all along.
+        """
+        taps = np.asarray(taps, dtype=float)
+        if len(taps) != len(self.taps):
+            raise ValueError(f"FIR has {len(self.taps)} taps, got {len(taps)}")
+        self.taps = taps
+        if len(self.history):
+            self.state = lfiltic(self.taps, 1.0, [], self.history[::-1])
+
+    def process(self, data):
+        output, self.state = lfilter(self.taps, 1.0, data, zi=self.state)
+        if len(self.history):
+            self.history = np.concatenate([self.history, data])[-len(self.history):]
+        if self.skip:
+            dropped = min(self.skip, len(output))
+            output = output[dropped:]
+            self.skip -= dropped
+        return output
+
+    def flush(self):
+        """Outputs still held back by the alignment delay (end of stream)"""
+        return self.process(np.zeros(self.delay))
+
+def source_blocks(seed, block_size, max_symbols=None, high=225, prbs=None):
+    """
+    Random data symbols in blocks - block i uses the ("chunk", i, "data") stream,
+    the same stream the chunked continuous mode uses for chunk i
+
+    prbs: PRBS generator (prbs.py) - data symbols are then its PRBS_SYMBOL_BITS-bit
+          words, each block seeked to its own offset of the sequence
+    """
+    produced = 0
+    index = 0
+    while max_symbols is None or produced < max_symbols:
+        size = block_size if max_symbols is None else min(block_size, max_symbols - produced)
+        if prbs is not None:
+            yield prbs.seek(produced * PRBS_SYMBOL_BITS).symbols(size, PRBS_SYMBOL_BITS)
+        else:
+            yield make_rng(seed, "chunk", index, "data").integers(0, high + 1, size)
+        produced += size
+        index += 1
+
+def frame(blocks, size):
+    """Regroup data blocks into (rows, size) frames, zero padding the last one (like Transmitter)"""
+    rechunker = Rechunker(size)
+    for block in blocks:
+        rows = rechunker.push(block)
+        if len(rows):
+            yield rows
+    last = rechunker.flush()
+    if last is not None:
+        yield last
+
+def aui(frames, link=None):
+    """Send data rows over an AUI link (precode.AUILink - None passes them through)"""
+    for rows in frames:
+        yield rows if link is None else link.process(rows)
+
+def rs_encode(frames, rs, n, k):
+    """RS encode every row of every frame, one batch per frame (rs=None passes frames through - raw mode)"""
+    for rows in frames:
+        if rs is None:
+            yield rows
+        else:
+            yield rs.encode_blocks(rows, n, k)
+
+def interleave(codewords, interleaver=None):
+    """Codeword rows -> interleaved RS symbol stream (interleave.py), flushing the interleaver at the end"""
+    if interleaver is None:
+        yield from codewords
+        return
+    for rows in codewords:
+        symbols = interleaver.process(rows.ravel())
+        if len(symbols):
+            yield symbols
+    tail = interleaver.flush()
+    if len(tail):
+        yield tail
+
+def gray_symbols(codewords, pam):
+    """Codeword rows -> bits -> Gray symbols, carrying leftover bits between blocks"""
+    bits_per_block, _, _, _ = GrayCode.get_gray_tables(pam.n)
+    carry = np.zeros(0, dtype=np.uint8)
+
+    for rows in codewords:
+        bits = np.concatenate([carry, Binary.bit_encode_array(rows.ravel(), SYMBOL_BITS)])
+        usable = len(bits) - len(bits) % bits_per_block
+        carry = bits[usable:]
+        yield GrayCode.gray_encode_array(bits[:usable], pam.n)
+
+    if len(carry):
+        padded = np.zeros(bits_per_block, dtype=np.uint8)
+        padded[:len(carry)] = carry
+        yield GrayCode.gray_encode_array(padded, pam.n)
+
+def modulate(codewords, pam, precoder=None):
+    """
+    Codeword rows -> bits -> Gray symbols -> PAM levels
+
+    precoder: 1/(1+D) precoder on the Gray symbols (precode.PrecodeTX)
+    """
+    for symbols in gray_symbols(codewords, pam):
+        if precoder is not None:
+            symbols = precoder.process(symbols)
+        yield pam.modulate_array(symbols)
+
+def channel(samples, h, sigma, seed, clean=False):
+    """ISI (streaming FIR) and Gaussian noise - block i uses the ("block", i, "noise") stream"""
+    fir = FIRFilter(h)
+    index = 0
+
+    def add_noise(data):
+        nonlocal index
+        if not clean:
+            data = data + make_rng(seed, "block", index, "noise").normal(0, sigma, len(data))
+        index += 1
+        return data
+
+    for block in samples:
+        if clean:
+            yield block
+        else:
+            yield add_noise(fir.process(block))
+    if not clean:
+        yield add_noise(fir.flush())
+
+def equalize(samples, ffe=None, dfe=None, pam=None, lms=None):
+    """
+    Streaming FFE (carried FIR state) followed by DFE decisions (carried past
+    decisions). Without equalizers the samples are hard sliced (raw mode).
+
+    With an LMS, the taps keep adapting on every block like Receiver.receive
+    does per chunk (step size divided by 10 each time). The FFE switches to
+    the new taps at the block boundary, with its state rebuilt from the past
+    samples (FIRFilter.set_taps).
+    """
+    if dfe is None:
+        for block in samples:
+            yield pam.demodulate_array(block)
+        return
+
+    fir = FIRFilter(ffe.tap_weights) if ffe is not None else None
+    for block in samples:
+        if lms is not None:
+            lms.mu = lms.mu * 0.1
+            lms.equalize(block.tolist())
+            if fir is not None:
+                fir.set_taps(ffe.tap_weights)
+        yield dfe.equalize_block(fir.process(block) if fir is not None else block)
+    if fir is not None:
+        yield dfe.equalize_block(fir.flush())
+
+def demodulate(symbol_blocks, n_levels, codeword_size, deinterleaver=None, decoder=None):
+    """
+    Gray symbols -> bits -> 16-bit RS symbols -> (rows, codeword_size) received codewords
+
+    deinterleaver: undo the TX interleaver on the RS symbol stream (interleave.py)
+    decoder: 1+D decoder of a precoded link, applied to the symbol decisions (precode.PrecodeRX)
+    """
+    _, symbols_per_block, _, _ = GrayCode.get_gray_tables(n_levels)
+    symbols = Rechunker(symbols_per_block)
+    bits = Rechunker(SYMBOL_BITS, dtype=np.uint8)
+    codewords = Rechunker(codeword_size)
+
+    for block in symbol_blocks:
+        if decoder is not None:
+            block = decoder.process(block)
+        gray_bits = GrayCode.gray_decode_array(symbols.push(block).ravel(), n_levels)
+        rs_symbols = Binary.bit_decode_array(bits.push(gray_bits).ravel(), SYMBOL_BITS)
+        if deinterleaver is not None:
+            rs_symbols = deinterleaver.process(rs_symbols)
+        rows = codewords.push(rs_symbols)
+        if len(rows):
+            yield rows
+
+    if deinterleaver is not None:
+        rows = codewords.push(deinterleaver.flush())
+        if len(rows):
+            yield rows
+
+def messages(codewords, rs, n, k):
+    """(rows, message symbols) data symbols of decoded codeword rows (rows themselves in raw mode)"""
+    if rs is None:
+        return codewords
+    if isinstance(rs, ReedSolomon2D):
+        return codewords.reshape(len(codewords), rs.n2, n)[:, :rs.k2, :k].reshape(len(codewords), -1)
+    return codewords[:, :k]
+
+def rs_decode(codewords, rs, n, k, decode_args, decode_stats=False):
+    """
+    Decode every received codeword
+
+    decode_stats: also collect the 2D decoder iteration statistics (with history)
+
+    Yields:
+        (messages, corrected codewords, failed flags) per block, plus the list
+        of per-codeword stats dicts with decode_stats
+    """
+    for rows in codewords:
+        if rs is None:
+            yield (rows, rows, np.zeros(len(rows), dtype=bool)) + (([],) if decode_stats else ())
+            continue
+
+        corrected = np.empty_like(rows)
+        failed = np.zeros(len(rows), dtype=bool)
+        messages = []
+        stats = []
+        for i, row in enumerate(rows):
+            if decode_stats:
+                codeword, failed[i], codeword_stats = rs.decode_codeword(row.tolist(), *decode_args,
+                                                                         return_stats=True, keep_history=True)
+                stats.append(codeword_stats)
+            else:
+                codeword, failed[i] = rs.decode_codeword(row.tolist(), *decode_args)
+            corrected[i] = codeword
+            messages.append(rs.message(codeword, n, k))
+        yield (np.array(messages, dtype=np.int64), corrected, failed) + ((stats,) if decode_stats else ())
+
+def link(seed, block_size, max_symbols, message_size, codeword_size, pam, h, sigma,
+         rs=None, n=None, k=None, decode_args=(), ffe=None, dfe=None, lms=None, clean=False,
+         decode_stats=False, interleaver=None, prbs=None, precode=False, aui1=None, aui2=None):
+    """
+    Whole streaming link
+
+    Args:
+        seed: root seed (rng.py)
+        block_size: data symbols per source block
+        max_symbols: stop the source after this many data symbols (None = endless)
+        message_size / codeword_size: data / coded symbols per RS codeword (equal in raw mode)
+        pam, h, sigma: modulation, channel response and noise
+        rs, n, k, decode_args: RS codec (None for raw) and its parameters
+        ffe, dfe: trained equalizers (None for raw - hard slicing only)
+        lms: keep adapting the equalizer taps on every block (optional)
+        clean: no ISI / noise
+        decode_stats: also yield 'decode_stats' (2D decoder iteration stats per codeword)
+        interleaver: symbol interleaver between RS encode and Gray mapping (interleave.py,
+                     fresh state - its inverse() deinterleaves on the receive side)
+        prbs: PRBS data source instead of random symbols (prbs.py)
+        precode: 1/(1+D) precoding of the PMD link - Gray symbols precoded before
+                 the PAM mapping, 1+D decoding of the DFE decisions (precode.py)
+        aui1, aui2: AUI links (precode.AUILink, fresh state) on the data before RS
+                    encoding / after RS decoding - the tx messages stay the source data
+
+    Yields:
+        dict per decoded block with 'tx_messages', 'rx_messages', 'tx_codewords',
+        'rx_codewords', 'corrected_codewords' and 'failed' (row aligned arrays)
+    """
+    frames_tx, frames_ref = tee(frame(source_blocks(seed, block_size, max_symbols, prbs=prbs), message_size))
+    codewords_tx, codewords_ref = tee(rs_encode(aui(frames_tx, aui1), rs, n, k))
+
+    deinterleaver = interleaver.inverse() if interleaver is not None else None
+    precoder, decoder = (PrecodeTX(pam.n), PrecodeRX(pam.n)) if precode else (None, None)
+
+    samples = channel(modulate(interleave(codewords_tx, interleaver), pam, precoder), h, sigma, seed, clean)
+    decisions = equalize(samples, ffe, dfe, pam, lms)
+    received = tee(demodulate(decisions, pam.n, codeword_size, deinterleaver, decoder))
+    decoded = rs_decode(received[0], rs, n, k, decode_args, decode_stats)
+
+    tx_messages = RowQueue(frames_ref)
+    tx_codewords = RowQueue(codewords_ref)
+    for rx_codewords, (rx_messages, corrected, failed, *stats) in zip(received[1], decoded):
+        count = len(rx_codewords)
+        block = {
+            'tx_messages': tx_messages.pop(count),
+            'rx_messages': rx_messages if aui2 is None else aui2.process(rx_messages),
+            'tx_codewords': tx_codewords.pop(count),
+            'rx_codewords': rx_codewords,
+            'corrected_codewords': corrected,
+            'failed': failed
+        }
+        if decode_stats:
+            block['decode_stats'] = stats[0]
+        yield block
@@ -1,6 +1,6 @@
 """
 SNR Testing Framework for PAM/RS Performance Analysis
-Usage: python tester.py [config_name]
+Usage: python tester.py [config_name] [--fresh]
 
 This script runs comprehensive BER/SER vs SNR sweeps using binary search
 and adaptive refinement for different:
@@ -13,9 +13,20 @@ import sys
 import os
 import json
 import shutil
+import threading
 from datetime import datetime
 import numpy as np
 
+from stopping import DEFAULT_REL_WIDTH, ConfidenceStopper
+from planner import AdaptivePlanner
+from store import ResultStore, config_hash, code_label
+from rng import derive_seed
+from instrument import merge_reports, print_report
+from iterprofile import IterationProfile
+
+# one progress line at a time when SNR points are measured on parallel threads
+PRINT_LOCK = threading.Lock()
+
 # Testing configurations
 CONFIGS = {
     "final": {
@@ -84,6 +95,57 @@ CONFIGS = {
             "max_data_symbols": 500000,
             "chunk_size": 1000
         }
+    },
+    "adaptive": {
+        "description": "Adaptive SNR sweep driven by a monotone GP surrogate of log10(BER)",
+        "sweep": "adaptive",
+        "snr_start": 20.0,  # Starting SNR
+        "snr_max": 35.0,    # Maximum SNR to test
+        "max_points": 15,   # Maximum number of points to test
+        "batch_size": 2,    # Points chosen (and run in parallel) per planning step
+        "min_snr_gap": 0.05,  # Minimum gap between SNR points
+        "target_bers": [1e-2, 1e-3, 1e-4, 1e-5],  # BER levels whose crossing SNR we want
+        "tolerance": 0.15,  # Stop when log10(BER) std at every crossing is below this
+        "iterations": 2,
+        "data_size": 5000000,
+        "training_size": 1000,
+        "mu": 0.000001,
+        "pam_levels": [4, 6, 8],
+        "rs_codes": [(69, 65), (102, 96)],
+        "raw_mode": False,
+        "continuous_mode": {
+            "enabled": False,
+            "max_bit_errors": 10,
+            "max_data_symbols": 1000000,
+            "chunk_size": 1000
+        }
+    },
+    "continuous_ci": {
+        "description": "Continuous mode SNR sweep with confidence-interval early stopping",
+        "snr_start": 18.0,  # Starting SNR
+        "snr_max": 30.0,    # Maximum SNR to test
+        "snr_step": 0.5,    # SNR step size for linear sweep
+        "iterations": 3,
+        "data_size": 1000,  # Not used in continuous mode, but kept for compatibility
+        "training_size": 1000,
+        "mu": 0.000001,
+        "pam_levels": [4, 6, 8],
+        "rs_codes": [(69, 65), (102, 96)],
+        "raw_mode": False,
+        "continuous_mode": {
+            "enabled": True,
+            "max_bit_errors": 10,   # Ignored while early stopping is enabled
+            "max_data_symbols": 5000000,
+            "chunk_size": 1000
+        },
+        "early_stopping": {
+            "enabled": True,
+            "rel_width": 0.5,       # Stop when (upper - lower) / BER <= 0.5
+            "confidence": 0.95,
+            "method": "wilson",     # "wilson" or "clopper_pearson"
+            "ber_high": 0.11,       # Interval entirely above: left of the cliff, stop
+            "ber_low": 1e-6         # Interval entirely below: right of the cliff, stop
+        }
     }
 }
 
@@ -99,10 +161,31 @@ def clean_directories():
         print(f"Created clean {dir_path}")
     print()
 
-def run_single_test(n, k, pam_level, snr_db, iteration, data_size=64, raw_mode=False, training_size=100, mu=0.00001, continuous_mode=None):
-    """Run a single test by calling model.py via terminal"""
+def build_stopper(config):
+    """Create the confidence-interval stopper for a configuration (None if disabled)"""
+    early_stopping = config.get('early_stopping', {})
+    if not early_stopping.get('enabled', False):
+        return None
+    
+    return ConfidenceStopper(
+        rel_width=early_stopping.get('rel_width', DEFAULT_REL_WIDTH),
+        confidence=early_stopping.get('confidence', 0.95),
+        method=early_stopping.get('method', 'wilson'),
+        ber_high=early_stopping.get('ber_high', config.get('ber_high')),
+        ber_low=early_stopping.get('ber_low', config.get('ber_low'))
+    )
+
+def run_single_test(n, k, pam_level, snr_db, iteration, data_size=64, raw_mode=False, training_size=100, mu=0.00001, continuous_mode=None, early_stopping=None, seed=None, profile=False, iteration_stats=False):
+    """
+    Run a single test by calling model.py via terminal (seed makes the run reproducible)
+    
+    With profile, model.py also times every link stage and the per-stage
+    breakdown is returned as 'stage_profile'. With iteration_stats (2D codes),
+    the decoder iteration histograms / cap table are returned as 'iteration_profile'.
+    """
     import subprocess
     import re
+    import tempfile
     
     # Build command line arguments for model.py
     cmd = [
@@ -116,6 +199,22 @@ def run_single_test(n, k, pam_level, snr_db, iteration, data_size=64, raw_mode=F
         "--training_size", str(training_size)
     ]
     
+    if seed is not None:
+        cmd.extend(["--seed", str(seed)])
+    
+    # JSON reports written by model.py to temporary files: result key -> path
+    # (the pipelined link does not record decode iterations)
+    pipelined = bool(continuous_mode and continuous_mode.get('enabled', False)
+                     and continuous_mode.get('streaming', False) and continuous_mode.get('pipeline_workers', 0))
+    report_paths = {}
+    for enabled, option, key in ((profile, "--profile_json", "stage_profile"),
+                                 (iteration_stats and not raw_mode and not pipelined,
+                                  "--iteration_profile_json", "iteration_profile")):
+        if enabled:
+            handle, report_paths[key] = tempfile.mkstemp(suffix=".json", prefix=f"{key}_")
+            os.close(handle)
+            cmd.extend([option, report_paths[key]])
+    
     # Add raw flag if needed
     if raw_mode:
         cmd.append("--raw")
@@ -126,6 +225,22 @@ def run_single_test(n, k, pam_level, snr_db, iteration, data_size=64, raw_mode=F
         cmd.extend(["--max_bit_errors", str(continuous_mode.get('max_bit_errors', 10))])
         cmd.extend(["--max_data_symbols", str(continuous_mode.get('max_data_symbols', 1000000))])
         cmd.extend(["--chunk_size", str(continuous_mode.get('chunk_size', 1000))])
+        
+        # Streaming link, optionally pipelined over worker processes (shared-memory block channels)
+        if continuous_mode.get('streaming', False):
+            cmd.append("--streaming")
+            if continuous_mode.get('pipeline_workers', 0):
+                cmd.extend(["--pipeline_workers", str(continuous_mode['pipeline_workers'])])
+        
+        # Confidence-interval stopping replaces the fixed error count inside model.py
+        if early_stopping and early_stopping.get('enabled', False):
+            cmd.extend(["--target_rel_width", str(early_stopping.get('rel_width', DEFAULT_REL_WIDTH))])
+            cmd.extend(["--confidence", str(early_stopping.get('confidence', 0.95))])
+            cmd.extend(["--ci_method", early_stopping.get('method', 'wilson')])
+            if early_stopping.get('ber_high') is not None:
+                cmd.extend(["--cliff_ber_high", str(early_stopping['ber_high'])])
+            if early_stopping.get('ber_low') is not None:
+                cmd.extend(["--cliff_ber_low", str(early_stopping['ber_low'])])
     
     try:
         # Run model.py via subprocess
@@ -138,11 +253,26 @@ def run_single_test(n, k, pam_level, snr_db, iteration, data_size=64, raw_mode=F
             # Look for BER and SER lines in the output
             ber_match = re.search(r'BER:\s*([\d.]+)', output)
             ser_match = re.search(r'SER:\s*([\d.]+)', output)
+            count_match = re.search(r'BER:\s*[\d.]+\s*\((\d+) errors in (\d+) bits\)', output)
+            outcome_match = re.search(r'Codewords:\s*(\d+) \(clean (\d+), corrected (\d+), '
+                                      r'detected failures (\d+), miscorrected (\d+)\)', output)
             
             if ber_match and ser_match:
                 ber = float(ber_match.group(1))
                 ser = float(ser_match.group(1))
-                return {"ser": ser, "ber": ber, "success": True}
+                bit_errors = int(count_match.group(1)) if count_match else 0
+                total_bits = int(count_match.group(2)) if count_match else 0
+                result = {"ser": ser, "ber": ber, "bit_errors": bit_errors, "total_bits": total_bits, "success": True}
+                if outcome_match:
+                    result["codeword_outcomes"] = dict(zip(
+                        ("codewords", "clean", "corrected", "detected_failure", "miscorrected"),
+                        (int(value) for value in outcome_match.groups())
+                    ))
+                for key, path in report_paths.items():
+                    if os.path.getsize(path) > 0:
+                        with open(path) as f:
+                            result[key] = json.load(f)
+                return result
             else:
                 print(f"Could not parse BER/SER from output: {output}")
                 return {"ser": 1.0, "ber": 1.0, "success": False}
@@ -155,8 +285,158 @@ def run_single_test(n, k, pam_level, snr_db, iteration, data_size=64, raw_mode=F
     except Exception as e:
         print(f"Error running test: {e}")
         return {"ser": 1.0, "ber": 1.0, "success": False}
+    finally:
+        for path in report_paths.values():
+            if os.path.exists(path):
+                os.remove(path)
 
-def run_linear_snr_sweep(n, k, pam_level, config, timestamp):
+def measure_snr_point(n, k, pam_level, snr, config, store=None, parallel=False):
+    """
+    Run the iterations for a single SNR point and return statistics
+    
+    With a ResultStore, finished points and iterations are read from it instead
+    of being rerun, and every new iteration / point is appended as it completes.
+    
+    Progress goes on one line per point, a dot per finished iteration. With
+    parallel (points measured on several threads at once) the line is held
+    back and printed whole when the point is done, so points never share a line.
+    """
+    raw_mode = config.get('raw_mode', False)
+    line = []
+    
+    def show(text):
+        """Add to this point's progress line (printed right away unless parallel)"""
+        line.append(text)
+        if not parallel:
+            print(text, end="", flush=True)
+    
+    def finish(text):
+        """End the progress line"""
+        if parallel:
+            text = "".join(line) + text
+        with PRINT_LOCK:
+            print(text, flush=True)
+    stopper = build_stopper(config)
+    
+    cfg_hash = config_hash(config)
+    code = code_label(n, k)
+    
+    if store is not None:
+        stored = store.get(cfg_hash, pam_level, code, snr, None)
+        if stored is not None:
+            result_data = stored['result']
+            finish(f"  SNR: {snr:6.3f} dB (stored) SER: {result_data['ser_mean']:.6f}, BER: {result_data['ber_mean']:.6f}")
+            return result_data
+    
+    show(f"  SNR: {snr:6.3f} dB ")
+    ser_values = []
+    ber_values = []
+    success_count = 0
+    bit_errors = 0
+    total_bits = 0
+    codeword_outcomes = {}
+    stage_profiles = []
+    iteration_profile = None
+    stop_reason = None
+    
+    for iteration in range(config['iterations']):
+        # Independent, reproducible random streams for every (config, code, SNR, iteration)
+        seed = derive_seed(config.get('seed', 0), cfg_hash, pam_level, code, snr, iteration)
+        
+        stored = store.get(cfg_hash, pam_level, code, snr, seed) if store is not None else None
+        if stored is not None:
+            result = stored['result']
+        else:
+            result = run_single_test(n, k, pam_level, snr, iteration,
+                                   config['data_size'], raw_mode,
+                                   config.get('training_size', 100),
+                                   config.get('mu', 0.00001),
+                                   config.get('continuous_mode'),
+                                   config.get('early_stopping'),
+                                   seed,
+                                   config.get('profile', False),
+                                   config.get('iteration_stats', False))
+            if store is not None and result['success']:
+                store.append(cfg_hash, pam_level, code, snr, seed, "iteration", result)
+        
+        if result['success']:
+            ser_values.append(result['ser'])
+            ber_values.append(result['ber'])
+            bit_errors += result['bit_errors']
+            total_bits += result['total_bits']
+            for outcome, count in result.get('codeword_outcomes', {}).items():
+                codeword_outcomes[outcome] = codeword_outcomes.get(outcome, 0) + count
+            if 'stage_profile' in result:
+                stage_profiles.append(result['stage_profile'])
+            if 'iteration_profile' in result:
+                # 2D decoder iteration histograms / cap penalty summed over the iterations
+                iteration_profile = iteration_profile or IterationProfile(n, k)
+                iteration_profile.add_summary(result['iteration_profile'])
+            success_count += 1
+        
+        show(".")
+        
+        # Stop iterating once the pooled BER interval is good enough
+        if stopper is not None:
+            should_stop, stop_reason = stopper.check(bit_errors, total_bits)
+            if should_stop:
+                break
+    
+    # Calculate statistics
+    if success_count > 0:
+        ser_mean = sum(ser_values) / len(ser_values)
+        ber_mean = sum(ber_values) / len(ber_values)
+        
+        if len(ser_values) > 1:
+            ser_var = sum((x - ser_mean) ** 2 for x in ser_values) / (len(ser_values) - 1)
+            ser_std = ser_var ** 0.5
+            ber_var = sum((x - ber_mean) ** 2 for x in ber_values) / (len(ber_values) - 1)
+            ber_std = ber_var ** 0.5
+        else:
+            ser_std = ber_std = 0.0
+    else:
+        ser_mean = ber_mean = 1.0
+        ser_std = ber_std = 0.0
+    
+    result_data = {
+        "snr_db": snr,
+        "ser_mean": ser_mean,
+        "ber_mean": ber_mean,
+        "ser_std": ser_std,
+        "ber_std": ber_std,
+        "success_count": success_count,
+        "total_iterations": config['iterations'],
+        "bit_errors": bit_errors,
+        "total_bits": total_bits
+    }
+    
+    if codeword_outcomes:
+        result_data["codeword_outcomes"] = codeword_outcomes
+        if codeword_outcomes['miscorrected'] > 0:
+            show(f" [{codeword_outcomes['miscorrected']} miscorrected]")
+    
+    if stage_profiles:
+        # per-stage throughput breakdown summed over the iterations
+        result_data["stage_profile"] = merge_reports(stage_profiles)
+    
+    if iteration_profile is not None:
+        result_data["iteration_profile"] = iteration_profile.summary()
+        show(f" [iterations p99 {result_data['iteration_profile']['p99_iterations']}]")
+    
+    if stopper is not None:
+        result_data["ber_ci"] = list(stopper.interval(bit_errors, total_bits))
+        result_data["stop_reason"] = stop_reason
+        if stop_reason:
+            show(f" [{stop_reason}]")
+    
+    finish(f" SER: {ser_mean:.6f}, BER: {ber_mean:.6f}")
+    
+    if store is not None and success_count > 0:
+        store.append(cfg_hash, pam_level, code, snr, None, "point", result_data)
+    
+    return result_data
+
+def run_linear_snr_sweep(n, k, pam_level, config, timestamp, store=None):
     """Run SNR sweep using linear progression for continuous mode with gap refinement"""
     raw_mode = config.get('raw_mode', False)
     
@@ -171,52 +451,7 @@ def run_linear_snr_sweep(n, k, pam_level, config, timestamp):
     
     def test_snr_point(snr):
         """Test a single SNR point and return statistics"""
-        print(f"  SNR: {snr:6.3f} dB", end=" ")
-        ser_values = []
-        ber_values = []
-        success_count = 0
-        
-        for iteration in range(config['iterations']):
-            result = run_single_test(n, k, pam_level, snr, iteration,
-                                   config['data_size'], raw_mode,
-                                   config.get('training_size', 100),
-                                   config.get('mu', 0.00001),
-                                   config.get('continuous_mode'))
-            
-            if result['success']:
-                ser_values.append(result['ser'])
-                ber_values.append(result['ber'])
-                success_count += 1
-            
-            print(".", end="", flush=True)
-        
-        # Calculate statistics
-        if success_count > 0:
-            ser_mean = sum(ser_values) / len(ser_values)
-            ber_mean = sum(ber_values) / len(ber_values)
-            
-            if len(ser_values) > 1:
-                ser_var = sum((x - ser_mean) ** 2 for x in ser_values) / (len(ser_values) - 1)
-                ser_std = ser_var ** 0.5
-                ber_var = sum((x - ber_mean) ** 2 for x in ber_values) / (len(ber_values) - 1)
-                ber_std = ber_var ** 0.5
-            else:
-                ser_std = ber_std = 0.0
-        else:
-            ser_mean = ber_mean = 1.0
-            ser_std = ber_std = 0.0
-        
-        result_data = {
-            "snr_db": snr,
-            "ser_mean": ser_mean,
-            "ber_mean": ber_mean,
-            "ser_std": ser_std,
-            "ber_std": ber_std,
-            "success_count": success_count,
-            "total_iterations": config['iterations']
-        }
-        
-        print(f" SER: {ser_mean:.6f}, BER: {ber_mean:.6f}")
+        result_data = measure_snr_point(n, k, pam_level, snr, config, store)
         
         results.append(result_data)
         # Sort results after adding new point
@@ -384,6 +619,7 @@ def run_linear_snr_sweep(n, k, pam_level, config, timestamp):
             "description": config['description'],
             "data_size": config['data_size'],
             "total_iterations": config['iterations'],
+            "early_stopping": config.get('early_stopping'),
             "linear_sweep_parameters": {
                 "snr_start": config['snr_start'],
                 "snr_max": config['snr_max'],
@@ -405,7 +641,7 @@ def run_linear_snr_sweep(n, k, pam_level, config, timestamp):
     
     return results
 
-def run_binary_search_sweep(n, k, pam_level, config, timestamp):
+def run_binary_search_sweep(n, k, pam_level, config, timestamp, store=None):
     """Run SNR sweep using binary search to find performance cliff"""
     raw_mode = config.get('raw_mode', False)
     
@@ -420,52 +656,7 @@ def run_binary_search_sweep(n, k, pam_level, config, timestamp):
     
     def test_snr_point(snr):
         """Test a single SNR point and return statistics"""
-        print(f"  SNR: {snr:6.3f} dB", end=" ")
-        ser_values = []
-        ber_values = []
-        success_count = 0
-        
-        for iteration in range(config['iterations']):
-            result = run_single_test(n, k, pam_level, snr, iteration,
-                                   config['data_size'], raw_mode,
-                                   config.get('training_size', 100),
-                                   config.get('mu', 0.00001),
-                                   config.get('continuous_mode'))
-            
-            if result['success']:
-                ser_values.append(result['ser'])
-                ber_values.append(result['ber'])
-                success_count += 1
-            
-            print(".", end="", flush=True)
-        
-        # Calculate statistics
-        if success_count > 0:
-            ser_mean = sum(ser_values) / len(ser_values)
-            ber_mean = sum(ber_values) / len(ber_values)
-            
-            if len(ser_values) > 1:
-                ser_var = sum((x - ser_mean) ** 2 for x in ser_values) / (len(ser_values) - 1)
-                ser_std = ser_var ** 0.5
-                ber_var = sum((x - ber_mean) ** 2 for x in ber_values) / (len(ber_values) - 1)
-                ber_std = ber_var ** 0.5
-            else:
-                ser_std = ber_std = 0.0
-        else:
-            ser_mean = ber_mean = 1.0
-            ser_std = ber_std = 0.0
-        
-        result_data = {
-            "snr_db": snr,
-            "ser_mean": ser_mean,
-            "ber_mean": ber_mean,
-            "ser_std": ser_std,
-            "ber_std": ber_std,
-            "success_count": success_count,
-            "total_iterations": config['iterations']
-        }
-        
-        print(f" SER: {ser_mean:.6f}, BER: {ber_mean:.6f}")
+        result_data = measure_snr_point(n, k, pam_level, snr, config, store)
         
         results.append(result_data)
         # Sort results after adding new point
@@ -703,6 +894,7 @@ def run_binary_search_sweep(n, k, pam_level, config, timestamp):
             "description": config['description'],
             "data_size": config['data_size'],
             "total_iterations": config['iterations'],
+            "early_stopping": config.get('early_stopping'),
             "binary_search_parameters": {
                 "snr_start": config['snr_start'],
                 "snr_max": config['snr_max'],
@@ -726,8 +918,112 @@ def run_binary_search_sweep(n, k, pam_level, config, timestamp):
     
     return results
 
-def run_snr_sweep(config_name="high_snr"):
-    """Run complete SNR sweep based on configuration"""
+def run_adaptive_sweep(n, k, pam_level, config, timestamp, store=None):
+    """Run SNR sweep placing each point where a BER surrogate is least certain"""
+    from concurrent.futures import ThreadPoolExecutor
+    
+    raw_mode = config.get('raw_mode', False)
+    
+    if raw_mode:
+        print(f"Testing {pam_level}-PAM RAW transmission (adaptive)")
+        log_filename = f"./logs/snr_sweep_{pam_level}PAM_RAW_{timestamp}.log"
+    else:
+        print(f"Testing {pam_level}-PAM with RS({n},{k}) (adaptive)")
+        log_filename = f"./logs/snr_sweep_{pam_level}PAM_RS{n}_{k}_{timestamp}.log"
+    
+    results = []
+    batch_size = config.get('batch_size', 1)
+    
+    planner = AdaptivePlanner(
+        config['snr_start'], config['snr_max'],
+        target_bers=config.get('target_bers', [1e-2, 1e-3, 1e-4, 1e-5]),
+        min_snr_gap=config['min_snr_gap'],
+        tolerance=config.get('tolerance', 0.15)
+    )
+    
+    def test_snr_points(snrs):
+        """Test several SNR points (in parallel - each one runs model.py subprocesses)"""
+        with ThreadPoolExecutor(max_workers=max(1, len(snrs))) as executor:
+            new_results = list(executor.map(lambda snr: measure_snr_point(n, k, pam_level, snr, config, store, parallel=True), snrs))
+        
+        results.extend(new_results)
+        results.sort(key=lambda x: x['snr_db'])
+    
+    # Phase 1: endpoints and midpoint to anchor the surrogate
+    print("\nPhase 1: Initial points")
+    test_snr_points([config['snr_start'], (config['snr_start'] + config['snr_max']) / 2, config['snr_max']])
+    
+    # Phase 2: surrogate-driven placement
+    print("\nPhase 2: Adaptive placement")
+    while len(results) < config['max_points']:
+        planner.fit(results)
+        
+        uncertainty = planner.crossing_uncertainty()
+        summary = ", ".join(f"{ber:.0e}: {'-' if std is None else f'{std:.2f}'}" for ber, std in uncertainty.items())
+        print(f"  Crossing std (log10 BER) - {summary}")
+        
+        if planner.converged():
+            print(f"Stopping: all target crossings known to within {planner.tolerance} decades")
+            break
+        
+        snrs = planner.next_points(min(batch_size, config['max_points'] - len(results)))
+        if not snrs:
+            print("No valid SNR points left to test")
+            break
+        
+        print(f"  Next points: {', '.join(f'{snr:.3f}' for snr in snrs)} dB")
+        test_snr_points(snrs)
+    
+    print(f"\nCompleted adaptive sweep with {len(results)} data points")
+    
+    # Save results
+    log_data = {
+        "timestamp": timestamp,
+        "config": "adaptive",
+        "pam_level": pam_level,
+        "rs_code": [n, k] if not raw_mode else None,
+        "raw_mode": raw_mode,
+        "results": results,
+        "metadata": {
+            "description": config['description'],
+            "data_size": config['data_size'],
+            "total_iterations": config['iterations'],
+            "early_stopping": config.get('early_stopping'),
+            "adaptive_parameters": {
+                "snr_start": config['snr_start'],
+                "snr_max": config['snr_max'],
+                "max_points": config['max_points'],
+                "batch_size": batch_size,
+                "min_snr_gap": config['min_snr_gap'],
+                "target_bers": config.get('target_bers'),
+                "tolerance": planner.tolerance,
+                "crossing_uncertainty": {str(ber): std for ber, std in planner.crossing_uncertainty().items()}
+            }
+        }
+    }
+    
+    os.makedirs("./logs", exist_ok=True)
+    with open(log_filename, 'w') as f:
+        json.dump(log_data, f, indent=4)
+    print(f"Results saved to {log_filename}")
+    
+    return results
+
+def report_stage_profile(results, label):
+    """Print the per-stage throughput breakdown of a whole sweep (configs with "profile": True)"""
+    profiles = [result["stage_profile"] for result in results or [] if "stage_profile" in result]
+    if profiles:
+        print(f"{label}:")
+        print_report(merge_reports(profiles))
+
+def run_snr_sweep(config_name="high_snr", fresh=False):
+    """
+    Run complete SNR sweep based on configuration
+    
+    Points already in the result store for this exact configuration are reused,
+    so an interrupted sweep picks up where it stopped. fresh=True re-measures
+    everything (new results are still appended to the store).
+    """
     
     if config_name not in CONFIGS:
         print(f"Unknown configuration: {config_name}")
@@ -740,6 +1036,12 @@ def run_snr_sweep(config_name="high_snr"):
     config = CONFIGS[config_name]
     print(f"Running {config['description']}")
     
+    store = ResultStore(load=not fresh)
+    if fresh:
+        print("Fresh run: ignoring stored results")
+    else:
+        print(f"Result store: {store.path} ({len(store)} stored records, config hash {config_hash(config)})")
+    
     # Create timestamp for this run
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
@@ -747,7 +1049,10 @@ def run_snr_sweep(config_name="high_snr"):
     continuous_mode = config.get('continuous_mode', {})
     use_linear_sweep = continuous_mode.get('enabled', False)
     
-    if use_linear_sweep:
+    if config.get('sweep') == 'adaptive':
+        print("Using adaptive SNR sweep")
+        sweep_function = run_adaptive_sweep
+    elif use_linear_sweep:
         print("Using linear SNR sweep for continuous mode")
         sweep_function = run_linear_snr_sweep
     else:
@@ -758,11 +1063,13 @@ def run_snr_sweep(config_name="high_snr"):
     for pam_level in config['pam_levels']:
         if config.get('raw_mode', False):
             # Raw transmission mode (no RS)
-            sweep_function(None, None, pam_level, config, timestamp)
+            results = sweep_function(None, None, pam_level, config, timestamp, store)
+            report_stage_profile(results, f"{pam_level}-PAM RAW")
         else:
             # RS-coded transmission
             for n, k in config['rs_codes']:
-                sweep_function(n, k, pam_level, config, timestamp)
+                results = sweep_function(n, k, pam_level, config, timestamp, store)
+                report_stage_profile(results, f"{pam_level}-PAM {code_label(n, k)}")
     
     print("SNR sweep completed!")
     print("Use 'python parse.py' to generate plots from the results.")
@@ -777,7 +1084,11 @@ def list_configurations():
         
         # Check if this is a continuous mode configuration
         continuous_mode = config.get('continuous_mode', {})
-        if continuous_mode.get('enabled', False):
+        if config.get('sweep') == 'adaptive':
+            print(f"  SNR range: {config['snr_start']}-{config['snr_max']} dB (adaptive, {config.get('batch_size', 1)} points per step)")
+            print(f"  Target BERs: {config.get('target_bers')}")
+            print(f"  Points: up to {config['max_points']}")
+        elif continuous_mode.get('enabled', False):
             print(f"  SNR range: {config['snr_start']}-{config['snr_max']} dB (linear sweep, step: {config.get('snr_step', 'N/A')} dB)")
         else:
             print(f"  SNR range: {config['snr_start']}-{config['snr_max']} dB (binary search)")
@@ -797,8 +1108,15 @@ def list_configurations():
             print(f"    Max bit errors: {continuous_mode.get('max_bit_errors', 10)}")
             print(f"    Max data symbols: {continuous_mode.get('max_data_symbols', 1000000)}")
             print(f"    Chunk size: {continuous_mode.get('chunk_size', 1000)}")
+            if continuous_mode.get('streaming', False):
+                print(f"    Streaming: Enabled ({continuous_mode.get('pipeline_workers', 0)} pipeline decode workers)")
         else:
             print(f"  Continuous mode: Disabled")
+        
+        early_stopping = config.get('early_stopping', {})
+        if early_stopping.get('enabled', False):
+            print(f"  Early stopping: {early_stopping.get('method', 'wilson')} interval, "
+                  f"relative width <= {early_stopping.get('rel_width', DEFAULT_REL_WIDTH)}")
         print()
 
 if __name__ == "__main__":
@@ -807,9 +1125,9 @@ if __name__ == "__main__":
             list_configurations()
         else:
             config_name = sys.argv[1]
-            run_snr_sweep(config_name)
+            run_snr_sweep(config_name, fresh="--fresh" in sys.argv[2:])
     else:
-        print("Usage: python tester.py [config_name]")
+        print("Usage: python tester.py [config_name] [--fresh]")
         print("       python tester.py list")
         print()
         list_configurations()
\ No newline at end of file
@@ -11,9 +11,13 @@ from gf256 import GF256
 class RS2DGenerator:
     """Generate 2D RS code with exact reference structure matching"""
 
-    def __init__(self, n: int, k: int, output_dir: str = 'gen_2d'):
-        self.n = n  # Total symbols per dimension
-        self.k = k  # Data symbols per dimension
+    def __init__(self, n: int, k: int, output_dir: str = 'gen_2d', n2: int = None, k2: int = None):
+        self.n = n  # Total symbols per row (row code RS(n, k))
+        self.k = k  # Data symbols per row
+        self.n2 = n if n2 is None else n2  # Rows per block (column code RS(n2, k2))
+        self.k2 = k if k2 is None else k2  # Data rows per block
+        if not 0 < self.k2 < self.n2:
+            raise ValueError(f"Column code RS({self.n2},{self.k2}) needs 0 < k2 < n2")
         self.n_parity = n - k  # Parity symbols per dimension
         self.t = self.n_parity // 2  # Error correction capability per dimension
         self.output_dir = output_dir
@@ -165,8 +169,8 @@ endmodule"""
     def generate_rs_2d_encode_sv(self):
         """Generate rs_2d_encode.sv with exact reference structure"""
         # Calculate dimensions
-        data_symbols = self.k * self.k
-        encoded_symbols = self.n * self.n
+        data_symbols = self.k * self.k2
+        encoded_symbols = self.n * self.n2
         data_bits = data_symbols * 8
         encoded_bits = encoded_symbols * 8
         parity_size = self.n - self.k
@@ -195,9 +199,15 @@ module rs_2d_encoder #(
     output wire ready
 );
 
+// Product code geometry: rows RS(ROW_N,ROW_K) x columns RS(COL_N,COL_K)
+localparam ROW_N = N;
+localparam ROW_K = K;
+localparam COL_N = N;                                     // square datapath: column code = row code
+localparam COL_K = K;
+
 // Calculate dimensions
-localparam DATA_SYMBOLS = K * K;                           // {data_symbols} symbols
-localparam ENCODED_SYMBOLS = N * N;                        // {encoded_symbols} symbols
+localparam DATA_SYMBOLS = ROW_K * COL_K;                   // {data_symbols} symbols
+localparam ENCODED_SYMBOLS = ROW_N * COL_N;                // {encoded_symbols} symbols
 localparam DATA_BITS = DATA_SYMBOLS * SYMBOL_WIDTH;        // {data_bits} bits
 localparam ENCODED_BITS = ENCODED_SYMBOLS * SYMBOL_WIDTH;  // {encoded_bits} bits
 localparam PARITY_SIZE = N - K;                            // {parity_size} symbols
@@ -648,8 +658,8 @@ endmodule"""
     def generate_rs_2d_decode_sv(self):
         """Generate rs_2d_decode.sv with exact reference structure"""
         # Calculate dimensions
-        data_symbols = self.k * self.k
-        encoded_symbols = self.n * self.n
+        data_symbols = self.k * self.k2
+        encoded_symbols = self.n * self.n2
         data_bits = data_symbols * 8
         encoded_bits = encoded_symbols * 8
         parity_size = self.n - self.k
@@ -674,9 +684,15 @@ module rs_2d_decoder #(
     output wire ready
 );
 
+// Product code geometry: rows RS(ROW_N,ROW_K) x columns RS(COL_N,COL_K)
+localparam ROW_N = N;
+localparam ROW_K = K;
+localparam COL_N = N;                                     // square datapath: column code = row code
+localparam COL_K = K;
+
 // Calculate dimensions
-localparam DATA_SYMBOLS = K * K;                           // {data_symbols} symbols
-localparam ENCODED_SYMBOLS = N * N;                        // {encoded_symbols} symbols
+localparam DATA_SYMBOLS = ROW_K * COL_K;                   // {data_symbols} symbols
+localparam ENCODED_SYMBOLS = ROW_N * COL_N;                // {encoded_symbols} symbols
 localparam DATA_BITS = DATA_SYMBOLS * SYMBOL_WIDTH;        // {data_bits} bits
 localparam ENCODED_BITS = ENCODED_SYMBOLS * SYMBOL_WIDTH;  // {encoded_bits} bits
 
@@ -2165,14 +2181,46 @@ endmodule"""
             else:
                 print(f"Warning: {filename} not found in ref_2d/")
 
+    def is_square(self) -> bool:
+        return (self.n2, self.k2) == (self.n, self.k)
+
+    def generate_params_svh(self):
+        """Generate product_code_params.svh: block geometry localparams (any row/column codes)"""
+        data_symbols = self.k * self.k2
+        encoded_symbols = self.n * self.n2
+        content = f"""// Product code geometry: rows RS({self.n},{self.k}) x columns RS({self.n2},{self.k2})
+// Block of {self.n2} rows x {self.n} columns, {self.k2} x {self.k} data symbols
+
+localparam ROW_N = {self.n};
+localparam ROW_K = {self.k};
+localparam COL_N = {self.n2};
+localparam COL_K = {self.k2};
+localparam SYMBOL_WIDTH = 8;
+
+localparam DATA_SYMBOLS = ROW_K * COL_K;                   // {data_symbols} symbols
+localparam ENCODED_SYMBOLS = ROW_N * COL_N;                // {encoded_symbols} symbols
+localparam DATA_BITS = DATA_SYMBOLS * SYMBOL_WIDTH;        // {data_symbols * 8} bits (encoder input frame)
+localparam ENCODED_BITS = ENCODED_SYMBOLS * SYMBOL_WIDTH;  // {encoded_symbols * 8} bits (encoder output / block buffer)
+localparam ROW_DECODES_PER_ITERATION = COL_N + ROW_N;      // {self.n2 + self.n} 1D decodes per row + column pass
+"""
+        with open(os.path.join(self.output_dir, 'product_code_params.svh'), 'w') as f:
+            f.write(content)
+        print("Generated: product_code_params.svh")
+
     def generate_all(self):
         """Generate all files with exact structure matching for 2D RS"""
+        if not self.is_square():
+            raise ValueError(
+                f"RS({self.n},{self.k}) x RS({self.n2},{self.k2}): the generated datapath instantiates one 1D "
+                "core and a square block - use --params_only for the geometry of a rectangular product code")
         print(f"Generating 2D RS({self.n}, {self.k}) code with EXACT structure matching...")
         print(f"Parity symbols per dimension: {self.n_parity}")
         print(f"Data symbols: {self.k}x{self.k} = {self.k*self.k}")
         print(f"Encoded symbols: {self.n}x{self.n} = {self.n*self.n}")
         print("-" * 50)
 
+        self.generate_params_svh()
+
         # Generate all required files for 2D RS implementation
         self.generate_syndrome_sv()
         self.generate_encode_sv()
@@ -2194,12 +2242,23 @@ def main():
     parser = argparse.ArgumentParser(description='Generate 2D Reed-Solomon SystemVerilog code with exact structure')
     parser.add_argument('--n', type=int, default=15, help='Codeword length per dimension (default: 15 for RS(15,11))')
     parser.add_argument('--k', type=int, default=11, help='Data symbols per dimension (default: 11 for RS(15,11))')
+    parser.add_argument('--n2', type=int, default=None, help='Column code length / rows per block (default: --n)')
+    parser.add_argument('--k2', type=int, default=None, help='Column code data symbols / data rows (default: --k)')
+    parser.add_argument('--params_only', action='store_true',
+                        help='Only write product_code_params.svh (block geometry localparams, any row/column codes)')
     parser.add_argument('--output', type=str, default='gen_2d', help='Output directory')
 
     args = parser.parse_args()
 
-    generator = RS2DGenerator(args.n, args.k, args.output)
-    generator.generate_all()
+    generator = RS2DGenerator(args.n, args.k, args.output, args.n2, args.k2)
+    if args.params_only:
+        generator.generate_params_svh()
+        return
+    try:
+        generator.generate_all()
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
 
 if __name__ == '__main__':
     main()